@@ -0,0 +1,237 @@
+"""Load simulation for the Economy cog.
+
+Drives the real command callbacks and helpers with fake users against a throwaway
+economy.db and prints throughput, latency percentiles and write cost per command.
+Calls the cog turns away (cooldowns, missing coins or items, refused trades) are counted
+as rejected; throughput and the per-op costs only count the calls that went through.
+
+Run from the repository root (settings.py must exist):
+
+    python -m benchmarks.economy_bench --users 2000 --ops 20000 --concurrency 200
+"""
+import argparse
+import asyncio
+import logging
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from main import logger
+from src.cogs.economy import Economy
+
+WAL_AUTOCHECKPOINT_PAGES = 1000  # SQLite's default; used to estimate checkpoint syncs
+
+
+# ===================== FAKES =====================
+class FakeUser:
+    bot = False
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+
+    async def send(self, *args, **kwargs):
+        return None
+
+
+class FakeContext:
+    """Just enough of commands.Context for the economy callbacks."""
+
+    guild = None
+
+    def __init__(self, user: FakeUser):
+        self.author = user
+        self.sent = 0
+        self.rejected = False
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+        # Every refusal in the economy commands is a plain "❌ ..." message
+        if args and isinstance(args[0], str) and args[0].startswith("❌"):
+            self.rejected = True
+        return None
+
+
+class FakeBot:
+    def __init__(self):
+        self.user = FakeUser(1)
+        self.voice_clients = []
+
+    def get_user(self, user_id: int):
+        return None
+
+    def get_guild(self, guild_id: int):
+        return None
+
+
+# ===================== SCENARIO =====================
+class Simulation:
+    def __init__(self, cog: Economy, users: int, seed: int):
+        self.cog = cog
+        self.rng = random.Random(seed)
+        self.users = [FakeUser(10_000 + i) for i in range(users)]
+        self.shop_items = sorted({item for table in cog.loot_tables.values() for item in table.items})
+
+    async def seed_shop(self):
+        async with self.cog.db.transaction() as db:
+            await db.executemany(
+                "INSERT OR REPLACE INTO shop_items (item_id, name, price) VALUES (?, ?, ?)",
+                [(item, item.capitalize(), 10) for item in self.shop_items],
+            )
+        await self.cog.shop_catalog.load(self.cog.db)
+
+    def pick_user(self) -> FakeUser:
+        return self.rng.choice(self.users)
+
+    # Each operation returns whether the cog carried it out (False when it was rejected)
+    async def _command(self, command, *args) -> bool:
+        ctx = FakeContext(self.pick_user())
+        await command.callback(self.cog, ctx, *args)
+        return not ctx.rejected
+
+    async def op_daily(self) -> bool:
+        return await self._command(self.cog.daily)
+
+    async def op_dig(self) -> bool:
+        return await self._command(self.cog.dig, 10)
+
+    async def op_fish(self) -> bool:
+        return await self._command(self.cog.fish, 10)
+
+    async def op_buy(self) -> bool:
+        return await self._command(self.cog.buy, self.rng.choice(self.shop_items), 1)
+
+    async def op_sell(self) -> bool:
+        return await self._command(self.cog.sell, self.rng.choice(self.shop_items), 1)
+
+    async def op_trade(self) -> bool:
+        a, b = self.rng.sample(self.users, 2)
+        try:
+            await self.cog.settle_trade(a.id, b.id, {}, {}, 1, 1)
+        except Exception:
+            return False  # rejected trades are part of the load
+        return True
+
+    def operations(self) -> dict:
+        return {
+            "daily": self.op_daily,
+            "dig": self.op_dig,
+            "fish": self.op_fish,
+            "buy": self.op_buy,
+            "sell": self.op_sell,
+            "trade": self.op_trade,
+        }
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_phase(cog: Economy, name: str, operation, count: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = rejected = 0
+    remaining = iter(range(count))
+
+    async def worker():
+        nonlocal errors, rejected
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                if not await operation():
+                    rejected += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    await cog.db.checkpoint("TRUNCATE")
+    before = cog.db.stats.copy()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    delta = cog.db.stats - before
+    _, wal_frames, _ = await cog.db.checkpoint("PASSIVE")
+    await cog.db.checkpoint("TRUNCATE")
+
+    latencies.sort()
+    # WAL with synchronous=NORMAL syncs only when checkpointing (the WAL, then the database file)
+    fsyncs = 2 * math.ceil(wal_frames / WAL_AUTOCHECKPOINT_PAGES) if wal_frames else 0
+    # Rejected calls and errors did no useful work; their cost is charged to the completed ones
+    completed = count - rejected - errors
+    per_op = max(completed, 1)
+    return {
+        "phase": name,
+        "ops": completed,
+        "rejected": rejected,
+        "errors": errors,
+        "ops_per_s": completed / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "tx_per_op": delta["transactions"] / per_op,
+        "commits_per_op": delta["commits"] / per_op,
+        "reads_per_op": delta["reads"] / per_op,
+        "fsync_per_op": fsyncs / per_op,
+    }
+
+
+def print_report(results: list[dict]):
+    header = f"{'phase':<8} {'ops':>7} {'rej':>7} {'err':>5} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'tx/op':>6} {'commit/op':>9} {'read/op':>7} {'fsync/op':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['phase']:<8} {r['ops']:>7} {r['rejected']:>7} {r['errors']:>5} {r['ops_per_s']:>9.0f} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f} "
+              f"{r['tx_per_op']:>6.2f} {r['commits_per_op']:>9.2f} {r['reads_per_op']:>7.2f} {r['fsync_per_op']:>8.4f}")
+    print("ops, ops/s and the per-op columns count completed calls only; rej are calls the cog turned away.")
+    print("fsync/op is an estimate: one WAL + one database sync per checkpoint of "
+          f"{WAL_AUTOCHECKPOINT_PAGES} pages (synchronous=NORMAL).")
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp(prefix="economy-bench-")
+    db_path = args.db or os.path.join(workdir, "economy.db")
+    cog = Economy(FakeBot(), db_path=db_path)
+    await cog.cog_load()
+    # Checkpoints are taken explicitly around each phase so the WAL size can be measured
+    async with cog.db.transaction() as db:
+        await db.execute("PRAGMA wal_autocheckpoint = 0")
+    try:
+        sim = Simulation(cog, args.users, args.seed)
+        await sim.seed_shop()
+        operations = sim.operations()
+        per_phase = max(1, args.ops // (len(operations) + 1))
+        results = []
+        for name, operation in operations.items():
+            results.append(await run_phase(cog, name, operation, per_phase, args.concurrency))
+
+        names = list(operations)
+        weights = [3, 3, 3, 2, 2, 1]
+
+        async def mixed() -> bool:
+            return await operations[sim.rng.choices(names, weights)[0]]()
+
+        results.append(await run_phase(cog, "mixed", mixed, per_phase, args.concurrency))
+        print_report(results)
+    finally:
+        await cog.cog_unload()
+        if not args.db:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Economy cog load simulation")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--ops", type=int, default=14000, help="Total operations across all phases")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="Database file to use instead of a temporary one (kept afterwards)")
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+    asyncio.run(main(args))
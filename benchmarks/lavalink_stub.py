@@ -0,0 +1,275 @@
+"""Stub Lavalink v4 nodes for exercising the music cog's node pool locally.
+
+Each node answers the subset of the Lavalink v4 API wavelink uses (websocket with ready,
+stats and playerUpdate ops, sessions, players, loadtracks, decodetracks, stats, info)
+without playing any audio. Loaded tracks are synthesized from the query and every track
+lasts three minutes.
+
+The reported load can be changed while running, which is how degraded nodes and player
+migration are tested:
+
+    python -m benchmarks.lavalink_stub --port 2333 --nodes 3
+    curl -X POST localhost:2334/stub/load -d '{"cpu": 0.95, "deficit": 600}'
+
+Point LAVALINK_URI / LAVALINK_NODES in settings.py at http://127.0.0.1:<port> with the
+same --password.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import time
+import uuid
+
+from aiohttp import WSMsgType, web
+
+TRACK_LENGTH_MS = 180_000
+FRAMES_PER_MINUTE = 3000
+
+
+class StubNode:
+    def __init__(self, password: str, stats_interval: float):
+        self.password = password
+        self.stats_interval = stats_interval
+        self.load = {"cpu": 0.05, "deficit": 0, "nulled": 0}
+        self.sessions: dict[str, web.WebSocketResponse] = {}
+        self.players: dict[tuple[str, str], dict] = {}  # (session id, guild id) -> player state
+        self.tracks: dict[str, dict] = {}  # encoded -> track payload
+        self.started = time.time()
+
+    # ===================== HELPERS =====================
+    def _authorized(self, request: web.Request) -> bool:
+        return request.headers.get("Authorization") == self.password
+
+    def _track(self, identifier: str) -> dict:
+        encoded = base64.b64encode(identifier.encode()).decode()
+        track = {
+            "encoded": encoded,
+            "info": {
+                "identifier": identifier,
+                "isSeekable": True,
+                "author": "stub",
+                "length": TRACK_LENGTH_MS,
+                "isStream": False,
+                "position": 0,
+                "title": identifier,
+                "uri": identifier if "://" in identifier else None,
+                "artworkUrl": None,
+                "isrc": None,
+                "sourceName": "stub",
+            },
+            "pluginInfo": {},
+            "userData": {},
+        }
+        self.tracks[encoded] = track
+        return track
+
+    def _position(self, player: dict) -> int:
+        if not player["track"]:
+            return 0
+        if player["paused"]:
+            return player["position"]
+        elapsed = int((time.time() - player["updated"]) * 1000)
+        return min(player["position"] + elapsed, TRACK_LENGTH_MS)
+
+    def _player_payload(self, guild_id: str, player: dict) -> dict:
+        return {
+            "guildId": guild_id,
+            "track": player["track"],
+            "volume": player["volume"],
+            "paused": player["paused"],
+            "state": {"time": int(time.time() * 1000), "position": self._position(player), "connected": True, "ping": 0},
+            "voice": player["voice"],
+            "filters": player["filters"],
+        }
+
+    def _stats(self) -> dict:
+        playing = sum(1 for p in self.players.values() if p["track"] and not p["paused"])
+        stats = {
+            "players": len(self.players),
+            "playingPlayers": playing,
+            "uptime": int((time.time() - self.started) * 1000),
+            "memory": {"free": 1 << 28, "used": 1 << 26, "allocated": 1 << 29, "reservable": 1 << 30},
+            "cpu": {"cores": 4, "systemLoad": self.load["cpu"], "lavalinkLoad": self.load["cpu"] / 2},
+        }
+        if playing:
+            stats["frameStats"] = {
+                "sent": FRAMES_PER_MINUTE - self.load["deficit"] - self.load["nulled"],
+                "nulled": self.load["nulled"],
+                "deficit": self.load["deficit"],
+            }
+        return stats
+
+    async def _send(self, session_id: str, payload: dict):
+        ws = self.sessions.get(session_id)
+        if ws is not None and not ws.closed:
+            await ws.send_str(json.dumps(payload))
+
+    async def _event(self, session_id: str, guild_id: str, event: str, **fields):
+        await self._send(session_id, {"op": "event", "type": event, "guildId": guild_id, **fields})
+
+    # ===================== ROUTES =====================
+    async def websocket(self, request: web.Request):
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized()
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        session_id = uuid.uuid4().hex[:16]
+        self.sessions[session_id] = ws
+        await ws.send_str(json.dumps({"op": "ready", "resumed": False, "sessionId": session_id}))
+        ticker = asyncio.create_task(self._tick(session_id))
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.ERROR:
+                    break
+        finally:
+            ticker.cancel()
+            self.sessions.pop(session_id, None)
+            for key in [key for key in self.players if key[0] == session_id]:
+                del self.players[key]
+        return ws
+
+    async def _tick(self, session_id: str):
+        while True:
+            await self._send(session_id, {"op": "stats", **self._stats()})
+            for (sid, guild_id), player in list(self.players.items()):
+                if sid == session_id:
+                    state = self._player_payload(guild_id, player)["state"]
+                    await self._send(session_id, {"op": "playerUpdate", "guildId": guild_id, "state": state})
+            await asyncio.sleep(self.stats_interval)
+
+    async def update_session(self, request: web.Request):
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized()
+        return web.json_response({"resuming": False, "timeout": 60})
+
+    async def update_player(self, request: web.Request):
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized()
+        session_id, guild_id = request.match_info["session"], request.match_info["guild"]
+        if session_id not in self.sessions:
+            return web.json_response({"status": 404, "error": "Not Found", "message": "Session not found"}, status=404)
+        data = await request.json()
+        player = self.players.setdefault(
+            (session_id, guild_id),
+            {"track": None, "position": 0, "updated": time.time(), "volume": 100, "paused": False, "voice": {}, "filters": {}},
+        )
+        player["position"] = self._position(player)
+        player["updated"] = time.time()
+        for key in ("volume", "paused", "voice", "filters"):
+            if key in data:
+                player[key] = data[key]
+        if "position" in data:
+            player["position"] = data["position"]
+        started = None
+        track = data.get("track")
+        if track is not None and "encoded" in track:
+            no_replace = request.query.get("noReplace", "false").lower() == "true"
+            if not (no_replace and player["track"]):
+                if track["encoded"] is None:
+                    player["track"] = None
+                else:
+                    started = self.tracks.get(track["encoded"]) or self._track(base64.b64decode(track["encoded"]).decode(errors="replace"))
+                    player["track"] = started
+                    player["position"] = data.get("position", 0)
+        response = web.json_response(self._player_payload(guild_id, player))
+        if started is not None:
+            asyncio.create_task(self._event(session_id, guild_id, "TrackStartEvent", track=started))
+        return response
+
+    async def destroy_player(self, request: web.Request):
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized()
+        self.players.pop((request.match_info["session"], request.match_info["guild"]), None)
+        return web.Response(status=204)
+
+    async def load_tracks(self, request: web.Request):
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized()
+        identifier = request.query.get("identifier", "")
+        if not identifier:
+            return web.json_response({"loadType": "empty", "data": {}})
+        track = self._track(identifier.split(":", 1)[1] if identifier.startswith(("ytsearch:", "ytmsearch:")) else identifier)
+        if "://" in identifier:
+            return web.json_response({"loadType": "track", "data": track})
+        return web.json_response({"loadType": "search", "data": [track]})
+
+    async def decode_tracks(self, request: web.Request):
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized()
+        encoded = await request.json()
+        return web.json_response([
+            self.tracks.get(track) or self._track(base64.b64decode(track).decode(errors="replace")) for track in encoded
+        ])
+
+    async def stats(self, request: web.Request):
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized()
+        return web.json_response(self._stats())
+
+    async def info(self, request: web.Request):
+        return web.json_response({
+            "version": {"semver": "4.0.0-stub", "major": 4, "minor": 0, "patch": 0, "preRelease": "stub"},
+            "buildTime": 0, "git": {"branch": "stub", "commit": "stub", "commitTime": 0},
+            "jvm": "stub", "lavaplayer": "stub", "sourceManagers": ["stub"], "filters": [], "plugins": [],
+        })
+
+    async def version(self, request: web.Request):
+        return web.Response(text="4.0.0-stub")
+
+    async def set_load(self, request: web.Request):
+        """Change the load reported in stats, e.g. {"cpu": 0.95, "deficit": 600, "nulled": 0}."""
+        data = await request.json()
+        self.load.update({key: data[key] for key in self.load if key in data})
+        if data.get("disconnect"):
+            for ws in list(self.sessions.values()):
+                await ws.close()
+        return web.json_response({"load": self.load, "players": len(self.players)})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.get("/v4/websocket", self.websocket),
+            web.patch("/v4/sessions/{session}", self.update_session),
+            web.patch("/v4/sessions/{session}/players/{guild}", self.update_player),
+            web.delete("/v4/sessions/{session}/players/{guild}", self.destroy_player),
+            web.get("/v4/loadtracks", self.load_tracks),
+            web.post("/v4/decodetracks", self.decode_tracks),
+            web.get("/v4/stats", self.stats),
+            web.get("/v4/info", self.info),
+            web.get("/version", self.version),
+            web.post("/stub/load", self.set_load),
+        ])
+        return app
+
+
+async def serve(host: str, ports: list[int], password: str, stats_interval: float) -> list[web.AppRunner]:
+    runners = []
+    for port in ports:
+        runner = web.AppRunner(StubNode(password, stats_interval).app())
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        runners.append(runner)
+    return runners
+
+
+async def main(args):
+    ports = [args.port + i for i in range(args.nodes)]
+    runners = await serve(args.host, ports, args.password, args.stats_interval)
+    print("stub Lavalink nodes: " + ", ".join(f"http://{args.host}:{port}" for port in ports))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub Lavalink v4 nodes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2333, help="Port of the first node; further nodes count up")
+    parser.add_argument("--nodes", type=int, default=1)
+    parser.add_argument("--password", default="youshallnotpass")
+    parser.add_argument("--stats-interval", type=float, default=5.0, help="Seconds between stats and playerUpdate ops")
+    args = parser.parse_args()
+    asyncio.run(main(args))
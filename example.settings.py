@@ -85,6 +85,14 @@ HELP_COLOR = Color.blurple()
 
 LAVALINK_URI: str = 'https://lavalink.idk.com'  # Example format without http:// or https://
 LAVALINK_PASSWORD: str = 'Password'
+# Extra Lavalink nodes; players are spread over these and LAVALINK_URI by load and moved off a node that goes down.
+# "identifier" and "password" are optional (password defaults to LAVALINK_PASSWORD); "weight" 2.0 gives a node twice the share.
+# LAVALINK_NODES: list[dict] = [{"identifier": "eu-2", "uri": "https://lavalink2.idk.com", "password": "Password", "weight": 1.0}]
+LAVALINK_NODES: list[dict] = []
+
+# Music queue length per guild id; guilds not listed get the music cog's MAX_QUEUE_LENGTH (5000)
+# MUSIC_QUEUE_LIMITS: dict[int, int] = {123456789: 1000}
+MUSIC_QUEUE_LIMITS: dict[int, int] = {}
 
 # Default JSON example for activity loop (copy-paste ready)
 DEFAULT_ACTIVITY = dumps([
@@ -118,6 +118,8 @@ class OwnerCommands(commands.Cog):
                 # Update any relevant attributes that depend on settings
                 # For example, if PREFIX is used directly in this cog:
                 # self.bot.command_prefix = settings.PREFIX 
+                # Let cogs that cache values derived from settings rebuild them (on_settings_reload)
+                self.bot.dispatch("settings_reload")
                 await ctx.send("✅ `settings.py` reloaded!")
             except Exception as e:
                 await ctx.send(f"❌ Error reloading `settings.py`: {e}")
@@ -1,143 +1,1148 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ui import Button, View, Select
 import aiosqlite
 import random
-import datetime
 import asyncio
+import bisect
+import contextlib
+import functools
+import inspect
+import itertools
+import tempfile
+import time
+import weakref
+import os
+from collections import Counter
 from main import logger
-from settings import PREFIX, DEFAULT_DAILY_REWARD, FISH_CATCH_CHANCE_PERCENTAGE, DAILY_COOLDOWN_HOURS, SHOP_PAGE_SIZE, EMOJIS, GAMBLE_LOSE_COLOR, GAMBLE_WIN_COLOR, DAILY_COLOR, BALANCE_COLOR, INVENTORY_COLOR, LOOT_COLOR, SELL_COLOR, HELP_COLOR, FISH_CHANCES, FISH_ITEMS, DIG_ITEMS, DIG_CHANCES, COOLDOWN_DIG_FISH_MINUTES, BLACK_JACK_SUITS, BLACK_JACK_RANKS, CHOP_NOT_FALL_TREE_CHANCE_PERCENTAGE, CHOP_ITEMS, CHOP_CHANCES, VOICE_REWARD_INTERVAL_MINUTES, VOICE_REWARD_AMOUNT
+import settings
+from settings import PREFIX, DEFAULT_DAILY_REWARD, DAILY_COOLDOWN_HOURS, SHOP_PAGE_SIZE, EMOJIS, GAMBLE_LOSE_COLOR, GAMBLE_WIN_COLOR, DAILY_COLOR, BALANCE_COLOR, INVENTORY_COLOR, LOOT_COLOR, SELL_COLOR, HELP_COLOR, COOLDOWN_DIG_FISH_MINUTES, BLACK_JACK_SUITS, BLACK_JACK_RANKS, VOICE_REWARD_INTERVAL_MINUTES, VOICE_REWARD_AMOUNT
 from src.config.versions import ECONOMY_VERSION
+from src.games import blackjack as bj
+from src.utils import economy_io
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; loot rolls fall back to the random module
+    np = None
 
 # ===================== CONFIG =====================
 DB_PATH = "src/databases/economy.db"
+EXPORT_DIR = "src/databases/exports"  # Archives from `eco admin export` and snapshots taken before imports
+DB_READER_CONNECTIONS = 3      # Read-only connections kept open next to the single writer
+DB_STATEMENT_CACHE_SIZE = 256  # Prepared statements cached per connection by sqlite3
+LOOT_NUMPY_MIN_ATTEMPTS = 64   # Below this many attempts NumPy's call overhead costs more than it saves
+COOLDOWN_FLUSH_SECONDS = 30    # How often new cooldowns are persisted and expired ones evicted
+LEADERBOARD_CACHE_SIZE = 100   # Top balances kept in memory and patched on every balance change
+LEADERBOARD_PAGE_SIZE = 10
+GUILD_LEADERBOARD_TTL = 60     # Seconds a per-guild leaderboard snapshot is reused
+VOICE_SWEEP_SECONDS = 15       # How often listeners are checked and paid in one batch
+VOICE_NOTICES_PER_SWEEP = 10   # Reward DMs sent per sweep; the rest are merged into the next one
+VOICE_NOTICE_SPACING = 0.5     # Seconds between reward DMs
+BALANCE_FLUSH_MS = 1000        # Buffered balance changes are group-committed at least this often
+BALANCE_BUFFER_MAX_USERS = 500 # ...or as soon as this many users have pending changes
+LEDGER_CHECKPOINT_MINUTES = 30 # How often balances touched in the journal are checkpointed
+BLACKJACK_SHOE_DECKS = 4       # Decks in the shared blackjack shoe
+BLACKJACK_PENETRATION = 0.75   # Share of the shoe dealt before it is reshuffled
+
+def utc_timestamp() -> int:
+    return int(time.time())
+
+# ===================== DATABASE =====================
+class EconomyDatabase:
+    """Long-lived connections to the economy database.
+
+    One writer connection serializes every mutation behind an asyncio lock, while a small
+    pool of read-only connections serves lookups concurrently (WAL lets readers run next to
+    the writer). All SQL is passed as constant strings, so sqlite3's per-connection
+    statement cache keeps reusing the prepared statements.
+    """
+
+    PRAGMAS = (
+        # Only takes effect on a new file (before journal_mode writes its header); the Maintenance
+        # cog's `maintenance convert` switches an existing database with one full VACUUM
+        "PRAGMA auto_vacuum = INCREMENTAL",
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -8000",
+        "PRAGMA mmap_size = 67108864",
+        "PRAGMA busy_timeout = 5000",
+    )
+
+    def __init__(self, path: str, readers: int = DB_READER_CONNECTIONS):
+        self.path = path
+        self.readers = max(1, readers)
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self._pool: asyncio.Queue | None = None
+        self._reader_connections: list[aiosqlite.Connection] = []
+        self.stats = Counter()  # reads / transactions / commits / rollbacks since open
+
+    async def _connect(self, read_only: bool = False) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.path, isolation_level=None, cached_statements=DB_STATEMENT_CACHE_SIZE)
+        for pragma in self.PRAGMAS:
+            await db.execute(pragma)
+        if read_only:
+            await db.execute("PRAGMA query_only = ON")
+        return db
+
+    async def open(self):
+        if self._writer is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # The writer goes first so WAL mode is in place before any reader attaches
+        self._writer = await self._connect()
+        self._pool = asyncio.Queue()
+        for _ in range(self.readers):
+            db = await self._connect(read_only=True)
+            self._reader_connections.append(db)
+            self._pool.put_nowait(db)
+        logger.info(f"[ECONOMY] Database opened path={self.path} readers={self.readers}")
+
+    async def close(self):
+        async with self._write_lock:
+            for db in self._reader_connections:
+                try:
+                    await db.close()
+                except Exception as e:
+                    logger.warning(f"[ECONOMY] Failed to close reader connection: {e}")
+            self._reader_connections.clear()
+            self._pool = None
+            if self._writer is not None:
+                try:
+                    await self._writer.execute("PRAGMA optimize")
+                    await self._writer.close()
+                except Exception as e:
+                    logger.warning(f"[ECONOMY] Failed to close writer connection: {e}")
+                self._writer = None
+        logger.info("[ECONOMY] Database closed")
+
+    @contextlib.asynccontextmanager
+    async def _reader(self):
+        db = await self._pool.get()
+        try:
+            yield db
+        finally:
+            self._pool.put_nowait(db)
+
+    async def fetchone(self, sql: str, params: tuple = ()):
+        self.stats["reads"] += 1
+        async with self._reader() as db:
+            async with db.execute(sql, params) as cursor:
+                return await cursor.fetchone()
+
+    async def fetchall(self, sql: str, params: tuple = ()) -> list:
+        self.stats["reads"] += 1
+        async with self._reader() as db:
+            async with db.execute(sql, params) as cursor:
+                return await cursor.fetchall()
+
+    async def execute(self, sql: str, params: tuple = ()) -> int:
+        """Run a single write statement in its own transaction and return the affected row count."""
+        async with self.transaction() as db:
+            async with db.execute(sql, params) as cursor:
+                return cursor.rowcount
+
+    @contextlib.asynccontextmanager
+    async def latest(self):
+        """Hold the writer outside any transaction, for reads that must not race a commit."""
+        async with self._write_lock:
+            self.stats["reads"] += 1
+            yield self._writer
+
+    @contextlib.asynccontextmanager
+    async def exclusive(self):
+        """Hold the write lock while another connection (e.g. a bulk import thread) writes alone."""
+        async with self._write_lock:
+            yield
+
+    @contextlib.asynccontextmanager
+    async def transaction(self):
+        """Hold the writer for one BEGIN IMMEDIATE ... COMMIT block, rolling back on error."""
+        async with self._write_lock:
+            db = self._writer
+            await db.execute("BEGIN IMMEDIATE")
+            self.stats["transactions"] += 1
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                self.stats["rollbacks"] += 1
+                raise
+            else:
+                try:
+                    await db.commit()
+                except BaseException:
+                    # A failed COMMIT (SQLITE_BUSY, disk full) leaves the transaction open
+                    await db.rollback()
+                    self.stats["rollbacks"] += 1
+                    raise
+                self.stats["commits"] += 1
+
+    async def migrate(self, migrations: list[tuple[int, str, tuple[str, ...]]]):
+        """Bring the schema up to date, tracking the applied version in `PRAGMA user_version`.
+
+        Each pending migration runs in its own transaction together with the version bump, so
+        an interrupted upgrade resumes from the last completed step.
+        """
+        for version, description, statements in migrations:
+            async with self.transaction() as db:
+                async with db.execute("PRAGMA user_version") as cursor:
+                    current = (await cursor.fetchone())[0]
+                if version <= current:
+                    continue
+                logger.info(f"[ECONOMY] Migrating database to version {version}: {description}")
+                for statement in statements:
+                    await db.execute(statement)
+                await db.execute(f"PRAGMA user_version = {int(version)}")
+
+    async def checkpoint(self, mode: str = "PASSIVE") -> tuple[int, int, int]:
+        """Run a WAL checkpoint on the writer and return (busy, WAL frames, frames checkpointed)."""
+        async with self._write_lock:
+            async with self._writer.execute(f"PRAGMA wal_checkpoint({mode})") as cursor:
+                return tuple(await cursor.fetchone())
+
+# ===================== MIGRATIONS =====================
+# (version, description, statements). Append new steps; never edit one that has shipped.
+# Databases created before versioning report user_version 0 and replay every step, so each
+# step must also work on a schema that already looks like its result.
+ECONOMY_MIGRATIONS: list[tuple[int, str, tuple[str, ...]]] = [
+    (1, "base schema", (
+        """
+        CREATE TABLE IF NOT EXISTS economy (
+            user_id INTEGER PRIMARY KEY,
+            balance INTEGER DEFAULT 0,
+            last_daily TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS inventory (
+            user_id INTEGER,
+            item TEXT,
+            quantity INTEGER,
+            PRIMARY KEY (user_id, item)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS shop_items (
+            item_id TEXT PRIMARY KEY,
+            name TEXT,
+            price INTEGER
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS cooldowns (
+            user_id INTEGER,
+            command TEXT,
+            last_used INTEGER
+        )
+        """,
+    )),
+    (2, "keyed WITHOUT ROWID cooldowns", (
+        """
+        CREATE TABLE cooldowns_v2 (
+            user_id INTEGER NOT NULL,
+            command TEXT NOT NULL,
+            last_used INTEGER NOT NULL,
+            PRIMARY KEY (user_id, command)
+        ) WITHOUT ROWID
+        """,
+        # Unkeyed tables collected one row per use; keep only the latest per (user, command).
+        # Those rows came from datetime.utcnow().timestamp(), which reads naive UTC as local
+        # time and so is off by the host's UTC offset. SQLite's 'localtime' uses the same C
+        # library conversion, so the current offset is added back to make them real epoch
+        # seconds. Cooldowns last minutes, so only one taken right across a DST switch can be
+        # off, by the DST hour.
+        """
+        INSERT INTO cooldowns_v2 (user_id, command, last_used)
+        SELECT user_id, command,
+               MAX(last_used) + CAST(ROUND((julianday('now', 'localtime') - julianday('now')) * 86400) AS INTEGER)
+        FROM cooldowns
+        WHERE user_id IS NOT NULL AND command IS NOT NULL AND last_used IS NOT NULL
+        GROUP BY user_id, command
+        """,
+        "DROP TABLE cooldowns",
+        "ALTER TABLE cooldowns_v2 RENAME TO cooldowns",
+        "CREATE INDEX idx_cooldowns_last_used ON cooldowns (last_used)",
+    )),
+    (3, "integer epoch last_daily and covering balance index", (
+        """
+        CREATE TABLE economy_v3 (
+            user_id INTEGER PRIMARY KEY,
+            balance INTEGER NOT NULL DEFAULT 0,
+            last_daily INTEGER
+        )
+        """,
+        # last_daily was written as naive UTC datetime.isoformat(), which strftime('%s') parses as UTC
+        """
+        INSERT INTO economy_v3 (user_id, balance, last_daily)
+        SELECT user_id, COALESCE(balance, 0),
+               CASE WHEN typeof(last_daily) = 'integer' THEN last_daily
+                    ELSE CAST(strftime('%s', last_daily) AS INTEGER) END
+        FROM economy
+        """,
+        "DROP TABLE economy",
+        "ALTER TABLE economy_v3 RENAME TO economy",
+        # user_id is the rowid, so this index alone answers leaderboard pages and rank counts
+        "CREATE INDEX idx_economy_balance ON economy (balance DESC, user_id)",
+    )),
+    (4, "WITHOUT ROWID inventory and shop_items", (
+        """
+        CREATE TABLE inventory_v4 (
+            user_id INTEGER NOT NULL,
+            item TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            PRIMARY KEY (user_id, item)
+        ) WITHOUT ROWID
+        """,
+        """
+        INSERT INTO inventory_v4 (user_id, item, quantity)
+        SELECT user_id, item, quantity FROM inventory
+        WHERE user_id IS NOT NULL AND item IS NOT NULL AND quantity > 0
+        """,
+        "DROP TABLE inventory",
+        "ALTER TABLE inventory_v4 RENAME TO inventory",
+        """
+        CREATE TABLE shop_items_v4 (
+            item_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            price INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+        """
+        INSERT INTO shop_items_v4 (item_id, name, price)
+        SELECT item_id, COALESCE(name, item_id), COALESCE(price, 0) FROM shop_items
+        WHERE item_id IS NOT NULL
+        """,
+        "DROP TABLE shop_items",
+        "ALTER TABLE shop_items_v4 RENAME TO shop_items",
+    )),
+    (5, "append-only ledger and balance checkpoints", (
+        # item is NULL for coin rows; balance_after is the coin balance or the item quantity
+        """
+        CREATE TABLE economy_ledger (
+            id INTEGER PRIMARY KEY,
+            ts INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            item TEXT,
+            delta INTEGER NOT NULL,
+            balance_after INTEGER NOT NULL,
+            reason TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX idx_ledger_user ON economy_ledger (user_id, item, id)",
+        """
+        CREATE TABLE economy_checkpoints (
+            user_id INTEGER PRIMARY KEY,
+            ledger_id INTEGER NOT NULL,
+            balance INTEGER NOT NULL,
+            ts INTEGER NOT NULL
+        )
+        """,
+        # Balances from before the ledger existed become each user's starting checkpoint
+        """
+        INSERT INTO economy_checkpoints (user_id, ledger_id, balance, ts)
+        SELECT user_id, 0, balance, CAST(strftime('%s', 'now') AS INTEGER) FROM economy
+        """,
+    )),
+]
+
+# ===================== LOOT =====================
+class LootTable:
+    """Weighted loot roller built once from settings.
+
+    Cumulative weights are precomputed, and `roll(times)` makes every attempt of a command in
+    one batched draw, returning the aggregated item counts.
+    """
+
+    _rng = np.random.default_rng() if np is not None else None
+
+    def __init__(self, items: list[str], weights: list[float], min_drops: int, max_drops: int, success_percent: float = 100):
+        if len(items) != len(weights) or not items:
+            raise ValueError(f"loot table needs one weight per item (got {len(items)} items, {len(weights)} weights)")
+        self.items = [item.lower() for item in items]
+        self.cum_weights = list(itertools.accumulate(weights))
+        self.min_drops = min_drops
+        self.max_drops = max_drops
+        self.success_percent = success_percent
+        if np is not None:
+            self._probabilities = np.asarray(weights, dtype=float) / self.cum_weights[-1]
+
+    def roll(self, times: int) -> Counter:
+        if np is not None and times >= LOOT_NUMPY_MIN_ATTEMPTS:
+            return self._roll_numpy(times)
+        if self.success_percent >= 100:
+            attempts = times
+        else:
+            attempts = sum(1 for _ in range(times) if random.randint(1, 100) <= self.success_percent)
+        draws = sum(random.randint(self.min_drops, self.max_drops) for _ in range(attempts))
+        return Counter(random.choices(self.items, cum_weights=self.cum_weights, k=draws))
+
+    def _roll_numpy(self, times: int) -> Counter:
+        rng = self._rng
+        if self.success_percent >= 100:
+            attempts = times
+        else:
+            attempts = int(np.count_nonzero(rng.integers(1, 101, size=times) <= self.success_percent))
+        draws = int(rng.integers(self.min_drops, self.max_drops + 1, size=attempts).sum())
+        counts = np.bincount(rng.choice(len(self.items), size=draws, p=self._probabilities), minlength=len(self.items))
+        return Counter({item: int(count) for item, count in zip(self.items, counts) if count})
+
+def build_loot_tables() -> dict[str, LootTable]:
+    """Read the loot settings from the (possibly reloaded) settings module."""
+    return {
+        "dig": LootTable(settings.DIG_ITEMS, settings.DIG_CHANCES, 0, 5),
+        "chop": LootTable(settings.CHOP_ITEMS, settings.CHOP_CHANCES, 0, 5, 100 - settings.CHOP_NOT_FALL_TREE_CHANCE_PERCENTAGE),
+        "fish": LootTable(settings.FISH_ITEMS, settings.FISH_CHANCES, 1, 2, settings.FISH_CATCH_CHANCE_PERCENTAGE),
+    }
+
+# ===================== COOLDOWNS =====================
+class CooldownStore:
+    """Write-through in-memory cooldowns keyed by (user_id, command).
+
+    Checks are dict lookups with no disk I/O. Changes are queued and persisted in one batch
+    by `flush()` (run periodically and on unload), so cooldowns survive restarts. Entries are
+    evicted once their TTL has passed.
+    """
+
+    def __init__(self, default_ttl: int):
+        self.default_ttl = default_ttl
+        self.max_ttl = default_ttl
+        self._entries: dict[tuple[int, str], tuple[int, int]] = {}  # key -> (last_used, expires_at)
+        self._dirty: set[tuple[int, str]] = set()
+        self._deleted: set[tuple[int, str]] = set()
+        self._cleared_users: set[int] = set()
+
+    async def load(self, db: "EconomyDatabase"):
+        now = utc_timestamp()
+        rows = await db.fetchall(
+            "SELECT user_id, command, last_used FROM cooldowns WHERE last_used > ?",
+            (now - self.max_ttl,),
+        )
+        self._entries = {(user_id, command): (last_used, last_used + self.default_ttl) for user_id, command, last_used in rows}
+        logger.info(f"[ECONOMY] Loaded {len(self._entries)} active cooldowns")
+
+    def get(self, user_id: int, command: str) -> int:
+        entry = self._entries.get((user_id, command))
+        return entry[0] if entry else 0
+
+    def set(self, user_id: int, command: str, ttl: int | None = None, now: int | None = None) -> int:
+        ttl = ttl or self.default_ttl
+        now = now or utc_timestamp()
+        key = (user_id, command)
+        self.max_ttl = max(self.max_ttl, ttl)
+        self._entries[key] = (now, now + ttl)
+        self._dirty.add(key)
+        self._deleted.discard(key)
+        return now
+
+    def delete(self, user_id: int, command: str):
+        key = (user_id, command)
+        self._entries.pop(key, None)
+        self._dirty.discard(key)
+        self._deleted.add(key)
+
+    def clear_user(self, user_id: int):
+        for key in [key for key in self._entries if key[0] == user_id]:
+            del self._entries[key]
+        self._dirty = {key for key in self._dirty if key[0] != user_id}
+        self._deleted = {key for key in self._deleted if key[0] != user_id}
+        self._cleared_users.add(user_id)
+
+    def evict_expired(self, now: int | None = None) -> int:
+        now = now or utc_timestamp()
+        expired = [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+    async def flush(self, db: "EconomyDatabase"):
+        if not (self._dirty or self._deleted or self._cleared_users):
+            return
+        # Swap the pending sets out first so changes made while we await land in the next flush
+        dirty, self._dirty = self._dirty, set()
+        deleted, self._deleted = self._deleted, set()
+        cleared, self._cleared_users = self._cleared_users, set()
+        upserts = [(user_id, command, self._entries[(user_id, command)][0]) for user_id, command in dirty if (user_id, command) in self._entries]
+        async with db.transaction() as conn:
+            if cleared:
+                await conn.executemany("DELETE FROM cooldowns WHERE user_id = ?", [(user_id,) for user_id in cleared])
+            if deleted:
+                await conn.executemany("DELETE FROM cooldowns WHERE user_id = ? AND command = ?", list(deleted))
+            if upserts:
+                await conn.executemany(
+                    "INSERT INTO cooldowns (user_id, command, last_used) VALUES (?, ?, ?) "
+                    "ON CONFLICT(user_id, command) DO UPDATE SET last_used = excluded.last_used",
+                    upserts,
+                )
+            await conn.execute("DELETE FROM cooldowns WHERE last_used <= ?", (utc_timestamp() - self.max_ttl,))
+        logger.debug(f"[ECONOMY] Cooldowns flushed upserts={len(upserts)} deletes={len(deleted)} cleared_users={len(cleared)}")
+
+# ===================== LEADERBOARD =====================
+class LeaderboardCache:
+    """The top `size` balances, kept sorted in memory and patched as balances change.
+
+    Rows are ordered like `ORDER BY balance DESC, user_id`. A change that could let a user
+    outside the cache overtake the cutoff drops the cache, and the next read reloads it from
+    the balance index.
+    """
+
+    def __init__(self, size: int = LEADERBOARD_CACHE_SIZE):
+        self.size = size
+        self._keys: list[tuple[int, int]] | None = None  # sorted (-balance, user_id)
+        self._balances: dict[int, int] = {}
+        self.generation = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._keys is not None
+
+    @property
+    def complete(self) -> bool:
+        """True when the cache holds every row of the table (fewer rows than `size`)."""
+        return self._keys is not None and len(self._keys) < self.size
+
+    def load(self, rows: list[tuple[int, int]]):
+        self._balances = {user_id: balance for user_id, balance in rows}
+        self._keys = sorted((-balance, user_id) for user_id, balance in rows)
+
+    def invalidate(self):
+        self._keys = None
+        self._balances = {}
+
+    def observe(self, user_id: int, balance: int):
+        self.generation += 1
+        if self._keys is None:
+            return
+        new_key = (-balance, user_id)
+        full = len(self._keys) >= self.size
+        boundary = self._keys[-1] if self._keys else None
+        old_balance = self._balances.get(user_id)
+        if old_balance is not None:
+            if full and new_key > boundary:
+                # Users outside the cache may now rank above this one
+                return self.invalidate()
+            self._remove(user_id, old_balance)
+            self._insert(user_id, balance)
+        elif not full or new_key < boundary:
+            self._insert(user_id, balance)
+            if len(self._keys) > self.size:
+                _, dropped = self._keys.pop()
+                del self._balances[dropped]
+
+    def forget(self, user_id: int):
+        self.generation += 1
+        if self._keys is None or user_id not in self._balances:
+            return
+        if len(self._keys) >= self.size:
+            return self.invalidate()
+        self._remove(user_id, self._balances[user_id])
+
+    def _insert(self, user_id: int, balance: int):
+        bisect.insort(self._keys, (-balance, user_id))
+        self._balances[user_id] = balance
+
+    def _remove(self, user_id: int, balance: int):
+        index = bisect.bisect_left(self._keys, (-balance, user_id))
+        del self._keys[index]
+        del self._balances[user_id]
+
+    def rows(self, offset: int, limit: int) -> list[tuple[int, int]]:
+        return [(user_id, -neg_balance) for neg_balance, user_id in self._keys[offset:offset + limit]]
+
+    def rank(self, user_id: int) -> int | None:
+        balance = self._balances.get(user_id)
+        if balance is None:
+            return None
+        return bisect.bisect_left(self._keys, (-balance, user_id)) + 1
+
+# ===================== SHOP CATALOG =====================
+class ShopCatalog:
+    """In-memory copy of `shop_items`, loaded once and patched by the admin shop commands.
+
+    `version` is bumped on every change; the page embeds for `ShopView` are rebuilt lazily
+    the first time they are asked for at a new version.
+    """
+
+    def __init__(self):
+        self.items: dict[str, dict] = {}
+        self.version = 0
+        self._pages: list[discord.Embed] = []
+        self._pages_version = -1
+
+    async def load(self, db: EconomyDatabase):
+        rows = await db.fetchall("SELECT item_id, name, price FROM shop_items ORDER BY item_id")
+        self.items = {item_id: {"name": name, "price": price} for item_id, name, price in rows}
+        self.version += 1
+        logger.info(f"[ECONOMY] Shop catalog loaded -> {len(self.items)} items (version {self.version})")
+
+    def get(self, item_id: str) -> dict | None:
+        return self.items.get(item_id)
+
+    def put(self, item_id: str, name: str, price: int):
+        self.items[item_id] = {"name": name, "price": price}
+        self.version += 1
+
+    def remove(self, item_id: str) -> bool:
+        if self.items.pop(item_id, None) is None:
+            return False
+        self.version += 1
+        return True
+
+    @staticmethod
+    def sell_price(item: dict) -> int:
+        return item["price"] if item["price"] <= 1 else item["price"] // 2
+
+    def pages(self) -> list[discord.Embed]:
+        if self._pages_version != self.version:
+            entries = sorted(self.items.items())
+            chunks = [entries[i:i + SHOP_PAGE_SIZE] for i in range(0, len(entries), SHOP_PAGE_SIZE)]
+            self._pages = []
+            for number, chunk in enumerate(chunks, start=1):
+                embed = discord.Embed(title="🛒 Shop", color=BALANCE_COLOR)
+                for item_id, data in chunk:
+                    emoji = EMOJIS.get(item_id, "")
+                    embed.add_field(name=f"{emoji} {data['name']} (`{item_id}`)", value=f"Price: {data['price']} coins", inline=False)
+                embed.set_footer(text=f"Page {number}/{len(chunks)} | {PREFIX}economy buy <item_id> <amount> | Version: {ECONOMY_VERSION}")
+                self._pages.append(embed)
+            self._pages_version = self.version
+        return self._pages
+
+# ===================== WRITE-BEHIND =====================
+class BalanceBuffer:
+    """Per-user balance deltas waiting to be group-committed.
+
+    Only callers that opt in (`Economy.buffer_balance`) go through here. Pending deltas are
+    applied at the start of the next `Economy.tx()`, so strict operations always see them.
+    Drained deltas stay "in flight" until their transaction has finished, which tells
+    `get_balance` that the user's committed balance may be about to change.
+    """
+
+    def __init__(self):
+        self._pending: dict[int, int] = {}
+        self._inflight: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, user_id: int, delta: int) -> int:
+        self._pending[user_id] = self._pending.get(user_id, 0) + delta
+        return len(self._pending)
+
+    def has(self, user_id: int) -> bool:
+        return user_id in self._pending or user_id in self._inflight
+
+    def pending(self, user_id: int) -> int:
+        return self._pending.get(user_id, 0)
+
+    def drain(self) -> dict[int, int]:
+        self._inflight, self._pending = self._pending, {}
+        return self._inflight
+
+    def settle(self):
+        self._inflight = {}
+
+    def restore(self, pending: dict[int, int]):
+        """Put drained deltas back after a failed commit."""
+        for user_id, delta in pending.items():
+            self.add(user_id, delta)
+
+# ===================== LOCKS =====================
+class UserLocks:
+    """Per-user asyncio locks, created on demand and dropped once nobody holds a reference.
+
+    `hold()` takes several users' locks in ascending user id order, so two commands locking
+    the same pair of users can never wait on each other.
+    """
+
+    def __init__(self):
+        self._locks: weakref.WeakValueDictionary[int, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def get(self, user_id: int) -> asyncio.Lock:
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        return lock
+
+    @contextlib.asynccontextmanager
+    async def hold(self, *user_ids: int):
+        locks = [self.get(user_id) for user_id in sorted(set(user_ids))]
+        async with contextlib.AsyncExitStack() as stack:
+            for lock in locks:
+                await stack.enter_async_context(lock)
+            yield
+
+def locks_user(param: str | None = None):
+    """Run a cog command while holding one user's `Economy.user_locks` entry.
+
+    The lock belongs to the invoking user, or to the user passed as `param` (admin commands
+    acting on a member). Commands for different users still run concurrently.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, ctx, *args, **kwargs):
+            if param is None:
+                user_id = ctx.author.id
+            else:
+                user_id = signature.bind(self, ctx, *args, **kwargs).arguments[param].id
+            async with self.user_locks.hold(user_id):
+                return await func(self, ctx, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# ===================== LEDGER =====================
+class EconomyError(Exception):
+    """Base error for economy mutations that were rejected and rolled back."""
+
+class InsufficientFunds(EconomyError):
+    def __init__(self, user_id: int, amount: int):
+        super().__init__(f"user {user_id} cannot pay {amount} coins")
+        self.user_id = user_id
+        self.amount = amount
+
+class InsufficientItems(EconomyError):
+    def __init__(self, user_id: int, item: str, qty: int):
+        super().__init__(f"user {user_id} does not have {qty} x {item}")
+        self.user_id = user_id
+        self.item = item
+        self.qty = qty
+
+class EconomyTransaction:
+    """Balance and inventory mutations issued on the writer inside one economy transaction.
+
+    Every method is a single mutation; strict operations (`debit`, `remove_item`) raise an
+    `EconomyError`, which rolls back everything done so far in the `Economy.tx()` block.
+    Each change also appends one row to `economy_ledger` in the same transaction, tagged
+    with `reason`.
+    """
+
+    CREDIT_SQL = (
+        "INSERT INTO economy (user_id, balance) VALUES (?1, max(0, ?2)) "
+        "ON CONFLICT(user_id) DO UPDATE SET balance = max(0, balance + ?2) RETURNING balance"
+    )
+    DEBIT_SQL = "UPDATE economy SET balance = balance - ?1 WHERE user_id = ?2 AND balance >= ?1 RETURNING balance"
+    ADD_ITEM_SQL = (
+        "INSERT INTO inventory (user_id, item, quantity) VALUES (?, ?, ?) "
+        "ON CONFLICT(user_id, item) DO UPDATE SET quantity = quantity + excluded.quantity"
+    )
+    TAKE_ITEM_SQL = (
+        "UPDATE inventory SET quantity = quantity - ?1 "
+        "WHERE user_id = ?2 AND item = ?3 AND quantity >= ?1 RETURNING quantity"
+    )
+    DELETE_EMPTY_ITEM_SQL = "DELETE FROM inventory WHERE user_id = ? AND item = ? AND quantity <= 0"
+    LEDGER_SQL = (
+        "INSERT INTO economy_ledger (ts, user_id, item, delta, balance_after, reason) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    )
+    # executemany cannot return rows, so batched item adds read the new quantity back here
+    LEDGER_ITEM_SQL = (
+        "INSERT INTO economy_ledger (ts, user_id, item, delta, balance_after, reason) "
+        "SELECT ?1, user_id, item, ?2, quantity, ?3 FROM inventory WHERE user_id = ?4 AND item = ?5"
+    )
+
+    def __init__(self, db: aiosqlite.Connection, reason: str = ""):
+        self.db = db
+        self.reason = reason or "unspecified"
+        self.ts = utc_timestamp()
+        self.balances: dict[int, int] = {}  # user_id -> balance after this transaction
+
+    async def _journal(self, user_id: int, item: str | None, delta: int, after: int):
+        await self.db.execute(self.LEDGER_SQL, (self.ts, user_id, item, delta, after, self.reason))
+
+    async def credit(self, user_id: int, amount: int) -> int:
+        """Add `amount` (may be negative) to a balance, clamping at 0. Returns the new balance."""
+        async with self.db.execute(self.CREDIT_SQL, (user_id, amount)) as cursor:
+            row = await cursor.fetchone()
+        self.balances[user_id] = row[0]
+        if amount:
+            await self._journal(user_id, None, amount, row[0])
+        return row[0]
+
+    async def debit(self, user_id: int, amount: int) -> int:
+        """Take `amount` coins or raise InsufficientFunds. Returns the new balance."""
+        if amount <= 0:
+            return await self.credit(user_id, 0)
+        async with self.db.execute(self.DEBIT_SQL, (amount, user_id)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            raise InsufficientFunds(user_id, amount)
+        self.balances[user_id] = row[0]
+        await self._journal(user_id, None, -amount, row[0])
+        return row[0]
+
+    async def transfer(self, from_user: int, to_user: int, amount: int):
+        await self.debit(from_user, amount)
+        await self.credit(to_user, amount)
+
+    async def add_item(self, user_id: int, item: str, qty: int = 1):
+        await self.add_items(user_id, {item: qty})
+
+    async def add_items(self, user_id: int, items: dict[str, int]):
+        """Add several items at once with a single executemany UPSERT."""
+        rows = [(user_id, item.lower(), qty) for item, qty in items.items() if qty > 0]
+        if rows:
+            await self.db.executemany(self.ADD_ITEM_SQL, rows)
+            await self.db.executemany(self.LEDGER_ITEM_SQL, [(self.ts, qty, self.reason, user_id, item) for user_id, item, qty in rows])
+
+    async def remove_item(self, user_id: int, item: str, qty: int = 1) -> int:
+        """Take `qty` of an item or raise InsufficientItems. Returns the remaining quantity."""
+        item = item.lower()
+        async with self.db.execute(self.TAKE_ITEM_SQL, (qty, user_id, item)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            raise InsufficientItems(user_id, item, qty)
+        if row[0] <= 0:
+            await self.db.execute(self.DELETE_EMPTY_ITEM_SQL, (user_id, item))
+        await self._journal(user_id, item, -qty, row[0])
+        return row[0]
+
+    async def move_item(self, from_user: int, to_user: int, item: str, qty: int = 1):
+        await self.remove_item(from_user, item, qty)
+        await self.add_item(to_user, item, qty)
+
+    async def clear_inventory(self, user_id: int):
+        async with self.db.execute("DELETE FROM inventory WHERE user_id = ? RETURNING item, quantity", (user_id,)) as cursor:
+            removed = await cursor.fetchall()
+        for item, qty in removed:
+            await self._journal(user_id, item, -qty, 0)
+
+    async def reset_user(self, user_id: int):
+        """Delete a user's balance row and inventory, journaling what was removed."""
+        await self.clear_inventory(user_id)
+        async with self.db.execute("DELETE FROM economy WHERE user_id = ? RETURNING balance", (user_id,)) as cursor:
+            row = await cursor.fetchone()
+        if row and row[0]:
+            await self._journal(user_id, None, -row[0], 0)
+
+    async def restore_balance(self, user_id: int, amount: int):
+        """Overwrite a stored balance with the journal's value (a zero-delta ledger row)."""
+        await self.db.execute(
+            "INSERT INTO economy (user_id, balance) VALUES (?1, ?2) ON CONFLICT(user_id) DO UPDATE SET balance = ?2",
+            (user_id, amount),
+        )
+        self.balances[user_id] = amount
+        await self._journal(user_id, None, 0, amount)
+
+    async def restore_item(self, user_id: int, item: str, qty: int):
+        """Overwrite a stored item quantity with the journal's value (a zero-delta ledger row)."""
+        if qty > 0:
+            await self.db.execute(
+                "INSERT INTO inventory (user_id, item, quantity) VALUES (?1, ?2, ?3) "
+                "ON CONFLICT(user_id, item) DO UPDATE SET quantity = ?3",
+                (user_id, item, qty),
+            )
+        else:
+            await self.db.execute("DELETE FROM inventory WHERE user_id = ? AND item = ?", (user_id, item))
+        await self._journal(user_id, item, 0, qty)
+
+    async def get_last_daily(self, user_id: int) -> int | None:
+        async with self.db.execute("SELECT last_daily FROM economy WHERE user_id = ?", (user_id,)) as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else None
+
+    async def set_balance(self, user_id: int, amount: int) -> int:
+        async with self.db.execute("SELECT balance FROM economy WHERE user_id = ?", (user_id,)) as cursor:
+            row = await cursor.fetchone()
+        await self.db.execute(
+            "INSERT INTO economy (user_id, balance) VALUES (?1, ?2) ON CONFLICT(user_id) DO UPDATE SET balance = ?2",
+            (user_id, amount),
+        )
+        self.balances[user_id] = amount
+        await self._journal(user_id, None, amount - (row[0] if row else 0), amount)
+        return amount
+
+    async def set_last_daily(self, user_id: int, value: int | None):
+        await self.db.execute(
+            "INSERT INTO economy (user_id, balance, last_daily) VALUES (?1, 0, ?2) "
+            "ON CONFLICT(user_id) DO UPDATE SET last_daily = ?2",
+            (user_id, value),
+        )
 
 # ===================== ECONOMY COG =====================
 class Economy(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, db_path: str = DB_PATH):
         self.bot = bot
-        self.voice_sessions = {}
+        self.db = EconomyDatabase(db_path)
+        self.loot_tables = build_loot_tables()
+        self.cooldowns = CooldownStore(COOLDOWN_DIG_FISH_MINUTES * 60)
+        self.leaderboard_cache = LeaderboardCache()
+        self.shop_catalog = ShopCatalog()
+        self.user_locks = UserLocks()
+        self.balance_buffer = BalanceBuffer()
+        self.blackjack_shoe = bj.Shoe(BLACKJACK_SHOE_DECKS, BLACKJACK_PENETRATION)
+        self._balance_flush_task: asyncio.Task | None = None
+        self.ledger_checkpoint_id = 0  # journal id covered by the latest checkpoint run
+        self.guild_leaderboards: dict[int, tuple[float, list[tuple[int, int]]]] = {}
+        self.voice_sessions: dict[tuple[int, int], tuple[int, float]] = {}  # (guild, user) -> (channel, next reward at)
+        self.voice_notices: dict[tuple[int, int], int] = {}  # (guild, user) -> coins not yet announced
         self.voice_reward_interval_minutes = VOICE_REWARD_INTERVAL_MINUTES
         self.voice_reward_amount = VOICE_REWARD_AMOUNT
 
     async def initialize_database(self):
         logger.info("[ECONOMY] Initializing database")
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS economy (
-                    user_id INTEGER PRIMARY KEY,
-                    balance INTEGER DEFAULT 0,
-                    last_daily TEXT
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS inventory (
-                    user_id INTEGER,
-                    item TEXT,
-                    quantity INTEGER,
-                    PRIMARY KEY (user_id, item)
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS shop_items (
-                    item_id TEXT PRIMARY KEY,
-                    name TEXT,
-                    price INTEGER
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS cooldowns (
-                    user_id INTEGER,
-                    command TEXT,
-                    last_used INTEGER
-                )
-            """)
-
-            
-            await db.commit()
+        await self.db.migrate(ECONOMY_MIGRATIONS)
         logger.debug("[ECONOMY] Database schema ensured")
 
     # ================= INITIALIZATION =================
     async def cog_load(self):
         logger.info("[ECONOMY] Cog load started")
+        await self.db.open()
         await self.initialize_database()
+        await self.cooldowns.load(self.db)
+        await self.shop_catalog.load(self.db)
+        row = await self.db.fetchone("SELECT COALESCE(MAX(ledger_id), 0) FROM economy_checkpoints")
+        self.ledger_checkpoint_id = row[0]
+        self.cooldown_flusher.start()
+        self.balance_flusher.start()
+        self.ledger_checkpointer.start()
+        self.voice_sweeper.start()
         logger.info("[ECONOMY] Cog load finished and database initialized")
 
-    def cog_unload(self):
-        sessions = list(self.voice_sessions.values())
+    async def cog_unload(self):
+        self.voice_sweeper.cancel()
         self.voice_sessions.clear()
-        for session in sessions:
-            try:
-                session["task"].cancel()
-            except Exception:
-                pass
+        self.cooldown_flusher.cancel()
+        self.balance_flusher.cancel()
+        self.ledger_checkpointer.cancel()
+        if self._balance_flush_task:
+            await asyncio.gather(self._balance_flush_task, return_exceptions=True)
+        await self.flush_balances()
+        if self.balance_buffer:
+            logger.error(f"[ECONOMY] {len(self.balance_buffer)} buffered balance changes could not be saved on unload")
+        try:
+            await self.cooldowns.flush(self.db)
+        except Exception as e:
+            logger.error(f"[ECONOMY] Failed to persist cooldowns on unload: {e}")
+        await self.db.close()
+
+    @tasks.loop(seconds=BALANCE_FLUSH_MS / 1000)
+    async def balance_flusher(self):
+        await self.flush_balances()
+
+    async def flush_balances(self):
+        """Group-commit every buffered balance change in one transaction."""
+        if not self.balance_buffer:
+            return
+        count = len(self.balance_buffer)
+        try:
+            async with self.tx("buffered"):
+                pass  # tx() applies the pending deltas
+        except Exception as e:
+            logger.error(f"[ECONOMY] Failed to flush {count} buffered balance changes: {e}")
+            return
+        logger.debug(f"[ECONOMY] Flushed buffered balances for {count} users")
+
+    @tasks.loop(minutes=LEDGER_CHECKPOINT_MINUTES)
+    async def ledger_checkpointer(self):
+        try:
+            await self.checkpoint_ledger()
+        except Exception as e:
+            logger.error(f"[ECONOMY] Ledger checkpoint failed: {e}")
+
+    async def checkpoint_ledger(self) -> int:
+        """Snapshot the balance of every user with coin journal rows since the last checkpoint.
+
+        Replaying a user's history then only needs the rows after their checkpoint.
+        """
+        async with self.db.transaction() as db:
+            async with db.execute("SELECT COALESCE(MAX(id), 0) FROM economy_ledger") as cursor:
+                head = (await cursor.fetchone())[0]
+            if head <= self.ledger_checkpoint_id:
+                return 0
+            async with db.execute(
+                "INSERT INTO economy_checkpoints (user_id, ledger_id, balance, ts) "
+                "SELECT user_id, ?1, balance, ?2 FROM economy "
+                "WHERE user_id IN (SELECT user_id FROM economy_ledger WHERE id > ?3 AND item IS NULL) "
+                "ON CONFLICT(user_id) DO UPDATE SET ledger_id = excluded.ledger_id, balance = excluded.balance, ts = excluded.ts",
+                (head, utc_timestamp(), self.ledger_checkpoint_id),
+            ) as cursor:
+                count = cursor.rowcount
+        self.ledger_checkpoint_id = head
+        logger.info(f"[ECONOMY] Ledger checkpoint at #{head} -> {count} balances")
+        return count
+
+    async def reconcile_user(self, user_id: int) -> dict:
+        """Replay a user's journal and compare it with the stored balance and inventory.
+
+        Coins replay from the user's checkpoint; items compare the last journaled quantity of
+        every item the journal has seen. Nothing is modified.
+        """
+        await self.flush_balances()
+        async with self.db.latest() as db:
+            async with db.execute("SELECT ledger_id, balance FROM economy_checkpoints WHERE user_id = ?", (user_id,)) as cursor:
+                checkpoint = await cursor.fetchone() or (0, 0)
+            async with db.execute(
+                "SELECT id, delta, balance_after FROM economy_ledger WHERE user_id = ? AND item IS NULL AND id > ? ORDER BY id",
+                (user_id, checkpoint[0]),
+            ) as cursor:
+                rows = await cursor.fetchall()
+            async with db.execute("SELECT balance FROM economy WHERE user_id = ?", (user_id,)) as cursor:
+                row = await cursor.fetchone()
+            async with db.execute(
+                "SELECT item, balance_after FROM economy_ledger WHERE id IN "
+                "(SELECT MAX(id) FROM economy_ledger WHERE user_id = ? AND item IS NOT NULL GROUP BY item)",
+                (user_id,),
+            ) as cursor:
+                journal_items = dict(await cursor.fetchall())
+            async with db.execute("SELECT item, quantity FROM inventory WHERE user_id = ?", (user_id,)) as cursor:
+                inventory = dict(await cursor.fetchall())
+
+        expected = checkpoint[1]
+        first_bad = None
+        for ledger_id, delta, balance_after in rows:
+            # Credits clamp at 0 exactly like CREDIT_SQL does
+            expected = max(0, expected + delta)
+            if expected != balance_after and first_bad is None:
+                first_bad = ledger_id
+            expected = balance_after
+        items = {
+            item: (qty, inventory.get(item, 0))
+            for item, qty in journal_items.items()
+            if qty != inventory.get(item, 0)
+        }
+        return {
+            "checkpoint": checkpoint[0],
+            "replayed": len(rows),
+            "expected": expected,
+            "actual": row[0] if row else 0,
+            "first_bad": first_bad,
+            "items": items,
+        }
+
+    async def export_economy(self, fmt: str = "ndjson") -> tuple[str, dict[str, int]]:
+        """Dump every economy table to an archive in EXPORT_DIR and return (path, rows per table)."""
+        await self.flush_balances()
+        await self.cooldowns.flush(self.db)
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        path = os.path.join(EXPORT_DIR, f"economy-{utc_timestamp()}-{fmt}.zip")
+        started = time.perf_counter()
+        counts = await asyncio.to_thread(economy_io.export_archive, self.db.path, path, fmt)
+        logger.info(f"[ECONOMY] Exported {counts} to {path} in {time.perf_counter() - started:.2f}s")
+        return path, counts
+
+    async def import_economy(self, archive_path: str) -> tuple[str, dict[str, int]]:
+        """Replace the tables found in an archive and return (pre-import snapshot, rows per table).
+
+        The archive is parsed and staged while commands keep running; the cog's writer is only
+        locked for the snapshot and the table swap. Every cache backed by the replaced tables
+        is reloaded afterwards.
+        """
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        backup = os.path.join(EXPORT_DIR, f"economy-before-import-{utc_timestamp()}.db")
+        started = time.perf_counter()
+        staged = await asyncio.to_thread(economy_io.stage_archive, self.db.path, archive_path)
+        try:
+            # Flushed after staging so changes made while the archive was parsed are journaled too
+            await self.flush_balances()
+            await self.cooldowns.flush(self.db)
+            async with self.db.exclusive():
+                await asyncio.to_thread(economy_io.snapshot, self.db.path, backup)
+                counts = await asyncio.to_thread(staged.apply)
+        finally:
+            await asyncio.to_thread(staged.close)
+        await self.cooldowns.load(self.db)
+        await self.shop_catalog.load(self.db)
+        self.leaderboard_cache.invalidate()
+        self.guild_leaderboards.clear()
+        logger.info(f"[ECONOMY] Imported {counts} from {archive_path} in {time.perf_counter() - started:.2f}s (snapshot {backup})")
+        return backup, counts
+
+    @tasks.loop(seconds=COOLDOWN_FLUSH_SECONDS)
+    async def cooldown_flusher(self):
+        try:
+            await self.cooldowns.flush(self.db)
+        except Exception as e:
+            logger.error(f"[ECONOMY] Failed to persist cooldowns: {e}")
+        evicted = self.cooldowns.evict_expired()
+        if evicted:
+            logger.debug(f"[ECONOMY] Evicted {evicted} expired cooldowns")
 
     def stop_voice_session(self, member: discord.Member):
-        key = (member.guild.id, member.id)
-        session = self.voice_sessions.pop(key, None)
-        if session:
-            try:
-                session["task"].cancel()
-            except Exception:
-                pass
+        self.voice_sessions.pop((member.guild.id, member.id), None)
 
     def start_voice_session(self, member: discord.Member, channel: discord.VoiceChannel):
         if member.bot:
             return
         key = (member.guild.id, member.id)
         existing = self.voice_sessions.get(key)
-        if existing and not existing["task"].done() and existing["channel_id"] == channel.id:
+        if existing and existing[0] == channel.id:
             return
-        if existing:
-            try:
-                existing["task"].cancel()
-            except Exception:
-                pass
-        task = asyncio.create_task(self._voice_reward_loop(member))
-        self.voice_sessions[key] = {"channel_id": channel.id, "task": task}
-
-    async def _voice_reward_loop(self, member: discord.Member):
+        self.voice_sessions[key] = (channel.id, time.monotonic() + self.voice_reward_interval_minutes * 60)
+
+    def _is_listening(self, guild_id: int, user_id: int, channel_id: int) -> discord.Member | None:
+        guild = self.bot.get_guild(guild_id)
+        if not guild or not guild.voice_client or not guild.voice_client.channel:
+            return None
+        member = guild.get_member(user_id)
+        if not member or not member.voice or not member.voice.channel:
+            return None
+        if member.voice.channel.id != channel_id or channel_id != guild.voice_client.channel.id:
+            return None
+        return member
+
+    @tasks.loop(seconds=VOICE_SWEEP_SECONDS)
+    async def voice_sweeper(self):
+        if self.voice_sessions:
+            await self._pay_voice_rewards()
+        if self.voice_notices:
+            await self._send_voice_notices()
+
+    async def _pay_voice_rewards(self):
+        now = time.monotonic()
         interval = self.voice_reward_interval_minutes * 60
-        while True:
-            try:
-                await asyncio.sleep(interval)
-            except asyncio.CancelledError:
-                break
-            voice_client = next((vc for vc in self.bot.voice_clients if vc.guild == member.guild), None)
-            if not voice_client or not member.voice or not member.voice.channel or member.voice.channel.id != voice_client.channel.id:
-                break
-            await self.update_balance(member.id, self.voice_reward_amount)
+        payouts = Counter()
+        paid = []
+        for key, (channel_id, due_at) in list(self.voice_sessions.items()):
+            if due_at > now:
+                continue
+            if not self._is_listening(*key, channel_id):
+                del self.voice_sessions[key]
+                continue
+            periods = 1 + int((now - due_at) // interval)
+            payouts[key[1]] += periods * self.voice_reward_amount
+            paid.append((key, channel_id, due_at + periods * interval, periods * self.voice_reward_amount))
+        if not payouts:
+            return
+        for user_id, amount in payouts.items():
+            self.buffer_balance(user_id, amount)
+        for key, channel_id, next_due, amount in paid:
+            if key in self.voice_sessions:
+                self.voice_sessions[key] = (channel_id, next_due)
+            self.voice_notices[key] = self.voice_notices.get(key, 0) + amount
+        logger.info(f"[ECONOMY] Voice rewards paid to {len(payouts)} users ({sum(payouts.values())} coins)")
+
+    async def _send_voice_notices(self):
+        batch = list(itertools.islice(self.voice_notices.items(), VOICE_NOTICES_PER_SWEEP))
+        for key, amount in batch:
+            del self.voice_notices[key]
+            guild = self.bot.get_guild(key[0])
+            member = guild.get_member(key[1]) if guild else None
+            if not member:
+                continue
             try:
-                await member.send(f"🎉 You received `{self.voice_reward_amount}` coins for listening to music!")
+                await member.send(f"🎉 You received `{amount}` coins for listening to music!")
             except discord.Forbidden:
-                channel = member.voice.channel
-                await channel.send(f"🎉 {member.mention} received `{self.voice_reward_amount}` coins for listening to music!", delete_after=120)
+                if member.voice and member.voice.channel:
+                    try:
+                        await member.voice.channel.send(f"🎉 {member.mention} received `{amount}` coins for listening to music!", delete_after=120)
+                    except Exception as e:
+                        logger.warning(f"[ECONOMY] Failed to announce {member.name} ({member.id}) about voice reward: {e}")
             except Exception as e:
                 logger.warning(f"[ECONOMY] Failed to announce {member.name} ({member.id}) about voice reward: {e}")
-        self.voice_sessions.pop((member.guild.id, member.id), None)
-        interval = self.voice_reward_interval_minutes * 60
-        while True:
-            try:
-                await asyncio.sleep(interval)
-            except asyncio.CancelledError:
-                break
-            voice_client = next((vc for vc in self.bot.voice_clients if vc.guild == member.guild), None)
-            if not voice_client or not member.voice or not member.voice.channel or member.voice.channel.id != voice_client.channel.id:
-                break
-            await self.update_balance(member.id, self.voice_reward_amount)
-        self.voice_sessions.pop((member.guild.id, member.id), None)
+            await asyncio.sleep(VOICE_NOTICE_SPACING)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
         voice_client = next((vc for vc in self.bot.voice_clients if vc.guild == member.guild), None)
 
         if member.id == self.bot.user.id:
-            for (guild_id, user_id), session in list(self.voice_sessions.items()):
+            for guild_id, user_id in list(self.voice_sessions):
                 if guild_id == member.guild.id:
-                    try:
-                        session["task"].cancel()
-                    except Exception:
-                        pass
                     del self.voice_sessions[(guild_id, user_id)]
             if after.channel:
                 for m in after.channel.members:
@@ -150,39 +1155,34 @@ class Economy(commands.Cog):
         else:
             self.stop_voice_session(member)
 
+    @commands.Cog.listener()
+    async def on_settings_reload(self):
+        try:
+            self.loot_tables = build_loot_tables()
+        except Exception as e:
+            logger.error(f"[ECONOMY] Keeping previous loot tables, reloaded settings are invalid: {e}")
+        else:
+            logger.info("[ECONOMY] Loot tables rebuilt from reloaded settings")
+
     # ================= HELPER FUNCTIONS =================
     async def get_cooldown(self, user_id: int, command: str) -> int:
-        async with aiosqlite.connect(DB_PATH) as db:
-            async with db.execute(
-                "SELECT last_used FROM cooldowns WHERE user_id = ? AND command = ?",
-                (user_id, command),
-            ) as cursor:
-                row = await cursor.fetchone()
-                result = row[0] if row else 0
-                logger.debug(f"[ECONOMY] get_cooldown user={user_id} command={command} -> {result}")
-                return result
-
-    async def set_cooldown(self, user_id: int, command: str):
-        now = int(datetime.datetime.utcnow().timestamp())
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute(
-                "INSERT OR REPLACE INTO cooldowns (user_id, command, last_used) VALUES (?, ?, ?)",
-                (user_id, command, now),
-            )
-            await db.commit()
+        result = self.cooldowns.get(user_id, command)
+        logger.debug(f"[ECONOMY] get_cooldown user={user_id} command={command} -> {result}")
+        return result
+
+    async def set_cooldown(self, user_id: int, command: str, cooldown_seconds: int | None = None):
+        now = self.cooldowns.set(user_id, command, cooldown_seconds)
         logger.debug(f"[ECONOMY] set_cooldown user={user_id} command={command} at={now}")
 
     async def delete_old_record_cooldown(self, user_id: int, command: str):
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("DELETE FROM cooldowns WHERE user_id = ? AND command = ?", (user_id, command))
-            await db.commit()
+        self.cooldowns.delete(user_id, command)
         logger.debug(f"[ECONOMY] delete_old_record_cooldown user={user_id} command={command}")
 
     async def has_user_cooldown(
         self, user_id: int, command: str, cooldown_seconds: int
     ) -> int | None:
-        last_used = await self.get_cooldown(user_id, command)
-        now = int(datetime.datetime.utcnow().timestamp())
+        last_used = self.cooldowns.get(user_id, command)
+        now = utc_timestamp()
         if (now - last_used) < cooldown_seconds:
             expiry = last_used + cooldown_seconds
             logger.info(f"[ECONOMY] cooldown active user={user_id} command={command} expires={expiry}")
@@ -191,93 +1191,183 @@ class Economy(commands.Cog):
         return None
 
     async def clear_cooldowns(self, user_id: int):
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("DELETE FROM cooldowns WHERE user_id = ?", (user_id,))
-            await db.commit()
+        self.cooldowns.clear_user(user_id)
         logger.info(f"[ECONOMY] clear_cooldowns for user={user_id}")
     
+    @contextlib.asynccontextmanager
+    async def tx(self, reason: str = ""):
+        """Open one economy transaction: `async with self.tx("buy") as tx: await tx.debit(...)`.
+
+        Everything inside commits together, or not at all if the block raises. `reason` tags
+        the ledger rows written by the block.
+        """
+        pending: dict[int, int] = {}
+        try:
+            async with self.db.transaction() as db:
+                # Buffered deltas go in first, so strict checks below see read-your-writes balances
+                tx = EconomyTransaction(db, "buffered")
+                pending = self.balance_buffer.drain()
+                for user_id, delta in pending.items():
+                    await tx.credit(user_id, delta)
+                tx.reason = reason or "unspecified"
+                yield tx
+        except BaseException:
+            # Also reached when COMMIT itself fails, which happens as the transaction block exits
+            self.balance_buffer.restore(pending)
+            raise
+        finally:
+            self.balance_buffer.settle()
+        # Only reached after COMMIT; rolled back balances never reach the cache
+        for user_id, balance in tx.balances.items():
+            self.leaderboard_cache.observe(user_id, balance)
+
     async def get_balance(self, user_id: int) -> int:
         if user_id == self.bot.user.id:
             logger.debug(f"[ECONOMY] get_balance requested for bot user {user_id}, returning 0")
             return 0
-        async with aiosqlite.connect(DB_PATH) as db:
-            async with db.execute("SELECT balance FROM economy WHERE user_id = ?", (user_id,)) as cursor:
-                row = await cursor.fetchone()
-                if not row:
-                    await db.execute("INSERT INTO economy (user_id, balance, last_daily) VALUES (?, ?, ?)",
-                                     (user_id, 0, None))
-                    await db.commit()
-                    logger.info(f"[ECONOMY] Created economy row for user={user_id} with balance=0")
-                    return 0
-                logger.debug(f"[ECONOMY] get_balance user={user_id} -> {row[0]}")
-                return row[0]
-
-    async def update_balance(self, user_id: int, amount: int):
-        balance = await self.get_balance(user_id)
-        new_balance = max(0, balance + amount)
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("UPDATE economy SET balance = ? WHERE user_id = ?", (new_balance, user_id))
-            await db.commit()
-        logger.info(f"update_balance user={user_id} change={amount} old={balance} new={new_balance}")
+        if self.balance_buffer.has(user_id):
+            # Read next to the writer so no group commit can land between the row and the delta
+            async with self.db.latest() as db:
+                async with db.execute("SELECT balance FROM economy WHERE user_id = ?", (user_id,)) as cursor:
+                    row = await cursor.fetchone()
+                balance = max(0, (row[0] if row else 0) + self.balance_buffer.pending(user_id))
+        else:
+            row = await self.db.fetchone("SELECT balance FROM economy WHERE user_id = ?", (user_id,))
+            balance = row[0] if row else 0
+        logger.debug(f"[ECONOMY] get_balance user={user_id} -> {balance}")
+        return balance
+
+    async def update_balance(self, user_id: int, amount: int, reason: str = "update_balance") -> int:
+        async with self.tx(reason) as tx:
+            new_balance = await tx.credit(user_id, amount)
+        logger.info(f"update_balance user={user_id} change={amount} new={new_balance}")
+        return new_balance
+
+    def buffer_balance(self, user_id: int, amount: int):
+        """Queue a balance change for the next group commit instead of committing it now.
+
+        Meant for frequent small credits where losing the last second of changes on a crash is
+        acceptable; `get_balance` and every `tx()` already account for queued changes.
+        """
+        if self.balance_buffer.add(user_id, amount) >= BALANCE_BUFFER_MAX_USERS:
+            if self._balance_flush_task is None or self._balance_flush_task.done():
+                self._balance_flush_task = asyncio.create_task(self.flush_balances())
 
     async def get_inventory(self, user_id: int) -> dict:
-        items = {}
-        async with aiosqlite.connect(DB_PATH) as db:
-            async with db.execute("SELECT item, quantity FROM inventory WHERE user_id = ?", (user_id,)) as cursor:
-                async for item, qty in cursor:
-                    items[item] = qty
+        rows = await self.db.fetchall("SELECT item, quantity FROM inventory WHERE user_id = ?", (user_id,))
+        items = {item: qty for item, qty in rows}
         logger.debug(f"[ECONOMY] get_inventory user={user_id} -> {items}")
         return items
 
-    async def add_item(self, user_id: int, item: str, qty: int = 1):
-        item = item.lower()
-        async with aiosqlite.connect(DB_PATH) as db:
-            async with db.execute("SELECT quantity FROM inventory WHERE user_id = ? AND item = ?", (user_id, item)) as cursor:
-                row = await cursor.fetchone()
-                if row:
-                    await db.execute("UPDATE inventory SET quantity = quantity + ? WHERE user_id = ? AND item = ?",
-                                     (qty, user_id, item))
-                    logger.debug(f"[ECONOMY] add_item increment user={user_id} item={item} qty={qty}")
-                else:
-                    await db.execute("INSERT INTO inventory (user_id, item, quantity) VALUES (?, ?, ?)",
-                                     (user_id, item, qty))
-                    logger.debug(f"[ECONOMY] add_item insert user={user_id} item={item} qty={qty}")
-            await db.commit()
+    async def add_item(self, user_id: int, item: str, qty: int = 1, reason: str = "add_item"):
+        async with self.tx(reason) as tx:
+            await tx.add_item(user_id, item, qty)
+        logger.debug(f"[ECONOMY] add_item user={user_id} item={item.lower()} qty={qty}")
 
-    async def remove_item(self, user_id: int, item: str, qty: int = 1) -> bool:
+    async def add_items(self, user_id: int, items: dict[str, int], reason: str = "add_items"):
+        """Flush a whole batch of loot (`{item: qty}`) into the inventory in one transaction."""
+        if not items:
+            return
+        async with self.tx(reason) as tx:
+            await tx.add_items(user_id, items)
+        logger.debug(f"[ECONOMY] add_items user={user_id} items={dict(items)}")
+
+    async def remove_item(self, user_id: int, item: str, qty: int = 1, reason: str = "remove_item") -> bool:
         item = item.lower()
-        async with aiosqlite.connect(DB_PATH) as db:
-            async with db.execute("SELECT quantity FROM inventory WHERE user_id = ? AND item = ?", (user_id, item)) as cursor:
-                row = await cursor.fetchone()
-                if not row or row[0] < qty:
-                    logger.info(f"[ECONOMY] remove_item failed user={user_id} item={item} requested={qty} available={(row[0] if row else 0)}")
-                    return False
-                new_qty = row[0] - qty
-                if new_qty == 0:
-                    await db.execute("DELETE FROM inventory WHERE user_id = ? AND item = ?", (user_id, item))
-                else:
-                    await db.execute("UPDATE inventory SET quantity = ? WHERE user_id = ? AND item = ?",
-                                     (new_qty, user_id, item))
-            await db.commit()
-        logger.debug(f"[ECONOMY] remove_item success user={user_id} item={item} qty={qty} remaining={new_qty if 'new_qty' in locals() else 0}")
+        try:
+            async with self.tx(reason) as tx:
+                remaining = await tx.remove_item(user_id, item, qty)
+        except InsufficientItems:
+            logger.info(f"[ECONOMY] remove_item failed user={user_id} item={item} requested={qty}")
+            return False
+        logger.debug(f"[ECONOMY] remove_item success user={user_id} item={item} qty={qty} remaining={remaining}")
         return True
 
-    async def fetch_shop_items(self) -> dict:
-        items = {}
-        async with aiosqlite.connect(DB_PATH) as db:
-            async with db.execute("SELECT item_id, name, price FROM shop_items") as cursor:
-                async for item_id, name, price in cursor:
-                    items[item_id] = {"name": name, "price": price}
-        logger.debug(f"[ECONOMY] fetch_shop_items -> {len(items)} items")
-        return items
+    async def settle_trade(self, initiator_id: int, partner_id: int, initiator_items: dict[str, int], partner_items: dict[str, int],
+                           initiator_coins: int = 0, partner_coins: int = 0):
+        """Swap both sides of a trade atomically.
+
+        Both users are locked for the duration and every move is a guarded statement in one
+        transaction, so a trade either applies in full or raises `EconomyError` and changes nothing.
+        """
+        async with self.user_locks.hold(initiator_id, partner_id):
+            async with self.tx("trade") as tx:
+                for item, qty in initiator_items.items():
+                    await tx.move_item(initiator_id, partner_id, item, qty)
+                for item, qty in partner_items.items():
+                    await tx.move_item(partner_id, initiator_id, item, qty)
+                if initiator_coins > 0:
+                    await tx.transfer(initiator_id, partner_id, initiator_coins)
+                if partner_coins > 0:
+                    await tx.transfer(partner_id, initiator_id, partner_coins)
+        logger.info(f"[ECONOMY] Trade settled initiator={initiator_id} partner={partner_id} "
+                    f"items={initiator_items}/{partner_items} coins={initiator_coins}/{partner_coins}")
+
+    async def _ensure_leaderboard_cache(self) -> list[tuple[int, int]] | None:
+        if self.leaderboard_cache.ready:
+            return None
+        generation = self.leaderboard_cache.generation
+        rows = await self.db.fetchall(
+            "SELECT user_id, balance FROM economy ORDER BY balance DESC, user_id LIMIT ?",
+            (self.leaderboard_cache.size,),
+        )
+        # A balance changed while we were reading; serve these rows but don't cache them
+        if generation != self.leaderboard_cache.generation:
+            return rows
+        self.leaderboard_cache.load(rows)
+        logger.debug(f"[ECONOMY] leaderboard cache loaded -> {len(rows)} rows")
+        return None
 
-    async def fetch_leaderboard(self) -> list[tuple[int, int]]:
-        async with aiosqlite.connect(DB_PATH) as db:
-            async with db.execute("SELECT user_id, balance FROM economy ORDER BY balance DESC LIMIT 10") as cursor:
-                rows = await cursor.fetchall()
-        logger.debug(f"[ECONOMY] fetch_leaderboard -> {len(rows)} rows")
+    async def fetch_leaderboard(self, page: int = 1, per_page: int = LEADERBOARD_PAGE_SIZE) -> list[tuple[int, int]]:
+        offset = (max(1, page) - 1) * per_page
+        if offset + per_page <= self.leaderboard_cache.size:
+            uncached = await self._ensure_leaderboard_cache()
+            rows = uncached[offset:offset + per_page] if uncached is not None else self.leaderboard_cache.rows(offset, per_page)
+        elif self.leaderboard_cache.complete:
+            rows = []
+        else:
+            rows = await self.db.fetchall(
+                "SELECT user_id, balance FROM economy ORDER BY balance DESC, user_id LIMIT ? OFFSET ?",
+                (per_page, offset),
+            )
+        logger.debug(f"[ECONOMY] fetch_leaderboard page={page} -> {len(rows)} rows")
         return rows
 
+    async def fetch_guild_leaderboard(self, guild: discord.Guild, page: int = 1, per_page: int = LEADERBOARD_PAGE_SIZE) -> list[tuple[int, int]]:
+        now = time.monotonic()
+        cached = self.guild_leaderboards.get(guild.id)
+        if cached and cached[0] > now:
+            rows = cached[1]
+        else:
+            member_ids = [m.id for m in guild.members if not m.bot]
+            rows = []
+            # Primary-key lookups for the guild's members only, in chunks below SQLite's variable limit
+            for i in range(0, len(member_ids), 900):
+                chunk = member_ids[i:i + 900]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(await self.db.fetchall(
+                    f"SELECT user_id, balance FROM economy WHERE user_id IN ({placeholders}) AND balance > 0",
+                    tuple(chunk),
+                ))
+            rows.sort(key=lambda row: (-row[1], row[0]))
+            self.guild_leaderboards[guild.id] = (now + GUILD_LEADERBOARD_TTL, rows)
+        offset = (max(1, page) - 1) * per_page
+        return rows[offset:offset + per_page]
+
+    async def fetch_rank(self, user_id: int) -> tuple[int, int]:
+        """Return (rank, balance) for a user using index range counts, never a table scan."""
+        await self._ensure_leaderboard_cache()
+        rank = self.leaderboard_cache.rank(user_id)
+        balance = await self.get_balance(user_id)
+        if rank is not None:
+            return rank, balance
+        row = await self.db.fetchone(
+            "SELECT (SELECT COUNT(*) FROM economy WHERE balance > ?1)"
+            " + (SELECT COUNT(*) FROM economy WHERE balance = ?1 AND user_id < ?2)",
+            (balance, user_id),
+        )
+        return row[0] + 1, balance
+
     # ===================== ECONOMY GROUP =====================
     @commands.group(name="economy", aliases=["eco"], invoke_without_command=True)
     async def economy_group(self, ctx):
@@ -298,6 +1388,7 @@ class Economy(commands.Cog):
         embed.add_field(name=PREFIX+"economy chop [times]", value="Chop for wood and items multiple times", inline=False)
         embed.add_field(name=PREFIX+"economy gamble <amount>", value="Coinflip to gamble coins", inline=False)
         embed.add_field(name=PREFIX+"economy trade [user]", value="Trade items with another user", inline=False)
+        embed.add_field(name=PREFIX+"economy leaderboard [page]", value="Show the richest users (`server` for this server, `me` for your rank)", inline=False)
         
         embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
         
@@ -317,26 +1408,23 @@ class Economy(commands.Cog):
 
     # ===================== DAILY =====================
     @economy_group.command(name="daily")
+    @locks_user()
     async def daily(self, ctx):
         user_id = ctx.author.id
-        async with aiosqlite.connect(DB_PATH) as db:
-            async with db.execute("SELECT last_daily FROM economy WHERE user_id = ?", (user_id,)) as cursor:
-                row = await cursor.fetchone()
-            last_daily = row[0] if row else None
-
-            now = datetime.datetime.utcnow()
-            cooldown = DAILY_COOLDOWN_HOURS * 3600
-            if last_daily:
-                last_time = datetime.datetime.fromisoformat(last_daily)
-                elapsed = (now - last_time).total_seconds()
-                if elapsed < cooldown:
-                    reset_time = last_time + datetime.timedelta(seconds=cooldown)
-                    unix_ts = int(reset_time.timestamp())
-                    return await ctx.send(f"❌ Daily already claimed. Try again <t:{unix_ts}:R>")
-
-            await self.update_balance(user_id, DEFAULT_DAILY_REWARD)
-            await db.execute("UPDATE economy SET last_daily = ? WHERE user_id = ?", (now.isoformat(), user_id))
-            await db.commit()
+        now = utc_timestamp()
+        cooldown = DAILY_COOLDOWN_HOURS * 3600
+        unix_ts = None
+        # Check and claim in the same transaction so two concurrent dailies cannot both pay out
+        async with self.tx("daily") as tx:
+            last_daily = await tx.get_last_daily(user_id)
+            if last_daily is not None and now - last_daily < cooldown:
+                unix_ts = last_daily + cooldown
+            else:
+                await tx.credit(user_id, DEFAULT_DAILY_REWARD)
+                await tx.set_last_daily(user_id, now)
+        if unix_ts is not None:
+            return await ctx.send(f"❌ Daily already claimed. Try again <t:{unix_ts}:R>")
+        logger.info(f"[ECONOMY] daily claimed user={user_id} reward={DEFAULT_DAILY_REWARD}")
 
         embed = discord.Embed(title="🎁 Daily Reward", color=DAILY_COLOR)
         embed.add_field(name="Coins Earned", value=DEFAULT_DAILY_REWARD)
@@ -347,31 +1435,22 @@ class Economy(commands.Cog):
     # ===================== SHOP =====================
     @economy_group.command(name="shop")
     async def shop(self, ctx):
-        items = await self.fetch_shop_items()
-        if not items:
+        pages = self.shop_catalog.pages()
+        if not pages:
             return await ctx.send("🛒 The shop is currently empty.")
 
-        sorted_items = list(items.items())
-        pages = [sorted_items[i:i+SHOP_PAGE_SIZE] for i in range(0, len(sorted_items), SHOP_PAGE_SIZE)]
-
         class ShopView(View):
             def __init__(self, pages):
                 super().__init__(timeout=120)
                 self.pages = pages
                 self.current = 0
-                self.embed = self.create_embed()
 
                 self.prev.disabled = True
                 if len(self.pages) <= 1:
                     self.next.disabled = True
 
             def create_embed(self):
-                embed = discord.Embed(title="🛒 Shop", color=BALANCE_COLOR)
-                for item_id, data in self.pages[self.current]:
-                    emoji = EMOJIS.get(item_id, "")
-                    embed.add_field(name=f"{emoji} {data['name']} (`{item_id}`)", value=f"Price: {data['price']} coins", inline=False)
-                embed.set_footer(text=f"Page {self.current+1}/{len(self.pages)} | {PREFIX}economy buy <item_id> <amount> | Version: {ECONOMY_VERSION}")
-                return embed
+                return self.pages[self.current]
 
             @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
             async def prev(self, interaction: discord.Interaction, button: Button):
@@ -389,30 +1468,33 @@ class Economy(commands.Cog):
                 self.prev.disabled = False
                 await interaction.response.edit_message(embed=self.create_embed(), view=self)
 
-        await ctx.send(embed=ShopView(pages).create_embed(), view=ShopView(pages))
+        view = ShopView(pages)
+        await ctx.send(embed=view.create_embed(), view=view)
 
     # ===================== BUY =====================
     @economy_group.command(name="buy")
+    @locks_user()
     async def buy(self, ctx, item_id: str, amount: int = 1):
         if amount <= 0:
             return await ctx.send("❌ Amount must be positive.")
-        shop_items = await self.fetch_shop_items()
         item_id = item_id.lower()
-        if item_id not in shop_items:
+        item = self.shop_catalog.get(item_id)
+        if item is None:
             return await ctx.send("❌ That item does not exist in the shop.")
-        item = shop_items[item_id]
         total_price = item['price'] * amount
-        balance = await self.get_balance(ctx.author.id)
-        if balance < total_price:
+        try:
+            async with self.tx("buy") as tx:
+                await tx.debit(ctx.author.id, total_price)
+                await tx.add_item(ctx.author.id, item_id, amount)
+        except InsufficientFunds:
             return await ctx.send("❌ You do not have enough coins.")
-        await self.update_balance(ctx.author.id, -total_price)
-        await self.add_item(ctx.author.id, item_id, amount)
         embed = discord.Embed(title="🛒 Purchase Successful", description=f"You bought {amount} x {item['name']} for {total_price} coins.", color=BALANCE_COLOR)
         embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
         await ctx.send(embed=embed)
 
     # ===================== SELL =====================
     @economy_group.command(name="sell")
+    @locks_user()
     async def sell(self, ctx, item_id: str, amount: int = 1000000000000000000000000000000000):
         if amount <= 0:
             return await ctx.send("❌ Amount must be positive.")
@@ -423,17 +1505,18 @@ class Economy(commands.Cog):
             amount = inventory.get(item_id, 0)
             if amount == 0:
                 return await ctx.send("❌ You do not have that item in your inventory.")
-        shop_items = await self.fetch_shop_items()
-        if item_id not in shop_items:
+        item = self.shop_catalog.get(item_id)
+        if item is None:
             return await ctx.send("❌ This item cannot be sold to the shop.")
-        if shop_items[item_id]["price"] <= 1:
-            sell_price = shop_items[item_id]["price"]
-        else:
-            sell_price = shop_items[item_id]["price"] // 2
+        sell_price = ShopCatalog.sell_price(item)
         total_earnings = sell_price * amount
-        await self.remove_item(ctx.author.id, item_id, amount)
-        await self.update_balance(ctx.author.id, total_earnings)
-        embed = discord.Embed(title="💰 Item Sold", description=f"You sold {amount} x {shop_items[item_id]['name']} for {total_earnings} coins.", color=SELL_COLOR)
+        try:
+            async with self.tx("sell") as tx:
+                await tx.remove_item(ctx.author.id, item_id, amount)
+                await tx.credit(ctx.author.id, total_earnings)
+        except InsufficientItems:
+            return await ctx.send("❌ You do not have that item in your inventory.")
+        embed = discord.Embed(title="💰 Item Sold", description=f"You sold {amount} x {item['name']} for {total_earnings} coins.", color=SELL_COLOR)
         embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
         await ctx.send(embed=embed)
 
@@ -450,6 +1533,7 @@ class Economy(commands.Cog):
 
     # ===================== DIG =====================
     @economy_group.command(name="dig")
+    @locks_user()
     async def dig(self, ctx, times: int = 10):
         cooldown_seconds = COOLDOWN_DIG_FISH_MINUTES * 60
         remaining = await self.has_user_cooldown(ctx.author.id, "dig", cooldown_seconds)
@@ -458,40 +1542,28 @@ class Economy(commands.Cog):
                 f"❌ You are on cooldown for this command. "
                 f"Try again <t:{remaining}:R> (<t:{remaining}:T>)"
             )
-        else:
-            await self.delete_old_record_cooldown(ctx.author.id, "dig")
-        
-        
-        await self.set_cooldown(ctx.author.id, "dig")
+
+        await self.set_cooldown(ctx.author.id, "dig", cooldown_seconds)
         if times <= 0:
             return await ctx.send("❌ Times must be positive.")
         elif times >= 11:
             return await ctx.send("❌ Maximum is 10 per command!")
 
-        possible_items = DIG_ITEMS
-        item_weights = DIG_CHANCES
-
-        found_items = []
-        for _ in range(times):
-            found = random.choices(possible_items, weights=item_weights, k=random.randint(0, 5))
-            for item in found:
-                await self.add_item(ctx.author.id, item, 1)
-            found_items.extend(found)
-        logger.info(f"[ECONOMY] dig results user={ctx.author.id} found={len(found_items)} items")
+        found_items = self.loot_tables["dig"].roll(times)
+        await self.add_items(ctx.author.id, found_items, "dig")
+        logger.info(f"[ECONOMY] dig results user={ctx.author.id} found={found_items.total()} items")
 
         embed = discord.Embed(title=f"⛏️ You dug {times} times and found:", color=LOOT_COLOR)
-        desc_dict = {}
-        for item in found_items:
-            desc_dict[item] = desc_dict.get(item, 0) + 1
         embed.description = "\n".join(
             f"{EMOJIS.get(item, '❔')} {item.capitalize()} x{qty}"
-            for item, qty in desc_dict.items()
+            for item, qty in found_items.items()
         )
         embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
         await ctx.send(embed=embed)
 
 
     @economy_group.command(name="chop")
+    @locks_user()
     async def chop(self, ctx, times: int = 10):
         logger.info(f"[ECONOMY] Command: chop by user={ctx.author.id} times={times}")
         cooldown_seconds = COOLDOWN_DIG_FISH_MINUTES * 60
@@ -501,45 +1573,32 @@ class Economy(commands.Cog):
                 f"❌ You are on cooldown for this command. "
                 f"Try again <t:{remaining}:R> (<t:{remaining}:T>)"
             )
-        else:
-            await self.delete_old_record_cooldown(ctx.author.id, "chop")
-        
-        
-        await self.set_cooldown(ctx.author.id, "chop")
+
+        await self.set_cooldown(ctx.author.id, "chop", cooldown_seconds)
         if times <= 0:
             return await ctx.send("❌ Times must be positive.")
         elif times >= 11:
             return await ctx.send("❌ Maximum is 10 per command!")
 
-        possible_items = CHOP_ITEMS
-        item_weights = CHOP_CHANCES
-
-        found_items = []
-        for _ in range(times):
-            if random.randint(1, 100) > CHOP_NOT_FALL_TREE_CHANCE_PERCENTAGE:
-                found = random.choices(possible_items, weights=item_weights, k=random.randint(0, 5))
-                for item in found:
-                    await self.add_item(ctx.author.id, item, 1)
-                found_items.extend(found)
+        found_items = self.loot_tables["chop"].roll(times)
 
         if not found_items:
             logger.info(f"[ECONOMY] chop found nothing user={ctx.author.id}")
             return await ctx.send("🪓 You chopped but tree felt on you this time!")
-        logger.info(f"[ECONOMY] chop results user={ctx.author.id} found={len(found_items)} items")
+        await self.add_items(ctx.author.id, found_items, "chop")
+        logger.info(f"[ECONOMY] chop results user={ctx.author.id} found={found_items.total()} items")
 
         embed = discord.Embed(title=f"🪓 You chopped {times} times and found:", color=LOOT_COLOR)
-        desc_dict = {}
-        for item in found_items:
-            desc_dict[item] = desc_dict.get(item, 0) + 1
         embed.description = "\n".join(
             f"{EMOJIS.get(item, '❔')} {item.capitalize()} x{qty}"
-            for item, qty in desc_dict.items()
+            for item, qty in found_items.items()
         )
         embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
         await ctx.send(embed=embed)
     
     # ===================== FISH =====================
     @economy_group.command(name="fish")
+    @locks_user()
     async def fish(self, ctx, times: int = 10):
         logger.info(f"[ECONOMY] Command: fish by user={ctx.author.id} times={times}")
         cooldown_seconds = COOLDOWN_DIG_FISH_MINUTES * 60
@@ -549,38 +1608,25 @@ class Economy(commands.Cog):
                 f"❌ You are on cooldown for this command. "
                 f"Try again <t:{remaining}:R> (<t:{remaining}:T>)"
             )
-        else:
-            await self.delete_old_record_cooldown(ctx.author.id, "fish")
 
-        await self.set_cooldown(ctx.author.id, "fish")
+        await self.set_cooldown(ctx.author.id, "fish", cooldown_seconds)
         if times <= 0:
             return await ctx.send("❌ Times must be positive.")
         elif times >= 11:
             return await ctx.send("❌ Maximum is 10 per command!")
 
-        fish_items = FISH_ITEMS
-        fish_weights = FISH_CHANCES
-
-        caught_items = []
-        for _ in range(times):
-            if random.randint(1, 100) <= FISH_CATCH_CHANCE_PERCENTAGE:
-                caught = random.choices(fish_items, weights=fish_weights, k=random.randint(1, 2))
-                for fish in caught:
-                    await self.add_item(ctx.author.id, fish.lower(), 1)
-                caught_items.extend(caught)
+        caught_items = self.loot_tables["fish"].roll(times)
 
         if not caught_items:
             logger.info(f"[ECONOMY] fish caught nothing user={ctx.author.id}")
             return await ctx.send("🎣 You fished but didn't catch anything this time!")
-        logger.info(f"[ECONOMY] fish results user={ctx.author.id} caught={len(caught_items)} fish")
+        await self.add_items(ctx.author.id, caught_items, "fish")
+        logger.info(f"[ECONOMY] fish results user={ctx.author.id} caught={caught_items.total()} fish")
 
         embed = discord.Embed(title=f"🎣 You fished {times} times and caught:", color=LOOT_COLOR)
-        desc_dict = {}
-        for fish in caught_items:
-            desc_dict[fish] = desc_dict.get(fish, 0) + 1
         embed.description = "\n".join(
             f"{EMOJIS.get(fish, '❔')} {fish.capitalize()} x{qty}"
-            for fish, qty in desc_dict.items()
+            for fish, qty in caught_items.items()
         )
         embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
         await ctx.send(embed=embed)
@@ -589,18 +1635,23 @@ class Economy(commands.Cog):
 
     # ===================== GAMBLE =====================
     @economy_group.command(name="coinflip", aliases=["cf"])
+    @locks_user()
     async def coinflip(self, ctx, amount: int):
         logger.info(f"[ECONOMY] Command: coinflip by user={ctx.author.id} amount={amount}")
         if amount <= 0:
             return await ctx.send("❌ Amount must be positive.")
-        balance = await self.get_balance(ctx.author.id)
-        if balance < amount:
-            logger.info(f"[ECONOMY] coinflip insufficient funds user={ctx.author.id} balance={balance} bet={amount}")
-            return await ctx.send("❌ Not enough coins.")
         won = random.choice([True, False])
-        if won:
-            amount = amount*2
-        await self.update_balance(ctx.author.id, amount if won else -amount)
+        bet = amount
+        try:
+            async with self.tx("coinflip") as tx:
+                # Stake is taken first so the funds check and the payout commit together
+                await tx.debit(ctx.author.id, bet)
+                if won:
+                    amount = bet * 2
+                    await tx.credit(ctx.author.id, bet + amount)
+        except InsufficientFunds:
+            logger.info(f"[ECONOMY] coinflip insufficient funds user={ctx.author.id} bet={bet}")
+            return await ctx.send("❌ Not enough coins.")
         logger.info(f"[ECONOMY] coinflip result user={ctx.author.id} won={won} change={amount if won else -amount}")
         embed = discord.Embed(title="🎲 Coinflip", description=f"You {'won' if won else 'lost'} {amount} coins!", color=GAMBLE_WIN_COLOR if won else GAMBLE_LOSE_COLOR)
         embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
@@ -612,53 +1663,32 @@ class Economy(commands.Cog):
         logger.info(f"[ECONOMY] Command: blackjack by user={ctx.author.id} amount={amount}")
         if amount <= 0:
             return await ctx.send("❌ Amount must be positive.")
-        balance = await self.get_balance(ctx.author.id)
-        if balance < amount:
+        # TAKE THE BET UP-FRONT (the game itself runs unlocked so other commands stay usable)
+        try:
+            async with self.user_locks.hold(ctx.author.id), self.tx("blackjack bet") as tx:
+                await tx.debit(ctx.author.id, amount)
+        except InsufficientFunds:
             return await ctx.send("❌ Not enough coins.")
-
-        # TAKE THE BET UP-FRONT
-        await self.update_balance(ctx.author.id, -amount)
         logger.info(f"[ECONOMY] blackjack bet taken user={ctx.author.id} bet={amount}")
 
-        suits = BLACK_JACK_SUITS
-        ranks = BLACK_JACK_RANKS
-        
-        values = {rank: min(10, i+2) for i, rank in enumerate(ranks)}
-        values['A'] = 11  # Ace can be 1 or 11, handled later
-
-        def calculate_hand(hand):
-            total = sum(values[card[1]] for card in hand)
-            aces = sum(1 for card in hand if card[1] == 'A')
-            while total > 21 and aces:
-                total -= 10
-                aces -= 1
-            return total
-
-        deck = [(suit, rank) for suit in suits for rank in ranks]
-        random.shuffle(deck)
+        shoe = self.blackjack_shoe
+        player_hand, dealer_hand = bj.deal(shoe)
 
-        player_hand = [deck.pop(), deck.pop()]
-        dealer_hand = [deck.pop(), deck.pop()]
+        def show(hand: bj.Hand) -> str:
+            return " ".join(bj.format_card(card, BLACK_JACK_SUITS, BLACK_JACK_RANKS) for card in hand.cards)
 
         def create_embed(final=False):
             embed = discord.Embed(title="🃏 Blackjack", color=BALANCE_COLOR)
-            embed.add_field(name="Your Hand", value=" ".join(f"{suit}{rank}" for suit, rank in player_hand) + f" (Total: {calculate_hand(player_hand)})", inline=False)
-            if final:
-                embed.add_field(name="Dealer's Hand", value=" ".join(f"{suit}{rank}" for suit, rank in dealer_hand) + f" (Total: {calculate_hand(dealer_hand)})", inline=False)
-            else:
-                embed.add_field(name="Dealer's Hand", value=f"{dealer_hand[0][0]}{dealer_hand[0][1]} ??", inline=False)
+            embed.add_field(name="Your Hand", value=f"{show(player_hand)} (Total: {player_hand.total})", inline=False)
             if final:
-                player_total = calculate_hand(player_hand)
-                dealer_total = calculate_hand(dealer_hand)
-                if player_total > 21:
-                    result = "You busted! You lose."
-                elif dealer_total > 21 or player_total > dealer_total:
-                    result = "You win!"
-                elif player_total < dealer_total:
-                    result = "You lose!"
+                embed.add_field(name="Dealer's Hand", value=f"{show(dealer_hand)} (Total: {dealer_hand.total})", inline=False)
+                if player_hand.busted:
+                    result_text = "You busted! You lose."
                 else:
-                    result = "It's a draw!"
-                embed.add_field(name="Result", value=result, inline=False)
+                    result_text = {"win": "You win!", "lose": "You lose!", "draw": "It's a draw!"}[bj.settle(player_hand.total, dealer_hand.total)]
+                embed.add_field(name="Result", value=result_text, inline=False)
+            else:
+                embed.add_field(name="Dealer's Hand", value=f"{bj.format_card(dealer_hand.cards[0], BLACK_JACK_SUITS, BLACK_JACK_RANKS)} ??", inline=False)
             embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
             return embed
         
@@ -675,9 +1705,7 @@ class Economy(commands.Cog):
 
             @discord.ui.button(label="Hit", style=discord.ButtonStyle.primary)
             async def hit(self, interaction: discord.Interaction, button: Button):
-                player_hand.append(deck.pop())
-                player_total = calculate_hand(player_hand)
-                if player_total > 21:
+                if player_hand.add(shoe.draw()) > 21:
                     self.result = "lose"
                     await interaction.response.edit_message(embed=create_embed(final=True), view=self)
                     self.stop()
@@ -686,16 +1714,8 @@ class Economy(commands.Cog):
 
             @discord.ui.button(label="Stand", style=discord.ButtonStyle.success)
             async def stand(self, interaction: discord.Interaction, button: Button):
-                while calculate_hand(dealer_hand) < 17:
-                    dealer_hand.append(deck.pop())
-                dealer_total = calculate_hand(dealer_hand)
-                player_total = calculate_hand(player_hand)
-                if dealer_total > 21 or player_total > dealer_total:
-                    self.result = "win"
-                elif player_total < dealer_total:
-                    self.result = "lose"
-                else:
-                    self.result = "draw"
+                dealer_total = bj.play_dealer(dealer_hand, shoe)
+                self.result = bj.settle(player_hand.total, dealer_total)
                 await interaction.response.edit_message(embed=create_embed(final=True), view=self)
                 self.stop()
         
@@ -706,14 +1726,16 @@ class Economy(commands.Cog):
         res = view.result
         # TIMEOUT: refund bet
         if res is None:
-            await self.update_balance(ctx.author.id, amount)
+            async with self.user_locks.hold(ctx.author.id), self.tx("blackjack refund") as tx:
+                await tx.credit(ctx.author.id, amount)
             logger.info(f"[ECONOMY] blackjack timeout - bet refunded user={ctx.author.id} bet={amount}")
             return await ctx.send("⏰ Game timed out. Your bet has been refunded.")
 
         # SETTLE
         if res == "win":
             # pay back stake + winnings: since stake already deducted, give 2*amount to net +amount
-            await self.update_balance(ctx.author.id, amount * 2)
+            async with self.user_locks.hold(ctx.author.id), self.tx("blackjack win") as tx:
+                await tx.credit(ctx.author.id, amount * 2)
             await ctx.send(f"✅ You won {amount} coins!")
             logger.info(f"[ECONOMY] blackjack win user={ctx.author.id} bet={amount}")
         elif res == "lose":
@@ -721,7 +1743,8 @@ class Economy(commands.Cog):
             await ctx.send(f"❌ You lost {amount} coins.")
             logger.info(f"[ECONOMY] blackjack lose user={ctx.author.id} bet={amount}")
         else:  # draw
-            await self.update_balance(ctx.author.id, amount)
+            async with self.user_locks.hold(ctx.author.id), self.tx("blackjack draw") as tx:
+                await tx.credit(ctx.author.id, amount)
             await ctx.send("It's a draw! Your bet has been returned.")
             logger.info(f"[ECONOMY] blackjack draw - bet returned user={ctx.author.id} bet={amount}")
 
@@ -808,16 +1831,6 @@ class Economy(commands.Cog):
             "active": True
         }
 
-        def create_trade_embed():
-            embed = discord.Embed(title="🔁 Trade Panel", color=BALANCE_COLOR)
-            # initiator side
-            initiator_items_display = "None" if not session["initiator_items"] else "\n".join(f"{EMOJIS.get(item_id,'❔')} {item_id} x{qty}" for item_id, qty in session["initiator_items"].items())
-            partner_items_display = "None" if not session["partner_items"] else "\n".join(f"{EMOJIS.get(item_id,'❔')} {item_id} x{qty}" for item_id, qty in session["partner_items"].items())
-            embed.add_field(name=f"{ctx.author.display_name} offers", value=f"Items:\n{initiator_items_display}\nCoins: {session['initiator_coins']}", inline=True)
-            embed.add_field(name=f"{member.display_name} offers", value=f"Items:\n{partner_items_display}\nCoins: {session['partner_coins']}", inline=True)
-            embed.set_footer(text="Select items and set coins. Initiator must press 'Propose Trade' to request confirmation.")
-            return embed
-
         # Views for each user\'s DM - they share callbacks via closure over session
         class UserTradeView(View):
             def __init__(self, ctx, member, your_inv, their_inv, session, economy_cog):
@@ -1076,61 +2089,13 @@ class Economy(commands.Cog):
                         pass
                     return await interaction.followup.send("❌ Trade was declined or timed out.")
 
-                # Partner accepted — finalize trade after re-checks
-                # Re-fetch inventories and balances
-                fresh_your_inv = await self.economy_cog.get_inventory(self.ctx.author.id) or {}
-                fresh_their_inv = await self.economy_cog.get_inventory(self.member.id) or {}
-                your_balance = await self.economy_cog.get_balance(self.ctx.author.id)
-                their_balance = await self.economy_cog.get_balance(self.member.id)
-
-                # Validate items availability
-                for it, qty in self.session["initiator_items"].items():
-                    if fresh_your_inv.get(it, 0) < qty:
-                        try:
-                            await self.member.send("❌ Trade failed: initiator no longer has offered items.")
-                        except Exception:
-                            pass
-                        try:
-                            if self.session["initiator_msg"]:
-                                await self.session["initiator_msg"].edit(content="❌ Trade failed: items changed.", embed=None, view=None)
-                        except Exception:
-                            pass
-                        return await interaction.followup.send("❌ Trade failed: initiator no longer has offered items.")
-                for it, qty in self.session["partner_items"].items():
-                    if fresh_their_inv.get(it, 0) < qty:
-                        try:
-                            await self.ctx.author.send("❌ Trade failed: partner no longer has offered items.")
-                        except Exception:
-                            pass
-                        try:
-                            if self.session["partner_msg"]:
-                                await self.session["partner_msg"].edit(content="❌ Trade failed: items changed.", embed=None, view=None)
-                        except Exception:
-                            pass
-                        return await interaction.followup.send("❌ Trade failed: partner no longer has offered items.")
-
-                # Validate coins availability
-                if your_balance < self.session["initiator_coins"]:
-                    return await interaction.followup.send("❌ You no longer have enough coins to offer.")
-                if their_balance < self.session["partner_coins"]:
-                    return await interaction.followup.send(f"❌ {self.member.display_name} no longer has enough coins to offer.")
-
-                # Execute atomic-like swap (best effort)
+                # Partner accepted — validate and swap everything in one locked transaction
                 try:
-                    # transfer items
-                    for it, qty in self.session["initiator_items"].items():
-                        await self.economy_cog.remove_item(self.ctx.author.id, it, qty)
-                        await self.economy_cog.add_item(self.member.id, it, qty)
-                    for it, qty in self.session["partner_items"].items():
-                        await self.economy_cog.remove_item(self.member.id, it, qty)
-                        await self.economy_cog.add_item(self.ctx.author.id, it, qty)
-                    # transfer coins
-                    if self.session["initiator_coins"] > 0:
-                        await self.economy_cog.update_balance(self.ctx.author.id, -self.session["initiator_coins"])
-                        await self.economy_cog.update_balance(self.member.id, self.session["initiator_coins"])
-                    if self.session["partner_coins"] > 0:
-                        await self.economy_cog.update_balance(self.member.id, -self.session["partner_coins"])
-                        await self.economy_cog.update_balance(self.ctx.author.id, self.session["partner_coins"])
+                    await self.economy_cog.settle_trade(
+                        self.ctx.author.id, self.member.id,
+                        self.session["initiator_items"], self.session["partner_items"],
+                        self.session["initiator_coins"], self.session["partner_coins"],
+                    )
 
                     # Notify success
                     success_embed = discord.Embed(title="✅ Trade Successful!", color=BALANCE_COLOR)
@@ -1145,6 +2110,16 @@ class Economy(commands.Cog):
                     await interaction.followup.send("✅ Trade completed successfully!")
                     self.stop()
 
+                except EconomyError as e:
+                    logger.info(f"[ECONOMY] Trade rolled back initiator={self.ctx.author.id} partner={self.member.id}: {e}")
+                    who = "You" if e.user_id == self.ctx.author.id else self.member.display_name
+                    what = "coins" if isinstance(e, InsufficientFunds) else "items"
+                    await interaction.followup.send(f"❌ Trade failed: {who} no longer {'have' if who == 'You' else 'has'} the offered {what}. Nothing was exchanged.")
+                    if self.session["initiator_msg"]:
+                        await self.session["initiator_msg"].edit(content="❌ Trade failed: items changed.", embed=None, view=None)
+                    if self.session["partner_msg"]:
+                        await self.session["partner_msg"].edit(content="❌ Trade failed: items changed.", embed=None, view=None)
+                    self.stop()
                 except Exception as e:
                     logger.exception(f"[ECONOMY] Trade execution failed: {e}")
                     await interaction.followup.send("❌ An error occurred during trade execution. Trade cancelled.")
@@ -1261,235 +2236,53 @@ class Economy(commands.Cog):
 
         # Wait for the trade to conclude
         await trade_view.wait()
-
-        # Clean up session
-        del self.active_trades[(ctx.author.id, member.id)]
-        del self.active_trades[(member.id, ctx.author.id)]
-        pass
-        if session["partner_msg"]:
-            try:
-                await session["partner_msg"].edit(embed=embed)
-            except asyncio.TimeoutError:
-                await interaction.followup.send("⏰ Timed out; no coins were set.")
-            except Exception:
-                await interaction.followup.send(f"✅ Coins set to {amount}.")
-
-            async def on_cancel(self, interaction: discord.Interaction):
-                session["active"] = False
-                # notify both
-                try:
-                    if session["initiator_msg"]:
-                        await session["initiator_msg"].edit(content="❌ Trade cancelled.", embed=None, view=None)
-                    if session["partner_msg"]:
-                        await session["partner_msg"].edit(content="❌ Trade cancelled.", embed=None, view=None)
-                except Exception:
-                    pass
-                await interaction.response.send_message("❌ Trade cancelled.")
-                self.stop()
-
-            async def on_propose(self, interaction: discord.Interaction):
-                # Only initiator will have this; sends confirmation to partner
-                if not self.is_initiator:
-                    return await interaction.response.send_message("Only the trade initiator can propose the trade.")
-                # Basic validation: ensure something offered (items or coins)
-                if not session["initiator_items"] and session["initiator_coins"] == 0:
-                    return await interaction.response.send_message("You must offer at least items or coins to propose.")
-
-                # Send confirmation to partner with accept/reject buttons
-                confirm_embed = discord.Embed(title="🔔 Trade Confirmation Request", color=BALANCE_COLOR)
-                initiator_offers_text = 'None' if not session['initiator_items'] else '\n'.join(session['initiator_items'])
-                partner_requests_text = 'None' if not session['partner_items'] else '\n'.join(session['partner_items'])
-                confirm_embed.description = (
-                    f"{ctx.author.display_name} proposes a trade:\n\n"
-                    f"**They offer:**\n"
-                    f"{initiator_offers_text}\nCoins: {session['initiator_coins']}\n\n"
-                    f"**They request from you:**\n"
-                    f"{partner_requests_text}\nCoins: {session['partner_coins']}\n\n"
-                    "Click Accept to accept the trade or Reject to decline. (60s)"
-                )
-
-                class ConfirmView(View):
-                    def __init__(self):
-                        super().__init__(timeout=60)
-                        self.result = None
-                        self.accept = Button(label="Accept", style=discord.ButtonStyle.green)
-                        self.reject = Button(label="Reject", style=discord.ButtonStyle.red)
-                        self.add_item(self.accept)
-                        self.add_item(self.reject)
-                        self.accept.callback = self.accept_cb
-                        self.reject.callback = self.reject_cb
-
-                    async def interaction_check(self, inter: discord.Interaction) -> bool:
-                        if inter.user.id != member.id:
-                            await inter.response.send_message("You are not allowed to respond to this confirmation.")
-                            return False
-                        return True
-
-                    async def accept_cb(self, inter: discord.Interaction):
-                        self.result = True
-                        await inter.response.edit_message(content="✅ You accepted the trade.", embed=None, view=None)
-                        self.stop()
-
-                    async def reject_cb(self, inter: discord.Interaction):
-                        self.result = False
-                        await inter.response.edit_message(content="❌ You rejected the trade.", embed=None, view=None)
-                        self.stop()
-
-                try:
-                    confirm_view = ConfirmView()
-                    confirm_msg = await member.send(embed=confirm_embed, view=confirm_view)
-                except discord.Forbidden:
-                    return await interaction.response.send_message(f"❌ Could not DM {member.display_name} to request confirmation.")
-
-                # wait for partner response
-                try:
-                    await confirm_view.wait()
-                    res = confirm_view.result
-                except Exception:
-                    res = None
-
-                if res is not True:
-                    # partner rejected or timed out
-                    # notify both panels
-                    try:
-                        if session["initiator_msg"]:
-                            await session["initiator_msg"].edit(content="❌ Trade declined or timed out.", embed=None, view=None)
-                        if session["partner_msg"]:
-                            await session["partner_msg"].edit(content="❌ Trade declined or timed out.", embed=None, view=None)
-                    except Exception:
-                        pass
-                    return await interaction.followup.send("❌ Trade was declined or timed out.")
-
-                # Partner accepted — finalize trade after re-checks
-                # Re-fetch inventories and balances
-                fresh_your_inv = await self.get_inventory(ctx.author.id) or {}
-                fresh_their_inv = await self.get_inventory(member.id) or {}
-                your_balance = await self.get_balance(ctx.author.id)
-                their_balance = await self.get_balance(member.id)
-
-                # Validate items availability
-                for it in session["initiator_items"]:
-                    if fresh_your_inv.get(it, 0) < 1:
-                        try:
-                            await member.send("❌ Trade failed: initiator no longer has offered items.")
-                        except Exception:
-                            pass
-                        try:
-                            if session["initiator_msg"]:
-                                await session["initiator_msg"].edit(content="❌ Trade failed: items changed.", embed=None, view=None)
-                        except Exception:
-                            pass
-                        return await interaction.followup.send("❌ Trade failed: initiator no longer has offered items.")
-                for it in session["partner_items"]:
-                    if fresh_their_inv.get(it, 0) < 1:
-                        try:
-                            await ctx.author.send("❌ Trade failed: partner no longer has offered items.")
-                        except Exception:
-                            pass
-                        try:
-                            if session["partner_msg"]:
-                                await session["partner_msg"].edit(content="❌ Trade failed: items changed.", embed=None, view=None)
-                        except Exception:
-                            pass
-                        return await interaction.followup.send("❌ Trade failed: partner no longer has offered items.")
-
-                # Validate coins availability
-                if your_balance < session["initiator_coins"]:
-                    return await interaction.followup.send("❌ You no longer have enough coins to offer.")
-                if their_balance < session["partner_coins"]:
-                    return await interaction.followup.send(f"❌ {member.display_name} no longer has enough coins to offer.")
-
-                # Execute atomic-like swap (best effort)
-                try:
-                    # transfer items
-                    for it in session["initiator_items"]:
-                        await self.remove_item(ctx.author.id, it, 1)
-                        await self.add_item(member.id, it, 1)
-                    for it in session["partner_items"]:
-                        await self.remove_item(member.id, it, 1)
-                        await self.add_item(ctx.author.id, it, 1)
-                    # transfer coins
-                    if session["initiator_coins"] > 0:
-                        await self.update_balance(ctx.author.id, -session["initiator_coins"])
-                        await self.update_balance(member.id, session["initiator_coins"])
-                    if session["partner_coins"] > 0:
-                        await self.update_balance(member.id, -session["partner_coins"])
-                        await self.update_balance(ctx.author.id, session["partner_coins"])
-                except Exception:
-                    # best-effort: inform users
-                    try:
-                        if session["initiator_msg"]:
-                            await session["initiator_msg"].edit(content="❌ Trade failed due to an internal error.", embed=None, view=None)
-                        if session["partner_msg"]:
-                            await session["partner_msg"].edit(content="❌ Trade failed due to an internal error.", embed=None, view=None)
-                    except Exception:
-                        pass
-                    return await interaction.followup.send("❌ Trade failed due to an internal error. Please try again later.")
-
-                # Success
-                try:
-                    if session["initiator_msg"]:
-                        await session["initiator_msg"].edit(content="✅ Trade completed successfully!", embed=None, view=None)
-                    if session["partner_msg"]:
-                        await session["partner_msg"].edit(content="✅ Trade completed successfully!", embed=None, view=None)
-                except Exception:
-                    pass
-
-                await interaction.followup.send("✅ Trade completed successfully.")
-                try:
-                    await ctx.author.send(f"✅ Trade with {member.display_name} completed.")
-                except Exception:
-                    pass
-                try:
-                    await member.send(f"✅ Trade with {ctx.author.display_name} completed.")
-                except Exception:
-                    pass
-                session["active"] = False
-                self.stop()
-        # send DMs with views and store messages for cross-editing
-
-
-        try:
-            init_msg = await ctx.author.send(embed=create_trade_embed(), view=trade_view)
-            part_msg = await member.send(embed=create_trade_embed(), view=trade_view)
-            session["initiator_msg"] = init_msg
-            session["partner_msg"] = part_msg
-            logger.info(f"[ECONOMY] trade panels sent initiator={ctx.author.id} partner={member.id}")
-        except Exception:
-            logger.exception("[ECONOMY] failed to send trade panels")
-            return await ctx.send("❌ Failed to open trade panels.")
-
-        # Wait until either view times out or session becomes inactive
-        try:
-            await asyncio.wait_for(trade_view.wait(), timeout=600)
-        except asyncio.TimeoutError:
-            if session["active"]:
-                # timeout - cancel trade panels
-                try:
-                    await init_msg.edit(content="⏰ Trade timed out.", embed=None, view=None)
-                    await part_msg.edit(content="⏰ Trade timed out.", embed=None, view=None)
-                except Exception:
-                    pass
-
-        # done
-        return
+        session["active"] = False
 
 
     # leader board
-    @economy_group.command(name="leaderboard", aliases=["lb"])
-    async def leaderboard(self, ctx):
-        logger.info(f"[ECONOMY] Command: leaderboard by user={ctx.author.id}")
-        leaderboard = await self.fetch_leaderboard()
-        if not leaderboard:
-            return await ctx.send("❌ No data for leaderboard.")
-
-        embed = discord.Embed(title="🏆 Economy Leaderboard", color=BALANCE_COLOR)
+    def build_leaderboard_embed(self, title: str, rows: list[tuple[int, int]], page: int, guild: discord.Guild | None = None) -> discord.Embed:
+        embed = discord.Embed(title=title, color=BALANCE_COLOR)
         description = ""
-        for i, (user_id, balance) in enumerate(leaderboard, start=1):
-            user = self.bot.get_user(user_id)
+        start = (page - 1) * LEADERBOARD_PAGE_SIZE + 1
+        for i, (user_id, balance) in enumerate(rows, start=start):
+            user = (guild.get_member(user_id) if guild else None) or self.bot.get_user(user_id)
             username = user.display_name if user else f"User ID {user_id}"
             description += f"**{i}. {username}** - {balance} coins\n"
         embed.description = description
+        embed.set_footer(text=f"Page {page} | {PREFIX}economy leaderboard [page] | Version: {ECONOMY_VERSION}")
+        return embed
+
+    @economy_group.group(name="leaderboard", aliases=["lb"], invoke_without_command=True)
+    async def leaderboard(self, ctx, page: int = 1):
+        logger.info(f"[ECONOMY] Command: leaderboard by user={ctx.author.id} page={page}")
+        if page <= 0:
+            return await ctx.send("❌ Page must be positive.")
+        leaderboard = await self.fetch_leaderboard(page)
+        if not leaderboard:
+            return await ctx.send("❌ No data for leaderboard." if page == 1 else "❌ That page is empty.")
+        await ctx.send(embed=self.build_leaderboard_embed("🏆 Economy Leaderboard", leaderboard, page))
+
+    @leaderboard.command(name="server", aliases=["guild"])
+    async def leaderboard_server(self, ctx, page: int = 1):
+        logger.info(f"[ECONOMY] Command: leaderboard server by user={ctx.author.id} page={page}")
+        if not ctx.guild:
+            return await ctx.send("❌ This leaderboard only works in a server.")
+        if page <= 0:
+            return await ctx.send("❌ Page must be positive.")
+        leaderboard = await self.fetch_guild_leaderboard(ctx.guild, page)
+        if not leaderboard:
+            return await ctx.send("❌ No data for leaderboard." if page == 1 else "❌ That page is empty.")
+        await ctx.send(embed=self.build_leaderboard_embed(f"🏆 {ctx.guild.name} Leaderboard", leaderboard, page, ctx.guild))
+
+    @leaderboard.command(name="me", aliases=["rank"])
+    async def leaderboard_me(self, ctx, member: discord.Member = None):
+        member = member or ctx.author
+        if member.bot:
+            return await ctx.send("❌ Bots are not ranked.")
+        rank, balance = await self.fetch_rank(member.id)
+        embed = discord.Embed(title=f"🏆 {member.display_name}'s Rank", color=BALANCE_COLOR)
+        embed.add_field(name="Rank", value=f"#{rank}")
+        embed.add_field(name="💰 Coins", value=balance)
         embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
         await ctx.send(embed=embed)
 
@@ -1516,6 +2309,10 @@ class Economy(commands.Cog):
         embed.add_field(name=PREFIX+"eco admin inventory see <user>", value=f"Sees a user's inventory.", inline=False)
         embed.add_field(name=PREFIX+"eco admin cooldown all <user>", value=f"Clears all cooldowns for a user.", inline=False)
         embed.add_field(name=PREFIX+"eco admin cooldown one <user> <command>", value=f"Clears a specific command cooldown for a user.", inline=False)
+        embed.add_field(name=PREFIX+"eco admin ledger <user> [limit]", value="Shows a user's latest journal entries.", inline=False)
+        embed.add_field(name=PREFIX+"eco admin reconcile <user> [fix]", value="Replays a user's journal and compares it with their data.", inline=False)
+        embed.add_field(name=PREFIX+"eco admin export [ndjson|csv]", value="Exports all economy tables as a zip archive.", inline=False)
+        embed.add_field(name=PREFIX+"eco admin import [path]", value="Replaces economy tables from an attached or saved export archive.", inline=False)
 
         embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
 
@@ -1523,25 +2320,27 @@ class Economy(commands.Cog):
 
     @admin_group.command(name="give")
     @commands.is_owner()
+    @locks_user("member")
     async def give(self, ctx, member: discord.Member, amount: int):
-        await self.update_balance(member.id, amount)
+        await self.update_balance(member.id, amount, "admin give")
         logger.info(f"[ECONOMY] admin give by owner={ctx.author.id} to={member.id} amount={amount}")
         await ctx.send(f"✅ Gave {amount} coins to {member.mention}")
 
     @admin_group.command(name="take")
     @commands.is_owner()
+    @locks_user("member")
     async def take(self, ctx, member: discord.Member, amount: int):
-        await self.update_balance(member.id, -amount)
+        await self.update_balance(member.id, -amount, "admin take")
         logger.info(f"[ECONOMY] admin take by owner={ctx.author.id} from={member.id} amount={amount}")
         await ctx.send(f"✅ Took {amount} coins from {member.mention}")
 
     @admin_group.command(name="reset")
     @commands.is_owner()
+    @locks_user("member")
     async def reset(self, ctx, member: discord.Member):
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("DELETE FROM economy WHERE user_id = ?", (member.id,))
-            await db.execute("DELETE FROM inventory WHERE user_id = ?", (member.id,))
-            await db.commit()
+        async with self.tx("admin reset") as tx:
+            await tx.reset_user(member.id)
+        self.leaderboard_cache.forget(member.id)
         logger.info(f"[ECONOMY] admin reset by owner={ctx.author.id} user={member.id}")
         await ctx.send(f"✅ Reset {member.mention}'s profile.")
     
@@ -1552,20 +2351,18 @@ class Economy(commands.Cog):
     @shop_admin_group.command(name="add")
     @commands.is_owner()
     async def shop_add(self, ctx, item_id: str, price: int, *, name: str):
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute(
-                "INSERT OR REPLACE INTO shop_items (item_id, name, price) VALUES (?, ?, ?)",
-                (item_id.lower(), name, price)
-            )
-            await db.commit()
+        await self.db.execute(
+            "INSERT OR REPLACE INTO shop_items (item_id, name, price) VALUES (?, ?, ?)",
+            (item_id.lower(), name, price)
+        )
+        self.shop_catalog.put(item_id.lower(), name, price)
         await ctx.send(f"✅ Added/Updated shop item `{item_id}` → {name} ({price} coins)")
 
     @shop_admin_group.command(name="remove", aliases=["delete", "del", "rm", "rem"])
     @commands.is_owner()
     async def shop_remove(self, ctx, item_id: str):
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("DELETE FROM shop_items WHERE item_id = ?", (item_id.lower(),))
-            await db.commit()
+        await self.db.execute("DELETE FROM shop_items WHERE item_id = ?", (item_id.lower(),))
+        self.shop_catalog.remove(item_id.lower())
         await ctx.send(f"✅ Removed shop item `{item_id}`")
     
     @admin_group.group(name="inventory", invoke_without_command=False, aliases=["inv"])
@@ -1574,41 +2371,41 @@ class Economy(commands.Cog):
 
     @inventory_admin_group.command(name="clear", aliases=["clearinventory", "invclear"])
     @commands.is_owner()
+    @locks_user("member")
     async def inventory_clear(self, ctx, member: discord.Member):
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("DELETE FROM inventory WHERE user_id = ?", (member.id,))
-            await db.commit()
+        async with self.tx("admin inventory clear") as tx:
+            await tx.clear_inventory(member.id)
         await ctx.send(f"✅ Cleared {member.mention}'s inventory.")
     
     @admin_group.command(name="setbalance", aliases=["setbal"])
     @commands.is_owner()
+    @locks_user("member")
     async def set_balance(self, ctx, member: discord.Member, amount: int):
         if amount < 0:
             return await ctx.send("❌ Balance cannot be negative.")
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("INSERT OR REPLACE INTO economy (user_id, balance, last_daily) VALUES (?, ?, COALESCE((SELECT last_daily FROM economy WHERE user_id = ?), NULL))",
-                            (member.id, amount, member.id))
-            await db.commit()
+        async with self.tx("admin setbalance") as tx:
+            await tx.set_balance(member.id, amount)
         await ctx.send(f"✅ Set {member.mention}'s balance to {amount} coins.")
     
     @admin_group.command(name="resetdaily")
     @commands.is_owner()
+    @locks_user("member")
     async def reset_daily(self, ctx, member: discord.Member):
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("UPDATE economy SET last_daily = NULL WHERE user_id = ?", (member.id,))
-            await db.commit()
+        await self.db.execute("UPDATE economy SET last_daily = NULL WHERE user_id = ?", (member.id,))
         await ctx.send(f"✅ Reset {member.mention}'s daily reward.")
 
     @inventory_admin_group.command(name="give", aliases=["add"])
     @commands.is_owner()
+    @locks_user("member")
     async def inventory_give(self, ctx, member: discord.Member, item: str, amount: int = 1):
         if amount <= 0:
             return await ctx.send("❌ Amount must be positive.")
-        await self.add_item(member.id, item.lower(), amount)
+        await self.add_item(member.id, item.lower(), amount, "admin inventory give")
         await ctx.send(f"✅ Gave {amount} x {item} to {member.mention}'s inventory.")
 
     @inventory_admin_group.command(name="take", aliases=["remove", "del", "rm", "rem"])
     @commands.is_owner()
+    @locks_user("member")
     async def inventory_take(self, ctx, member: discord.Member, item: str, amount: int = 1):
         if amount <= 0:
             return await ctx.send("❌ Amount must be positive.")
@@ -1618,7 +2415,7 @@ class Economy(commands.Cog):
             amount = user_inventory.get(item.lower(), 0)
             if amount == 0:
                 return await ctx.send(f"❌ {member.mention} does not have that item in their inventory.")
-        await self.remove_item(member.id, item.lower(), amount)
+        await self.remove_item(member.id, item.lower(), amount, "admin inventory take")
         await ctx.send(f"✅ Took {amount} x {item} from {member.mention}'s inventory.")
 
     @inventory_admin_group.command(name="see", aliases=["inventoryview", "invsee", "seeinventory", "viewinventory", "invview"])
@@ -1636,18 +2433,101 @@ class Economy(commands.Cog):
     
     @cooldown_admin_group.command(name="all", aliases=["resetcooldowns", "cooldownclear", "cooldownreset"])
     @commands.is_owner()
-    async def clear_cooldowns(self, ctx, member: discord.Member):
+    async def admin_clear_cooldowns(self, ctx, member: discord.Member):
         await self.clear_cooldowns(member.id)
         await ctx.send(f"✅ Cleared all cooldowns for {member.mention}.")
         
     @cooldown_admin_group.command(name="one", aliases=["resetcooldown", "cooldownclearone", "cooldownresetone"])
     @commands.is_owner()
     async def clear_cooldown(self, ctx, member: discord.Member, command: str):
-        async with aiosqlite.connect(DB_PATH) as db:
-            await db.execute("DELETE FROM cooldowns WHERE user_id = ? AND command = ?", (member.id, command))
-            await db.commit()
+        await self.delete_old_record_cooldown(member.id, command)
         await ctx.send(f"✅ Cleared cooldown for command '{command}' for {member.mention}.")
 
+    @admin_group.command(name="ledger", aliases=["journal", "history"])
+    @commands.is_owner()
+    async def admin_ledger(self, ctx, member: discord.Member, limit: int = 15):
+        limit = max(1, min(limit, 25))
+        rows = await self.db.fetchall(
+            "SELECT id, ts, item, delta, balance_after, reason FROM economy_ledger "
+            "WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+            (member.id, limit),
+        )
+        if not rows:
+            return await ctx.send(f"❌ No journal entries for {member.mention}.")
+        embed = discord.Embed(title=f"📒 {member.display_name}'s Ledger", color=BALANCE_COLOR)
+        embed.description = "\n".join(
+            f"`#{ledger_id}` <t:{ts}:d> **{reason}**: {delta:+} {f'x {item}' if item else 'coins'} → {balance_after}"
+            for ledger_id, ts, item, delta, balance_after, reason in rows
+        )
+        embed.set_footer(text=f"Version: {ECONOMY_VERSION}")
+        await ctx.send(embed=embed)
+
+    @admin_group.command(name="reconcile", aliases=["replay"])
+    @commands.is_owner()
+    @locks_user("member")
+    async def admin_reconcile(self, ctx, member: discord.Member, fix: bool = False):
+        report = await self.reconcile_user(member.id)
+        embed = discord.Embed(title=f"🧾 Reconcile {member.display_name}", color=BALANCE_COLOR)
+        embed.add_field(name="Replayed", value=f"{report['replayed']} entries after checkpoint #{report['checkpoint']}", inline=False)
+        embed.add_field(name="Journal balance", value=report["expected"])
+        embed.add_field(name="Stored balance", value=report["actual"])
+        if report["first_bad"] is not None:
+            embed.add_field(name="First inconsistent entry", value=f"#{report['first_bad']}", inline=False)
+        if report["items"]:
+            embed.add_field(
+                name="Item mismatches (journal / stored)",
+                value="\n".join(f"{item}: {journal} / {stored}" for item, (journal, stored) in report["items"].items()),
+                inline=False,
+            )
+        balanced = report["expected"] == report["actual"] and not report["items"]
+        if not balanced and fix:
+            async with self.tx("admin reconcile") as tx:
+                if report["expected"] != report["actual"]:
+                    await tx.restore_balance(member.id, report["expected"])
+                for item, (journal, _) in report["items"].items():
+                    await tx.restore_item(member.id, item, journal)
+            logger.info(f"[ECONOMY] admin reconcile fix by owner={ctx.author.id} user={member.id} report={report}")
+        status = "✅ Consistent" if balanced else ("🔧 Restored from journal" if fix else "⚠️ Out of sync; run with `fix` to restore from the journal")
+        embed.set_footer(text=f"{status} | Version: {ECONOMY_VERSION}")
+        await ctx.send(embed=embed)
+
+    @admin_group.command(name="export", aliases=["dump"])
+    @commands.is_owner()
+    async def admin_export(self, ctx, fmt: str = "ndjson"):
+        fmt = fmt.lower()
+        if fmt not in economy_io.FORMATS:
+            return await ctx.send(f"❌ Format must be one of: {', '.join(economy_io.FORMATS)}.")
+        async with ctx.typing():
+            path, counts = await self.export_economy(fmt)
+        summary = ", ".join(f"{table}: {count}" for table, count in counts.items())
+        logger.info(f"[ECONOMY] admin export by owner={ctx.author.id} path={path}")
+        limit = ctx.guild.filesize_limit if ctx.guild else discord.utils.DEFAULT_FILE_SIZE_LIMIT_BYTES
+        if os.path.getsize(path) <= limit:
+            await ctx.send(f"✅ Exported {summary}", file=discord.File(path))
+        else:
+            await ctx.send(f"✅ Exported {summary}\nThe archive is too large to upload; it was saved to `{path}`.")
+
+    @admin_group.command(name="import", aliases=["load"])
+    @commands.is_owner()
+    async def admin_import(self, ctx, path: str = None):
+        with tempfile.TemporaryDirectory() as workdir:
+            if ctx.message.attachments:
+                attachment = ctx.message.attachments[0]
+                if not attachment.filename.endswith(".zip"):
+                    return await ctx.send("❌ Please attach a .zip archive made by `eco admin export`.")
+                path = os.path.join(workdir, "import.zip")
+                await attachment.save(path)
+            elif not path or not os.path.isfile(path):
+                return await ctx.send("❌ Attach an export archive or give the path of one saved on the bot's host.")
+            try:
+                async with ctx.typing():
+                    backup, counts = await self.import_economy(path)
+            except economy_io.ArchiveError as e:
+                return await ctx.send(f"❌ Import failed, nothing was changed: {e}")
+        summary = ", ".join(f"{table}: {count}" for table, count in counts.items())
+        logger.info(f"[ECONOMY] admin import by owner={ctx.author.id} counts={counts}")
+        await ctx.send(f"✅ Imported {summary}\nThe previous data was saved to `{backup}`.")
+
 # ===================== SETUP =====================
 async def setup(bot):
     try: 
@@ -0,0 +1,263 @@
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import contextlib
+import datetime
+import os
+import sqlite3
+import time
+from main import logger
+from settings import PREFIX
+
+# ===================== CONFIG =====================
+DATABASES = ("src/databases/economy.db", "src/databases/user.db", "src/databases/music.db")
+BACKUP_DIR = "src/databases/backups"
+MAINTENANCE_INTERVAL_HOURS = 6  # How often checkpoint, vacuum and analyze run
+BACKUP_INTERVAL_HOURS = 24      # A new backup is taken once the newest one is this old
+BACKUPS_KEPT = 7                # Backups kept per database; older ones are deleted
+VACUUM_PAGES_PER_STEP = 256     # Free pages returned to the filesystem per incremental_vacuum step
+VACUUM_MIN_FREE_PAGES = 128     # Smaller freelists are left alone
+ANALYSIS_LIMIT = 1000           # Rows ANALYZE samples per index
+BACKUP_PAGES_PER_STEP = 256     # Rollback-journal databases are copied this many pages at a time
+STEP_PAUSE_SECONDS = 0.2        # Pause between steps so queued writes get the database back
+BUSY_TIMEOUT_MS = 2000
+
+
+# ===================== STEPS =====================
+# Blocking helpers, always run through asyncio.to_thread
+def _connect(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    db.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    return db
+
+
+def _pragma(db: sqlite3.Connection, pragma: str):
+    return db.execute(f"PRAGMA {pragma}").fetchone()[0]
+
+
+def _checkpoint(db: sqlite3.Connection) -> tuple[int, int, int]:
+    return tuple(db.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone())
+
+
+def _enable_incremental_vacuum(db: sqlite3.Connection):
+    # auto_vacuum only changes through a full VACUUM, which rewrites the whole file; only the
+    # owner's `maintenance convert` runs this, never the periodic pass
+    db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    db.execute("VACUUM")
+
+
+def _incremental_vacuum(db: sqlite3.Connection, pages: int) -> int:
+    before = _pragma(db, "freelist_count")
+    # The pragma frees one page per step and Connection.execute() only steps it once;
+    # executescript() runs it to completion
+    db.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+    return before - _pragma(db, "freelist_count")
+
+
+def _analyze(db: sqlite3.Connection):
+    db.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    db.execute("ANALYZE")
+
+
+def _backup(path: str, dest: str, wal: bool) -> str:
+    source = _connect(path)
+    partial = dest + ".part"
+    try:
+        target = sqlite3.connect(partial)
+        try:
+            # A WAL reader never blocks writers, so one step gives a consistent copy for free;
+            # rollback-journal databases are copied in slices so writers get turns in between
+            source.backup(target, pages=-1 if wal else BACKUP_PAGES_PER_STEP, sleep=STEP_PAUSE_SECONDS)
+            target.execute("PRAGMA journal_mode = DELETE")
+            check = _pragma(target, "quick_check")
+        finally:
+            target.close()
+    finally:
+        source.close()
+    if check != "ok":
+        os.remove(partial)
+        raise sqlite3.DatabaseError(f"backup failed quick_check: {check}")
+    os.replace(partial, dest)
+    return dest
+
+
+def _rotate_backups(name: str) -> list[str]:
+    prefix, suffix = f"{name}-", ".db"
+    backups = sorted(f for f in os.listdir(BACKUP_DIR) if f.startswith(prefix) and f.endswith(suffix))
+    removed = backups[:-BACKUPS_KEPT] if BACKUPS_KEPT > 0 else []
+    for filename in removed:
+        os.remove(os.path.join(BACKUP_DIR, filename))
+    return removed
+
+
+def _latest_backup_age(name: str) -> float | None:
+    if not os.path.isdir(BACKUP_DIR):
+        return None
+    mtimes = [
+        os.path.getmtime(os.path.join(BACKUP_DIR, f))
+        for f in os.listdir(BACKUP_DIR)
+        if f.startswith(f"{name}-") and f.endswith(".db")
+    ]
+    return time.time() - max(mtimes) if mtimes else None
+
+
+# ===================== COG =====================
+class Maintenance(commands.Cog):
+    """Keeps the bot's SQLite databases small, analyzed and backed up.
+
+    Every pass checkpoints the WAL, returns free pages with incremental vacuum, refreshes the
+    planner statistics and takes a rotating online backup once the newest one is old enough.
+    Work runs in short steps on a worker thread; for economy.db each writing step also holds
+    the Economy cog's write lock, so its commands queue for a moment instead of hitting
+    SQLITE_BUSY. Databases created before incremental vacuum was enabled need one full VACUUM,
+    which is never part of a periodic pass: the owner runs it with `maintenance convert`.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.lock = asyncio.Lock()
+        self.reports: dict[str, dict] = {}  # database name -> report of the latest pass
+
+    async def cog_load(self):
+        self.maintenance_loop.start()
+
+    async def cog_unload(self):
+        self.maintenance_loop.cancel()
+
+    @tasks.loop(hours=MAINTENANCE_INTERVAL_HOURS)
+    async def maintenance_loop(self):
+        await self.run_maintenance()
+
+    @maintenance_loop.before_loop
+    async def before_maintenance_loop(self):
+        await self.bot.wait_until_ready()
+
+    def _exclusive(self, path: str):
+        economy = self.bot.get_cog("Economy")
+        if economy is not None and os.path.abspath(economy.db.path) == os.path.abspath(path):
+            return economy.db.exclusive()
+        return contextlib.nullcontext()
+
+    async def _step(self, report: dict, path: str, label: str, func, *args, exclusive: bool = True):
+        started = time.perf_counter()
+        async with self._exclusive(path) if exclusive else contextlib.nullcontext():
+            result = await asyncio.to_thread(func, *args)
+        report["timings"][label] = report["timings"].get(label, 0.0) + time.perf_counter() - started
+        await asyncio.sleep(STEP_PAUSE_SECONDS)
+        return result
+
+    async def maintain(self, path: str, force_backup: bool = False, convert: bool = False) -> dict:
+        name = os.path.splitext(os.path.basename(path))[0]
+        report = {"started": int(time.time()), "timings": {}, "freed_pages": 0, "backup": None, "needs_convert": False}
+        started = time.perf_counter()
+        db = await asyncio.to_thread(_connect, path)
+        try:
+            wal = await asyncio.to_thread(_pragma, db, "journal_mode") == "wal"
+            if wal:
+                busy, frames, _ = await self._step(report, path, "checkpoint", _checkpoint, db)
+                report["wal_frames"] = frames
+                if busy:
+                    logger.info(f"[MAINTENANCE] {name}: WAL checkpoint could not finish while readers were active")
+
+            if await asyncio.to_thread(_pragma, db, "auto_vacuum") != 2:
+                if convert:
+                    logger.info(f"[MAINTENANCE] {name}: enabling incremental vacuum (one-time full VACUUM)")
+                    await self._step(report, path, "vacuum", _enable_incremental_vacuum, db)
+                else:
+                    report["needs_convert"] = True
+                    logger.info(f"[MAINTENANCE] {name}: incremental vacuum not enabled; run {PREFIX}maintenance convert once")
+            else:
+                free_pages = await asyncio.to_thread(_pragma, db, "freelist_count")
+                while free_pages >= VACUUM_MIN_FREE_PAGES:
+                    freed = await self._step(report, path, "vacuum", _incremental_vacuum, db, VACUUM_PAGES_PER_STEP)
+                    if freed <= 0:
+                        break
+                    report["freed_pages"] += freed
+                    free_pages -= freed
+
+            await self._step(report, path, "analyze", _analyze, db)
+        finally:
+            await asyncio.to_thread(db.close)
+
+        age = _latest_backup_age(name)
+        if force_backup or age is None or age >= BACKUP_INTERVAL_HOURS * 3600:
+            os.makedirs(BACKUP_DIR, exist_ok=True)
+            stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d-%H%M%S")
+            dest = os.path.join(BACKUP_DIR, f"{name}-{stamp}.db")
+            report["backup"] = await self._step(report, path, "backup", _backup, path, dest, wal, exclusive=False)
+            removed = await asyncio.to_thread(_rotate_backups, name)
+            if removed:
+                logger.info(f"[MAINTENANCE] {name}: removed {len(removed)} old backups")
+
+        report["total"] = time.perf_counter() - started
+        report["size"] = os.path.getsize(path)
+        timings = " ".join(f"{label}={seconds * 1000:.0f}ms" for label, seconds in report["timings"].items())
+        logger.info(
+            f"[MAINTENANCE] {name}: {timings} freed_pages={report['freed_pages']} "
+            f"size={report['size'] / 1024:.0f}KB backup={report['backup'] or 'skipped'} total={report['total']:.2f}s"
+        )
+        return report
+
+    async def run_maintenance(self, force_backup: bool = False, convert: bool = False) -> dict[str, dict]:
+        """Maintain every existing database in turn; one database failing does not stop the rest.
+
+        `convert` also runs the one-time full VACUUM that enables incremental vacuum. It holds
+        each database (and the Economy cog's writer) for the whole rebuild.
+        """
+        async with self.lock:
+            for path in DATABASES:
+                if not os.path.exists(path):
+                    continue
+                name = os.path.splitext(os.path.basename(path))[0]
+                try:
+                    self.reports[name] = await self.maintain(path, force_backup, convert)
+                except Exception as e:
+                    logger.error(f"[MAINTENANCE] {name}: maintenance failed: {e}")
+        return self.reports
+
+    # ===================== COMMANDS =====================
+    @commands.group(name="maintenance", aliases=["maint"], invoke_without_command=True)
+    @commands.is_owner()
+    async def maintenance_group(self, ctx):
+        embed = discord.Embed(title="🧰 Database Maintenance", color=discord.Color.blurple())
+        if not self.reports:
+            embed.description = "No maintenance pass has finished since the bot started."
+        for name, report in self.reports.items():
+            timings = ", ".join(f"{label} {seconds * 1000:.0f}ms" for label, seconds in report["timings"].items())
+            backup = os.path.basename(report["backup"]) if report["backup"] else "skipped"
+            embed.add_field(
+                name=f"{name} (<t:{report['started']}:R>)",
+                value=f"{timings}\nFreed {report['freed_pages']} pages, size {report['size'] / 1024:.0f} KB\nBackup: {backup}"
+                + (f"\nIncremental vacuum off: run `{PREFIX}maintenance convert`" if report.get("needs_convert") else ""),
+                inline=False,
+            )
+        next_run = self.maintenance_loop.next_iteration
+        footer = f"{PREFIX}maintenance run [backup] to run now, {PREFIX}maintenance convert to enable incremental vacuum"
+        embed.set_footer(text=footer + (f" | Next pass at {next_run:%Y-%m-%d %H:%M} UTC" if next_run else ""))
+        await ctx.send(embed=embed)
+
+    @maintenance_group.command(name="run")
+    @commands.is_owner()
+    async def maintenance_run(self, ctx, backup: bool = False):
+        if self.lock.locked():
+            return await ctx.send("⏳ A maintenance pass is already running.")
+        async with ctx.typing():
+            await self.run_maintenance(force_backup=backup)
+        logger.info(f"[MAINTENANCE] Manual pass by owner={ctx.author.id} backup={backup}")
+        await self.maintenance_group(ctx)
+
+    @maintenance_group.command(name="convert")
+    @commands.is_owner()
+    async def maintenance_convert(self, ctx):
+        """Run the one-time full VACUUM on databases without incremental vacuum, then a normal pass."""
+        if self.lock.locked():
+            return await ctx.send("⏳ A maintenance pass is already running.")
+        await ctx.send("🧱 Rebuilding databases without incremental vacuum; economy commands wait until this finishes.")
+        async with ctx.typing():
+            await self.run_maintenance(convert=True)
+        logger.info(f"[MAINTENANCE] Incremental vacuum conversion by owner={ctx.author.id}")
+        await self.maintenance_group(ctx)
+
+
+async def setup(bot):
+    await bot.add_cog(Maintenance(bot))
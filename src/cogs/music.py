@@ -3,40 +3,770 @@ from discord import app_commands
 from discord.ext import commands, tasks
 import wavelink
 import typing
+import aiosqlite
+import json
+import os
 from main import logger
 from settings import LAVALINK_URI, LAVALINK_PASSWORD, PREFIX
+import settings
 import asyncio
+import contextlib
+import functools
+import heapq
+import itertools
+import threading
 import time
 import re
 import urllib.parse as _urlparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import yt_dlp
 
+# ===================== CONFIG =====================
+SEARCH_WORKERS = 4           # Threads running yt-dlp searches; further searches wait for a free one
+SEARCH_TIMEOUT = 20          # Seconds before a search is given up
+SEARCH_CACHE_SIZE = 1024     # Resolved queries kept in memory (least recently used are dropped)
+SEARCH_CACHE_TTL = 6 * 3600  # Seconds a resolved query is reused
+SEARCH_MISS_TTL = 120        # Seconds a query without results is remembered
+MUSIC_DB_PATH = "src/databases/music.db"
+TRACK_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Memory budget for cached Lavalink results (JSON size)
+TRACK_CACHE_TTL = 24 * 3600  # Seconds a loaded track is reused
+TRACK_CACHE_PLAYLIST_TTL = 3600  # Playlists change more often than single tracks
+TRACK_CACHE_PERSIST = True   # Keep cached results in MUSIC_DB_PATH so they survive restarts
+TRACK_CACHE_DISK_ROWS = 20000  # Rows kept on disk; the ones expiring soonest go first
+TRACKING_PARAMS = ("si", "feature", "pp", "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content")
+PANEL_EVENT_DELAY = 0.5        # State changes within this window share one panel edit
+PANEL_MIN_EDIT_INTERVAL = 2.0  # Seconds between edits of the same panel (Discord allows 5 per 5s per channel)
+PANEL_EDIT_SPACING = 0.25      # Seconds between any two panel edits; spreads guilds out instead of bursting
+PANEL_PROGRESS_MIN = 15        # Fastest progress refresh, for short tracks
+PANEL_PROGRESS_MAX = 60        # Slowest progress refresh, for long tracks and streams
+PROGRESS_BAR_LENGTH = 25       # Blocks in the panel's progress bar
+NODE_STATS_TIMEOUT = 5         # Seconds a node gets to answer /v4/stats
+NODE_STATS_FAILURES = 2        # Failed stats checks in a row before a node counts as down
+NODE_FRAME_LOSS_LIMIT = 0.05   # Share of audio frames nulled or missing before a node counts as degraded
+NODE_MIGRATIONS_PER_CHECK = 10 # Players moved off a degraded node per monitor tick
+SNAPSHOT_DEBOUNCE = 2.0        # Seconds player changes collect before they are written to MUSIC_DB_PATH
+SNAPSHOT_POSITION_INTERVAL = 30  # Playing guilds are re-saved this often so the stored position stays close
+PREFETCH_AHEAD = 3             # Queued searches resolved in the background before they reach the front
+QUEUE_PAGE_SIZE = 10           # Tracks per page of the queue view
+QUEUE_CACHED_PAGES = 8         # Rendered pages an open queue view keeps until the queue changes
+MAX_QUEUE_LENGTH = 5000        # Queue cap per guild; MUSIC_QUEUE_LIMITS in settings.py overrides it per guild id
+PLAYLIST_CHUNK_SIZE = 200      # Playlist tracks queued per step; other guilds get the event loop in between
+PLAYLIST_PROGRESS_INTERVAL = 1.0  # Seconds between edits of a playlist's progress message
+
+# Nastavenia pre yt-dlp
+YDL_OPTS = {
+    'format': 'best',
+    'noplaylist': True,        # Zabezpečí, že sa nebude spracovávať celý playlist
+    'quiet': True,             # Potlačí výpisy do konzoly
+    'simulate': True,          # Nesťahovať video, iba získať info
+    'default_search': 'ytsearch', # Nastaví vyhľadávanie cez YouTube
+    'extract_flat': 'in_playlist', # Stačí nám výsledok vyhľadávania, nie celé info o videu
+}
+_ydl_local = threading.local()
+
 def get_url_from_query(query):
-    # Nastavenia pre yt-dlp
-    ydl_opts = {
-        'format': 'best',
-        'noplaylist': True,        # Zabezpečí, že sa nebude spracovávať celý playlist
-        'quiet': True,             # Potlačí výpisy do konzoly
-        'simulate': True,          # Nesťahovať video, iba získať info
-        'default_search': 'ytsearch', # Nastaví vyhľadávanie cez YouTube
-    }
-
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        # Vyhľadáme iba prvý výsledok (ytsearch1)
-        info = ydl.extract_info(f"ytsearch1:{query}", download=False)
-        
-        if 'entries' in info and len(info['entries']) > 0:
-            # Získame URL z prvého nájdeného záznamu
-            video_url = info['entries'][0]['webpage_url']
-            return video_url
-        return None
+    """Blocking yt-dlp search; call it through `QueryResolver`, never on the event loop."""
+    # One YoutubeDL per worker thread, reused across searches
+    ydl = getattr(_ydl_local, "ydl", None)
+    if ydl is None:
+        ydl = _ydl_local.ydl = yt_dlp.YoutubeDL(YDL_OPTS)
+    # Vyhľadáme iba prvý výsledok (ytsearch1)
+    info = ydl.extract_info(f"ytsearch1:{query}", download=False)
+
+    if info and info.get('entries'):
+        # Získame URL z prvého nájdeného záznamu
+        entry = info['entries'][0]
+        return entry.get('webpage_url') or entry.get('url')
+    return None
+
+class QueryResolver:
+    """Resolves free-text searches to YouTube URLs without blocking the event loop.
+
+    Searches run on a small thread pool. Identical queries that arrive while one is running
+    share its result, and results are kept in an LRU cache with a TTL (misses for a shorter
+    time), so a song that was just played resolves instantly.
+    """
+
+    def __init__(self, workers: int = SEARCH_WORKERS, size: int = SEARCH_CACHE_SIZE, ttl: float = SEARCH_CACHE_TTL):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="music-search")
+        self.size = size
+        self.ttl = ttl
+        self._cache: OrderedDict[str, tuple[float, typing.Optional[str]]] = OrderedDict()  # query -> (expires at, url)
+        self._pending: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.casefold().split())
+
+    def _get(self, key: str) -> tuple[bool, typing.Optional[str]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            del self._cache[key]
+            return False, None
+        self._cache.move_to_end(key)
+        return True, entry[1]
+
+    def _put(self, key: str, url: typing.Optional[str]):
+        self._cache[key] = (time.monotonic() + (self.ttl if url else SEARCH_MISS_TTL), url)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.size:
+            self._cache.popitem(last=False)
+
+    def _finish(self, key: str, future: asyncio.Future):
+        self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self._put(key, future.result())
+
+    async def resolve(self, query: str) -> typing.Optional[str]:
+        key = self.normalize(query)
+        found, url = self._get(key)
+        if found:
+            self.hits += 1
+            return url
+        pending = self._pending.get(key)
+        if pending is None:
+            self.misses += 1
+            loop = asyncio.get_running_loop()
+            search = loop.run_in_executor(self.executor, get_url_from_query, query)
+            pending = asyncio.ensure_future(asyncio.wait_for(search, SEARCH_TIMEOUT))
+            pending.add_done_callback(functools.partial(self._finish, key))
+            self._pending[key] = pending
+        # Shielded so one caller giving up does not cancel the search for the others
+        return await asyncio.shield(pending)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+class TrackCache:
+    """Lavalink search results shared by every guild, keyed by normalized URL or query.
+
+    Entries hold the raw Lavalink JSON rather than Playable objects: callers attach per-guild
+    state (like `requester`) to tracks, so every hit builds fresh objects. The memory side is
+    an LRU bounded by total JSON size; with persistence on, entries are also written to SQLite
+    and looked up there on a memory miss, so popular tracks skip `loadtracks` after restarts.
+    Search results keep only their first track, the only one the cog plays.
+    """
+
+    def __init__(self, path: str = MUSIC_DB_PATH, max_bytes: int = TRACK_CACHE_MAX_BYTES, persist: bool = TRACK_CACHE_PERSIST):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.persist = persist
+        self.db: typing.Optional[aiosqlite.Connection] = None
+        self._entries: OrderedDict[str, tuple[float, str, str]] = OrderedDict()  # key -> (expires at, kind, payload)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def open(self):
+        if not self.persist or self.db is not None:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.db = await aiosqlite.connect(self.path)
+            await self.db.execute("PRAGMA journal_mode = WAL")
+            await self.db.execute("PRAGMA synchronous = NORMAL")
+            await self.db.execute(
+                "CREATE TABLE IF NOT EXISTS track_cache ("
+                "key TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            await self.db.execute("DELETE FROM track_cache WHERE expires_at <= ?", (time.time(),))
+            await self.db.execute(
+                "DELETE FROM track_cache WHERE key NOT IN (SELECT key FROM track_cache ORDER BY expires_at DESC LIMIT ?)",
+                (TRACK_CACHE_DISK_ROWS,),
+            )
+            await self.db.commit()
+        except Exception as e:
+            logger.warning(f"[MUSIC] Track cache persistence disabled, could not open {self.path}: {e}")
+            if self.db is not None:
+                await self.db.close()
+            self.db = None
+
+    async def close(self):
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
+        logger.info(f"[MUSIC] Track cache closed hits={self.hits} misses={self.misses} entries={len(self._entries)} bytes={self.bytes}")
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        query = query.strip()
+        parsed = _urlparse.urlsplit(query)
+        if not parsed.scheme or not parsed.netloc:
+            return " ".join(query.casefold().split())
+        host = parsed.netloc.lower()
+        for prefix in ("www.", "m."):
+            if host.startswith(prefix):
+                host = host[len(prefix):]
+                break
+        params = sorted((k, v) for k, v in _urlparse.parse_qsl(parsed.query) if k not in TRACKING_PARAMS and not k.startswith("utm_"))
+        return _urlparse.urlunsplit(("https", host, parsed.path.rstrip("/"), _urlparse.urlencode(params), ""))
+
+    @staticmethod
+    def _build(kind: str, payload: str) -> wavelink.Search:
+        data = json.loads(payload)
+        if kind == "playlist":
+            return wavelink.Playlist(data)
+        return [wavelink.Playable(track) for track in data]
+
+    @staticmethod
+    def _serialize(result: wavelink.Search) -> typing.Optional[tuple[str, str]]:
+        tracks = result.tracks if isinstance(result, wavelink.Playlist) else result[:1]
+        # Live streams have no fixed content to reuse
+        if not tracks or any(track.is_stream for track in tracks):
+            return None
+        if isinstance(result, wavelink.Playlist):
+            plugin = {"type": result.type, "url": result.url, "artworkUrl": result.artwork, "author": result.author}
+            data = {
+                "info": {"name": result.name, "selectedTrack": result.selected},
+                "pluginInfo": {k: v for k, v in plugin.items() if v is not None},
+                "tracks": [track.raw_data for track in tracks],
+            }
+            return "playlist", json.dumps(data, separators=(",", ":"))
+        return "tracks", json.dumps([track.raw_data for track in tracks], separators=(",", ":"))
+
+    def _forget(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.bytes -= len(entry[2])
+
+    def _remember(self, key: str, expires_at: float, kind: str, payload: str):
+        self._forget(key)
+        if len(payload) > self.max_bytes // 4:
+            return
+        self._entries[key] = (expires_at, kind, payload)
+        self.bytes += len(payload)
+        while self.bytes > self.max_bytes:
+            _, (_, _, dropped) = self._entries.popitem(last=False)
+            self.bytes -= len(dropped)
+
+    async def get(self, query: str) -> typing.Optional[wavelink.Search]:
+        key = self.normalize(query)
+        entry = self._entries.get(key)
+        if entry is None and self.db is not None:
+            try:
+                async with self.db.execute("SELECT expires_at, kind, payload FROM track_cache WHERE key = ?", (key,)) as cursor:
+                    row = await cursor.fetchone()
+            except Exception as e:
+                logger.debug(f"[MUSIC] Track cache read failed: {e}")
+                row = None
+            if row:
+                entry = tuple(row)
+                self._remember(key, *entry)
+        if entry is None or entry[0] <= time.time():
+            self._forget(key)
+            self.misses += 1
+            return None
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self.hits += 1
+        return self._build(entry[1], entry[2])
+
+    async def put(self, query: str, result: wavelink.Search):
+        serialized = self._serialize(result)
+        if serialized is None:
+            return
+        kind, payload = serialized
+        key = self.normalize(query)
+        expires_at = time.time() + (TRACK_CACHE_PLAYLIST_TTL if kind == "playlist" else TRACK_CACHE_TTL)
+        self._remember(key, expires_at, kind, payload)
+        if self.db is not None:
+            try:
+                await self.db.execute(
+                    "INSERT OR REPLACE INTO track_cache (key, kind, payload, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, kind, payload, expires_at),
+                )
+                await self.db.commit()
+            except Exception as e:
+                logger.debug(f"[MUSIC] Track cache write failed: {e}")
+
+class PlayerSnapshots:
+    """Per-guild player state kept in SQLite so playback survives restarts and node failures.
+
+    A snapshot holds the voice channel, text channel and panel message ids plus the encoded
+    current track with its position, pause state, volume, repeat flag and the encoded queue
+    with requester ids. `schedule` marks a guild dirty (CustomPlayer calls it on every track,
+    pause, seek, volume, repeat and queue change); a writer task saves dirty guilds every
+    SNAPSHOT_DEBOUNCE seconds in one transaction and re-saves playing guilds every
+    SNAPSHOT_POSITION_INTERVAL. Encoded tracks decode back into Playables in one Lavalink
+    request, so restoring never searches again.
+    """
+
+    def __init__(self, path: str = MUSIC_DB_PATH):
+        self.path = path
+        self.db: typing.Optional[aiosqlite.Connection] = None
+        self._players: dict[int, 'CustomPlayer'] = {}  # guild id -> player being tracked
+        self._dirty: dict[int, 'CustomPlayer'] = {}
+        self._lock = asyncio.Lock()
+        self._task: typing.Optional[asyncio.Task] = None
+
+    async def open(self):
+        if self.db is not None:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.db = await aiosqlite.connect(self.path)
+            await self.db.execute("PRAGMA journal_mode = WAL")
+            await self.db.execute("PRAGMA synchronous = NORMAL")
+            await self.db.execute(
+                "CREATE TABLE IF NOT EXISTS player_snapshots ("
+                "guild_id INTEGER PRIMARY KEY, channel_id INTEGER NOT NULL, text_channel_id INTEGER, "
+                "panel_message_id INTEGER, state TEXT NOT NULL, saved_at REAL NOT NULL)"
+            )
+            await self.db.commit()
+        except Exception as e:
+            logger.warning(f"[MUSIC] Player snapshots disabled, could not open {self.path}: {e}")
+            if self.db is not None:
+                await self.db.close()
+            self.db = None
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # Capture every tracked player once more so a restart resumes where playback stopped
+        self._dirty.update(self._players)
+        await self.flush()
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
+
+    def schedule(self, vc: 'CustomPlayer'):
+        if vc.guild:
+            self._players[vc.guild.id] = vc
+            self._dirty[vc.guild.id] = vc
+
+    async def forget(self, guild_id: int):
+        """Delete a guild's snapshot once playback ended on purpose."""
+        self._players.pop(guild_id, None)
+        self._dirty.pop(guild_id, None)
+        async with self._lock:
+            if self.db is None:
+                return
+            try:
+                await self.db.execute("DELETE FROM player_snapshots WHERE guild_id = ?", (guild_id,))
+                await self.db.commit()
+            except Exception as e:
+                logger.warning(f"[MUSIC] Failed to delete player snapshot for guild {guild_id}: {e}")
+
+    @staticmethod
+    def capture(vc: 'CustomPlayer') -> typing.Optional[tuple]:
+        guild, channel = vc.guild, vc.channel
+        if guild is None or channel is None or guild.voice_client is not vc:
+            return None
+
+        def requester_id(track) -> typing.Optional[int]:
+            requester = getattr(track, "requester", None)
+            return getattr(requester, "id", None)
+
+        current = vc.current
+        state = {
+            "track": current.encoded if current else None,
+            "requester": requester_id(current),
+            "position": int(vc.position) if current else 0,
+            "paused": vc.paused,
+            "volume": vc.volume,
+            "repeat": vc.repeat_track,
+            # Unresolved placeholders are saved as their query: [None, requester id, query]
+            "queue": [
+                [None, requester_id(track), track.query] if isinstance(track, PendingTrack) else [track.encoded, requester_id(track)]
+                for track in vc.queue
+            ],
+        }
+        return (
+            guild.id,
+            channel.id,
+            vc.text_channel.id if vc.text_channel else None,
+            vc.panel_message.id if vc.panel_message else None,
+            json.dumps(state, separators=(",", ":")),
+            time.time(),
+        )
+
+    async def flush(self):
+        async with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            rows = [row for row in map(self.capture, dirty.values()) if row is not None]
+            if self.db is None or not rows:
+                return
+            try:
+                await self.db.executemany(
+                    "INSERT OR REPLACE INTO player_snapshots "
+                    "(guild_id, channel_id, text_channel_id, panel_message_id, state, saved_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                await self.db.commit()
+            except Exception as e:
+                logger.warning(f"[MUSIC] Failed to save {len(rows)} player snapshot(s): {e}")
+
+    async def _run(self):
+        positions_saved = time.monotonic()
+        while True:
+            await asyncio.sleep(SNAPSHOT_DEBOUNCE)
+            if time.monotonic() - positions_saved >= SNAPSHOT_POSITION_INTERVAL:
+                positions_saved = time.monotonic()
+                for guild_id, vc in list(self._players.items()):
+                    if vc.guild is None or vc.guild.voice_client is not vc:
+                        # Disconnected some other way (kicked, channel deleted); nothing to resume
+                        await self.forget(guild_id)
+                    elif vc.playing and not vc.paused:
+                        self._dirty[guild_id] = vc
+            if self._dirty:
+                await self.flush()
+
+    async def load(self) -> dict[int, dict]:
+        if self.db is None:
+            return {}
+        async with self.db.execute(
+            "SELECT guild_id, channel_id, text_channel_id, panel_message_id, state, saved_at FROM player_snapshots"
+        ) as cursor:
+            rows = await cursor.fetchall()
+        snapshots = {}
+        for guild_id, channel_id, text_channel_id, panel_message_id, state, saved_at in rows:
+            snapshots[guild_id] = {
+                "channel_id": channel_id,
+                "text_channel_id": text_channel_id,
+                "panel_message_id": panel_message_id,
+                "saved_at": saved_at,
+                **json.loads(state),
+            }
+        return snapshots
+
+class NodeBalancer:
+    """Places players on the least loaded Lavalink node and finds nodes to move players off.
+
+    Nodes come from LAVALINK_URI plus the optional LAVALINK_NODES list in settings. Load is
+    the penalty score Lavalink clients commonly use: playing players, plus an exponential CPU
+    term and frame terms that climb steeply once a node drops audio frames (3000 per player per
+    minute is healthy). A node's optional `weight` divides its score, so a bigger box takes
+    proportionally more players. Stats come from /v4/stats each monitor tick.
+    """
+
+    def __init__(self, specs: list[dict]):
+        self.specs = {spec["identifier"]: spec for spec in specs}
+        self.stats: dict[str, wavelink.StatsResponsePayload] = {}
+        self.failures: dict[str, int] = {}
+
+    @staticmethod
+    def specs_from_settings() -> list[dict]:
+        specs = [{"identifier": "main", "uri": LAVALINK_URI, "password": LAVALINK_PASSWORD, "weight": 1.0}]
+        # Older settings.py files have no LAVALINK_NODES; LAVALINK_URI alone keeps working
+        for index, entry in enumerate(getattr(settings, "LAVALINK_NODES", None) or [], start=1):
+            uri = entry["uri"]
+            if any(spec["uri"].rstrip("/") == uri.rstrip("/") for spec in specs):
+                continue
+            specs.append({
+                "identifier": entry.get("identifier") or f"node-{index}",
+                "uri": uri,
+                "password": entry.get("password", LAVALINK_PASSWORD),
+                "weight": float(entry.get("weight", 1.0)),
+            })
+        return specs
+
+    def build_nodes(self, identifiers: typing.Optional[typing.Iterable[str]] = None) -> list[wavelink.Node]:
+        return [
+            wavelink.Node(identifier=spec["identifier"], uri=spec["uri"], password=spec["password"])
+            for identifier, spec in self.specs.items()
+            if identifiers is None or identifier in identifiers
+        ]
+
+    async def _fetch(self, node: wavelink.Node):
+        try:
+            self.stats[node.identifier] = await asyncio.wait_for(node.fetch_stats(), NODE_STATS_TIMEOUT)
+            self.failures[node.identifier] = 0
+        except Exception as e:
+            self.failures[node.identifier] = self.failures.get(node.identifier, 0) + 1
+            logger.debug(f"[MUSIC] Stats request to Lavalink node '{node.identifier}' failed: {e}")
+
+    async def refresh(self):
+        await asyncio.gather(*(self._fetch(node) for node in wavelink.Pool.nodes.values()))
+
+    def frame_loss(self, node: wavelink.Node) -> float:
+        stats = self.stats.get(node.identifier)
+        if stats is None or stats.frames is None or not stats.playing:
+            return 0.0
+        return (stats.frames.deficit + stats.frames.nulled) / 3000
+
+    def penalty(self, node: wavelink.Node) -> float:
+        players = len(node.players)
+        stats = self.stats.get(node.identifier)
+        if stats is not None:
+            # Players placed since the last stats request are not in them yet
+            players = max(players, stats.playing)
+            players += 1.05 ** (100 * stats.cpu.system_load) * 10 - 10
+            if stats.frames is not None and stats.playing:
+                players += 1.03 ** (500 * stats.frames.deficit / 3000) * 600 - 600
+                players += (1.03 ** (500 * stats.frames.nulled / 3000) * 300 - 300) * 2
+        return players / self.specs.get(node.identifier, {}).get("weight", 1.0)
+
+    def healthy(self, node: wavelink.Node) -> bool:
+        return (
+            node.status is wavelink.NodeStatus.CONNECTED
+            and self.failures.get(node.identifier, 0) < NODE_STATS_FAILURES
+            and self.frame_loss(node) <= NODE_FRAME_LOSS_LIMIT
+        )
+
+    def best_node(self, exclude: typing.Optional[wavelink.Node] = None) -> typing.Optional[wavelink.Node]:
+        """The healthy node with the lowest penalty; any connected node if none is healthy."""
+        connected = [
+            node for node in wavelink.Pool.nodes.values()
+            if node.status is wavelink.NodeStatus.CONNECTED and (exclude is None or node.identifier != exclude.identifier)
+        ]
+        candidates = [node for node in connected if self.healthy(node)] or connected
+        return min(candidates, key=self.penalty, default=None)
+
+class PanelRefresher:
+    """Edits music panels when their content changed, one edit at a time across all guilds.
+
+    `schedule` marks a panel as due; one worker task pops due panels in time order, renders
+    them and edits only when the embed or controls differ from what was last sent. Edits are
+    spaced PANEL_EDIT_SPACING apart globally and PANEL_MIN_EDIT_INTERVAL apart per panel.
+    Playing panels reschedule themselves for progress at an interval of roughly one
+    progress-bar block, stretched when many panels are active so the queue keeps up.
+    """
+
+    def __init__(self, cog: 'Music'):
+        self.cog = cog
+        self._due: dict[int, tuple[float, 'CustomPlayer']] = {}  # guild id -> (due at, player)
+        self._heap: list[tuple[float, int]] = []  # (due at, guild id); stale entries are skipped
+        self._sent: dict[int, tuple] = {}  # guild id -> signature of the last panel sent
+        self._last_edit: dict[int, float] = {}
+        self._next_edit_at = 0.0
+        self._wake = asyncio.Event()
+        self._task: typing.Optional[asyncio.Task] = None
+        self.edits = 0
+        self.skipped = 0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def schedule(self, vc: 'CustomPlayer', delay: float = PANEL_EVENT_DELAY):
+        if not vc.guild:
+            return
+        guild_id = vc.guild.id
+        now = time.monotonic()
+        due_at = max(now + delay, self._last_edit.get(guild_id, 0.0) + PANEL_MIN_EDIT_INTERVAL)
+        current = self._due.get(guild_id)
+        if current is not None and current[0] <= due_at:
+            return
+        self._due[guild_id] = (due_at, vc)
+        heapq.heappush(self._heap, (due_at, guild_id))
+        self._wake.set()
+
+    def forget(self, guild_id: int):
+        """Drop a panel that was deleted or replaced by a final message."""
+        self._due.pop(guild_id, None)
+        self._sent.pop(guild_id, None)
+        self._last_edit.pop(guild_id, None)
+
+    @staticmethod
+    def signature(vc: 'CustomPlayer', embed: discord.Embed) -> tuple:
+        return (vc.panel_message.id, vc.volume, vc.repeat_track, embed.to_dict())
+
+    def sent(self, vc: 'CustomPlayer', embed: discord.Embed):
+        """Record a panel edited outside the queue (interaction responses)."""
+        self._sent[vc.guild.id] = self.signature(vc, embed)
+        self._last_edit[vc.guild.id] = time.monotonic()
+        self._schedule_progress(vc)
+
+    def progress_interval(self, vc: 'CustomPlayer') -> float:
+        track = vc.current
+        if track is None or track.is_stream or not track.length:
+            interval = PANEL_PROGRESS_MAX
+        else:
+            # The time string changes every second, the bar once per block
+            interval = min(max(track.length / 1000 / PROGRESS_BAR_LENGTH, PANEL_PROGRESS_MIN), PANEL_PROGRESS_MAX)
+        return max(interval, len(self._due) * PANEL_EDIT_SPACING)
+
+    def _schedule_progress(self, vc: 'CustomPlayer'):
+        if vc.playing and not vc.paused:
+            self.schedule(vc, self.progress_interval(vc))
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            while self._heap and self._due.get(self._heap[0][1], (None,))[0] != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                await self._wake.wait()
+                continue
+            due_at, guild_id = self._heap[0]
+            delay = max(due_at, self._next_edit_at) - time.monotonic()
+            if delay > 0:
+                # Something due sooner may be scheduled meanwhile
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                continue
+            heapq.heappop(self._heap)
+            _, vc = self._due.pop(guild_id)
+            try:
+                await self._refresh(vc)
+            except Exception as e:
+                logger.warning(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({guild_id})] Error refreshing panel: {e}")
+                # _refresh only reschedules on its own way out; keep a playing panel's progress going
+                self._schedule_progress(vc)
+
+    async def _refresh(self, vc: 'CustomPlayer'):
+        guild = vc.guild
+        if not guild or guild.voice_client is not vc or not vc.panel_message:
+            if guild:
+                self.forget(guild.id)
+            return
+        embed = await self.cog.build_embed(vc)
+        signature = self.signature(vc, embed)
+        if signature == self._sent.get(guild.id):
+            self.skipped += 1
+            self._schedule_progress(vc)
+            return
+        now = time.monotonic()
+        self._next_edit_at = now + PANEL_EDIT_SPACING
+        self._last_edit[guild.id] = now
+        try:
+            await vc.panel_message.edit(embed=embed, view=self.cog.prepare_panel_view(vc))
+        except discord.RateLimited as e:
+            # discord.py gave up waiting on a long rate limit; hold every edit back until it passes
+            self._next_edit_at = time.monotonic() + e.retry_after
+            self.schedule(vc, e.retry_after)
+            return
+        except discord.HTTPException as e:
+            if getattr(e, "status", None) == 404:
+                vc.panel_message = None
+                self.forget(guild.id)
+                logger.info(f"[MUSIC | {guild.name} | ({guild.id})] Panel message not found; cleared reference.")
+            else:
+                logger.warning(f"[MUSIC | {guild.name} | ({guild.id})] Failed editing panel message: {e}")
+                self._schedule_progress(vc)
+            return
+        self.edits += 1
+        self._sent[guild.id] = signature
+        self._schedule_progress(vc)
+
+class _TrackedList(list):
+    """List that counts its own mutations; backs VersionedQueue."""
+
+    version = 0
+    on_change: typing.Optional[typing.Callable[[], None]] = None
+
+
+def _counted(method):
+    @functools.wraps(method)
+    def mutate(self, *args, **kwargs):
+        self.version += 1
+        result = method(self, *args, **kwargs)
+        if self.on_change is not None:
+            self.on_change()
+        return result
+    return mutate
+
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend", "insert",
+              "pop", "remove", "clear", "reverse", "sort"):
+    setattr(_TrackedList, _name, _counted(getattr(list, _name)))
+del _name
+
+
+class VersionedQueue(wavelink.Queue):
+    """wavelink Queue whose `version` changes whenever its tracks do.
+
+    Every Queue method, and random.shuffle, goes through the backing list, so counting
+    mutations there catches all of them. Views compare versions instead of copying the queue.
+    """
+
+    def __init__(self, *, history: bool = True, on_change: typing.Optional[typing.Callable[[], None]] = None):
+        super().__init__(history=history)
+        self._items = _TrackedList()
+        self._items.on_change = on_change
+
+    @property
+    def version(self) -> int:
+        return self._items.version
+
+class PendingTrack(wavelink.Playable):
+    """Queue placeholder for a search that has not been resolved yet.
+
+    wavelink's Queue only holds Playables, so the placeholder is one, titled with the query and
+    with a unique identifier (Playables compare equal by encoded/identifier). The cog resolves
+    placeholders near the front of the queue in the background and swaps in the real track.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, query: str, requester=None):
+        key = f"pending:{next(self._ids)}"
+        super().__init__({
+            "encoded": key,
+            "info": {
+                "identifier": key, "isSeekable": False, "author": "", "length": 0, "isStream": False,
+                "position": 0, "title": query, "uri": None, "sourceName": "pending",
+            },
+            "pluginInfo": {},
+        })
+        self.query = query
+        self.requester = requester
+        self.task: typing.Optional[asyncio.Task] = None
 
 class CustomPlayer(wavelink.Player):
+    balancer: typing.Optional[NodeBalancer] = None  # Set by the Music cog while it is loaded
+    snapshots: typing.Optional[PlayerSnapshots] = None  # Set by the Music cog while it is loaded
+
     def __init__(self, *args, **kwargs):
+        if self.balancer is not None and not kwargs.get("nodes"):
+            node = self.balancer.best_node()
+            if node is not None:
+                kwargs["nodes"] = [node]
         super().__init__(*args, **kwargs)
+        self.queue: VersionedQueue = VersionedQueue(on_change=self.save_state)
         self.text_channel: typing.Optional[discord.TextChannel] = None
         self.panel_message: typing.Optional[discord.Message] = None
-        self.repeat_track: bool = False
+        self._repeat_track: bool = False
+
+    # Every change a restart should bring back marks the player for the next snapshot write,
+    # whether or not it has a panel message
+    def save_state(self):
+        if self.snapshots is not None:
+            self.snapshots.schedule(self)
+
+    @property
+    def repeat_track(self) -> bool:
+        return self._repeat_track
+
+    @repeat_track.setter
+    def repeat_track(self, value: bool):
+        self._repeat_track = value
+        self.save_state()
+
+    async def play(self, *args, **kwargs) -> wavelink.Playable:
+        track = await super().play(*args, **kwargs)
+        self.save_state()
+        return track
+
+    async def pause(self, value: bool, /) -> None:
+        await super().pause(value)
+        self.save_state()
+
+    async def seek(self, position: int = 0, /) -> None:
+        await super().seek(position)
+        self.save_state()
+
+    async def set_volume(self, value: int = 100, /) -> None:
+        await super().set_volume(value)
+        self.save_state()
 
 class VolumeSelect(discord.ui.Select):
     def __init__(self, cog: 'Music'):
@@ -155,42 +885,125 @@ class MusicPanel(discord.ui.View):
                 pass
 
 
+class QueuePageModal(discord.ui.Modal):
+    def __init__(self, queue_view: 'QueueView'):
+        super().__init__(title="Jump to Page")
+        self.queue_view = queue_view
+        self.page_input = discord.ui.TextInput(label=f"Page (1-{queue_view.pages})", placeholder="1", max_length=6)
+        self.add_item(self.page_input)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            page = int(self.page_input.value)
+        except ValueError:
+            return await interaction.response.send_message("Invalid page number.", ephemeral=True)
+        self.queue_view.page = min(max(page, 1), self.queue_view.pages) - 1
+        await self.queue_view._update_message(interaction)
+
+class QueueSearchModal(discord.ui.Modal):
+    def __init__(self, queue_view: 'QueueView'):
+        super().__init__(title="Search Queue")
+        self.queue_view = queue_view
+        self.query_input = discord.ui.TextInput(
+            label="Title contains", default=queue_view.query, required=False, max_length=100,
+            placeholder="Leave empty to clear the search",
+        )
+        self.add_item(self.query_input)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        view = self.queue_view
+        query = self.query_input.value.strip().lower() or None
+        if query and query == view.query:
+            # Searching again continues after the current page
+            start = (view.page + 1) * view.per_page
+        else:
+            start = view.page * view.per_page
+        view.query = query
+        view.page_cache.clear()
+        if query:
+            index = view.find(query, start)
+            if index is None:
+                return await interaction.response.send_message(f"No queued track matches **{query}**.", ephemeral=True)
+            view.page = index // view.per_page
+        await view._update_message(interaction)
+
 class QueueView(discord.ui.View):
-    def __init__(self, tracks: list, author_id: int, per_page: int = 10, timeout: float = 120.0):
+    """Pages over the live queue of a player.
+
+    Pages are sliced out of the queue by index when shown, never from a copy, and rendered
+    pages are cached until the queue's version changes. Memory per open view is one page
+    cache, however long the queue is.
+    """
+
+    def __init__(self, vc: 'CustomPlayer', author_id: int, per_page: int = QUEUE_PAGE_SIZE, timeout: float = 120.0):
         super().__init__(timeout=timeout)
-        self.tracks = tracks
+        self.vc = vc
         self.author_id = author_id
         self.per_page = per_page
         self.page = 0
+        self.query: typing.Optional[str] = None
+        self.message: typing.Optional[discord.Message] = None
+        self.page_cache: OrderedDict[int, str] = OrderedDict()  # page -> rendered lines
+        self.cached_version: typing.Optional[int] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.vc.queue)
+
+    @property
+    def pages(self) -> int:
+        return max(1, (self.total + self.per_page - 1) // self.per_page)
+
+    def find(self, query: str, start: int = 0) -> typing.Optional[int]:
+        """Index of the first track at or after `start` whose title contains `query`, wrapping around."""
+        queue = self.vc.queue
+        total = len(queue)
+        for offset in range(total):
+            index = (start + offset) % total
+            if query in (queue[index].title or "").lower():
+                return index
+        return None
 
-    def _build_embed(self) -> discord.Embed:
-        total = len(self.tracks)
-        pages = max(1, (total + self.per_page - 1) // self.per_page)
-        start = self.page * self.per_page
-        end = start + self.per_page
-        chunk = self.tracks[start:end]
-        if chunk:
-            lines = []
-            for i, track in enumerate(chunk, start=start):
-                title = getattr(track, 'title', 'Unknown')
+    def _render_page(self, page: int) -> str:
+        version = getattr(self.vc.queue, "version", None)
+        if version is None or version != self.cached_version:
+            self.page_cache.clear()
+            self.cached_version = version
+        if page in self.page_cache:
+            self.page_cache.move_to_end(page)
+            return self.page_cache[page]
+
+        start = page * self.per_page
+        lines = []
+        for i, track in enumerate(self.vc.queue[start:start + self.per_page], start=start):
+            title = f"🔎 {track.query}" if isinstance(track, PendingTrack) else getattr(track, 'title', 'Unknown')
+            if self.query and self.query in (track.title or "").lower():
+                lines.append(f"`{i+1}.` ▶ __**{title}**__")
+            else:
                 lines.append(f"`{i+1}.` **{title}**")
-            desc = "\n".join(lines)
-        else:
-            desc = "No items on this page."
-        embed = discord.Embed(title=f"Queue ({total} tracks)", description=desc, color=discord.Color.gold())
-        embed.set_footer(text=f"Page {self.page+1}/{pages}")
-        return embed
+        desc = "\n".join(lines) or "No items on this page."
+        self.page_cache[page] = desc
+        while len(self.page_cache) > QUEUE_CACHED_PAGES:
+            self.page_cache.popitem(last=False)
+        return desc
 
-    async def _update_message(self, interaction: discord.Interaction):
-        embed = self._build_embed()
-        # Update button states
-        total = len(self.tracks)
-        pages = max(1, (total + self.per_page - 1) // self.per_page)
+    def _build_embed(self) -> discord.Embed:
+        total, pages = self.total, self.pages
+        self.page = min(self.page, pages - 1)
+        embed = discord.Embed(title=f"Queue ({total} tracks)", description=self._render_page(self.page), color=discord.Color.gold())
+        footer = f"Page {self.page+1}/{pages}"
+        if self.query:
+            footer += f" | Search: {self.query}"
+        embed.set_footer(text=footer)
         for child in self.children:
             if getattr(child, 'custom_id', None) == 'music:queue_prev':
                 child.disabled = (self.page <= 0)
             if getattr(child, 'custom_id', None) == 'music:queue_next':
                 child.disabled = (self.page >= pages - 1)
+        return embed
+
+    async def _update_message(self, interaction: discord.Interaction):
+        embed = self._build_embed()
         try:
             await interaction.response.edit_message(embed=embed, view=self)
         except Exception:
@@ -199,6 +1012,12 @@ class QueueView(discord.ui.View):
             except Exception:
                 pass
 
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Only the person who opened this queue can page through it.", ephemeral=True)
+            return False
+        return True
+
     @discord.ui.button(label='Previous', style=discord.ButtonStyle.secondary, custom_id='music:queue_prev', row=1)
     async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if self.page > 0:
@@ -207,30 +1026,28 @@ class QueueView(discord.ui.View):
 
     @discord.ui.button(label='Next', style=discord.ButtonStyle.secondary, custom_id='music:queue_next', row=1)
     async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        total = len(self.tracks)
-        pages = max(1, (total + self.per_page - 1) // self.per_page)
-        if self.page < pages - 1:
+        if self.page < self.pages - 1:
             self.page += 1
         await self._update_message(interaction)
 
+    @discord.ui.button(label='Go to Page', style=discord.ButtonStyle.secondary, custom_id='music:queue_jump', row=1)
+    async def jump_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(QueuePageModal(self))
+
+    @discord.ui.button(label='Search', style=discord.ButtonStyle.secondary, custom_id='music:queue_search', row=1)
+    async def search_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(QueueSearchModal(self))
+
     async def on_timeout(self):
         # Disable buttons on timeout
         for child in self.children:
             child.disabled = True
-        # Attempt to edit the original message to disable controls
-        try:
-            # The view does not have direct access to the message; rely on stored state via interaction history.
-            # Best-effort: nothing to do here.
-            pass
-        except Exception:
-            pass
-
-    @discord.ui.button(label='Refresh', style=discord.ButtonStyle.secondary, custom_id='music:refresh_panel', row=1)
-    async def refresh_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        vc, reply = await self.cog.get_player_and_validate(interaction)
-        if not vc:
-            return
-        await self._update_panel(interaction, vc)
+        self.page_cache.clear()
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except Exception:
+                pass
 
 class Music(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -238,29 +1055,31 @@ class Music(commands.Cog):
         self.panel_view = MusicPanel(self)
         self._lavalink_online: bool = True
         self._last_notify: dict[int, float] = {}
-        self._lavalink_host: typing.Optional[str] = None
-        self._lavalink_port: typing.Optional[int] = None
-        self.panel_updater.start()
-
-    @tasks.loop(seconds=10.0)  # Update every 10 seconds
-    async def panel_updater(self):
-        """Periodically updates the music panel for all active voice clients."""
-        if not self.bot.is_ready():
-            return
-
-        # Iterate over all connected players, not the node pool
-        for vc in self.bot.voice_clients:
-            if isinstance(vc, CustomPlayer) and vc.panel_message and vc.guild:
-                try:
-                    await self.update_panel_message(vc)
-                except Exception as e:
-                    logger.warning(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Error updating panel in background: {e}")
+        self.node_balancer = NodeBalancer(NodeBalancer.specs_from_settings())
+        CustomPlayer.balancer = self.node_balancer
+        self._node_connects: dict[str, asyncio.Task] = {}
+        self._rebalance_lock = asyncio.Lock()
+        self.search_resolver = QueryResolver()
+        self.track_cache = TrackCache()
+        self._track_loads: dict[str, asyncio.Future] = {}
+        self.panel_refresher = PanelRefresher(self)
+        self.player_snapshots = PlayerSnapshots()
+        CustomPlayer.snapshots = self.player_snapshots
+        self._restoring: set[int] = set()  # Guild ids a restore_players run is working on
+
+    async def cog_load(self):
+        await self.track_cache.open()
+        await self.player_snapshots.open()
+        self.panel_refresher.start()
 
     @commands.Cog.listener()
     async def on_ready(self):
-        if not self.panel_updater.is_running():
-            self.panel_updater.start()
-        logger.info("[MUSIC] Music cog ready, panel updater started.")
+        self.panel_refresher.start()
+        # Panels of players that survived a reconnect pick up their progress refreshes again
+        for vc in self.bot.voice_clients:
+            if isinstance(vc, CustomPlayer) and vc.panel_message:
+                self.panel_refresher.schedule(vc)
+        logger.info("[MUSIC] Music cog ready, panel refresher started.")
 
     async def _ensure_deaf(self, vc: CustomPlayer):
         """Try to server-deafen the bot; ensure self-deaf is enabled as a fallback.
@@ -299,7 +1118,16 @@ class Music(commands.Cog):
     async def cog_unload(self):
         """Disconnect all players when the cog is unloaded."""
         logger.info("[MUSIC] Music cog unloaded. Disconnecting all players...")
-        self.panel_updater.cancel()
+        self.panel_refresher.stop()
+        CustomPlayer.balancer = None
+        CustomPlayer.snapshots = None
+        # Saved before players are disconnected below
+        await self.player_snapshots.close()
+        for task in self._node_connects.values():
+            task.cancel()
+        logger.info(f"[MUSIC] Panel refresher stopped edits={self.panel_refresher.edits} skipped={self.panel_refresher.skipped}")
+        self.search_resolver.close()
+        await self.track_cache.close()
         try:
             # Make a copy of nodes to avoid runtime mutation during iteration.
             nodes = list(getattr(wavelink.Pool, 'nodes', {}).items())
@@ -315,29 +1143,216 @@ class Music(commands.Cog):
             # Catch any unexpected issues during unload and log succinctly.
             logger.error(f"[MUSIC] Error during music cog unload: {e}")
 
+    def _connect_nodes(self, identifiers: typing.Optional[typing.Iterable[str]] = None):
+        # Pool.connect keeps retrying an unreachable node inside the call, so each node gets its
+        # own task and one dead node cannot hold back the others
+        for node in self.node_balancer.build_nodes(identifiers):
+            task = self._node_connects.get(node.identifier)
+            if task is None or task.done():
+                self._node_connects[node.identifier] = asyncio.create_task(wavelink.Pool.connect(client=self.bot, nodes=[node]))
+
     async def connect_to_nodes(self):
         await self.bot.wait_until_ready()
         try:
-            node = wavelink.Node(uri=LAVALINK_URI, password=LAVALINK_PASSWORD)
-            await wavelink.Pool.connect(client=self.bot, nodes=[node])
-            parsed = _urlparse.urlparse(LAVALINK_URI)
-            self._lavalink_host = parsed.hostname
-            self._lavalink_port = parsed.port or (443 if parsed.scheme == "wss" else 80)
-            try:
-                self.lavalink_monitor.start()
-            except RuntimeError:
-                pass
-            self._lavalink_online = True
-            logger.info("[MUSIC] Connected to Lavalink node and started monitor.")
+            self._connect_nodes()
+            logger.info(f"[MUSIC] Connecting to {len(self.node_balancer.specs)} Lavalink node(s) and started monitor.")
         except Exception:
-            logger.exception("[MUSIC] Failed to connect Lavalink node during startup.")
-            parsed = _urlparse.urlparse(LAVALINK_URI)
-            self._lavalink_host = parsed.hostname
-            self._lavalink_port = parsed.port or (443 if parsed.scheme == "wss" else 80)
+            logger.exception("[MUSIC] Failed to connect Lavalink nodes during startup.")
+        try:
+            self.lavalink_monitor.start()
+        except RuntimeError:
+            pass
+
+    async def _load_tracks(self, query: str) -> wavelink.Search:
+        tracks = await wavelink.Playable.search(query, source=None)
+        if tracks:
+            await self.track_cache.put(query, tracks)
+        return tracks
+
+    async def search_tracks(self, query: str) -> wavelink.Search:
+        """`wavelink.Playable.search` through the shared track cache.
+
+        `query` is a URL or an already prefixed search ("ytsearch:..."). Concurrent loads of
+        the same query share one Lavalink request.
+        """
+        cached = await self.track_cache.get(query)
+        if cached is not None:
+            return cached
+        key = self.track_cache.normalize(query)
+        pending = self._track_loads.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._load_tracks(query))
+            self._track_loads[key] = pending
+            pending.add_done_callback(lambda _: self._track_loads.pop(key, None))
+            return await asyncio.shield(pending)
+        result = await asyncio.shield(pending)
+        if not result:
+            return result
+        # Joined another caller's load: build our own track objects instead of sharing theirs
+        return await self.track_cache.get(query) or await wavelink.Playable.search(query, source=None)
+
+    async def resolve_query(self, search: str) -> wavelink.Search:
+        """Load a link directly, or resolve a plain query to a video URL off the event loop,
+        falling back to Lavalink's own YouTube search if yt-dlp finds nothing or fails."""
+        if re.match(r'https?://\S+', search):
+            return await self.search_tracks(search)
+        try:
+            url = await self.search_resolver.resolve(search)
+        except Exception as e:
+            logger.warning(f"[MUSIC] yt-dlp search failed for {search!r}: {e}")
+            url = None
+        return await self.search_tracks(url if url else f"ytsearch:{search}")
+
+    async def _resolve_pending(self, vc: CustomPlayer, pending: PendingTrack) -> typing.Optional[wavelink.Playable]:
+        try:
+            result = await self.resolve_query(pending.query)
+        except Exception as e:
+            logger.warning(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Resolving queued search {pending.query!r} failed: {e}")
+            result = None
+        tracks = result.tracks if isinstance(result, wavelink.Playlist) else result
+        track = tracks[0] if tracks else None
+        if track is not None:
+            track.requester = pending.requester
+        # Swap the placeholder in place while it is still queued, so queue views show the real title
+        for index, queued in enumerate(vc.queue):
+            if queued is pending:
+                if track is not None:
+                    vc.queue[index] = track
+                else:
+                    del vc.queue[index]
+                break
+        if track is None and vc.text_channel:
             try:
-                self.lavalink_monitor.start()
-            except RuntimeError:
+                await vc.text_channel.send(f"Nothing found for queued search: {pending.query}")
+            except Exception:
                 pass
+        return track
+
+    def prefetch(self, vc: CustomPlayer):
+        """Start resolving the placeholders among the next PREFETCH_AHEAD queued tracks."""
+        for track in vc.queue[:PREFETCH_AHEAD]:
+            if isinstance(track, PendingTrack) and track.task is None:
+                track.task = asyncio.create_task(self._resolve_pending(vc, track))
+
+    async def next_track(self, vc: CustomPlayer) -> typing.Optional[wavelink.Playable]:
+        """Pop the next playable track, waiting on a placeholder the prefetcher has not finished."""
+        while not vc.queue.is_empty:
+            track = vc.queue.get()
+            if isinstance(track, PendingTrack):
+                if track.task is None:
+                    track.task = asyncio.create_task(self._resolve_pending(vc, track))
+                track = await track.task
+                if track is None:
+                    continue
+            return track
+        return None
+
+    def queue_limit(self, guild_id: int) -> int:
+        limits = getattr(settings, "MUSIC_QUEUE_LIMITS", None) or {}
+        return limits.get(guild_id, MAX_QUEUE_LENGTH)
+
+    def queue_full(self, vc: CustomPlayer) -> bool:
+        return len(vc.queue) >= self.queue_limit(vc.guild.id)
+
+    def queue_full_embed(self, vc: CustomPlayer) -> discord.Embed:
+        embed = discord.Embed()
+        embed.title = "User Error"
+        embed.description = f"The queue is full ({self.queue_limit(vc.guild.id)} tracks)."
+        embed.color = discord.Color.from_rgb(255, 165, 0) # color #FFA500
+        return embed
+
+    async def ingest_playlist(self, vc: CustomPlayer, playlist: wavelink.Playlist, requester, send) -> dict:
+        """Queue `playlist` in chunks of PLAYLIST_CHUNK_SIZE.
+
+        Playback starts after the first chunk that queued anything. Tracks already queued, playing
+        or repeated within the playlist are skipped, and tracks past the guild's queue cap are
+        left out. Progress goes to one message sent with `send`
+        (ctx.send or interaction.followup.send), edited at most every PLAYLIST_PROGRESS_INTERVAL
+        seconds and once more with the summary. Returns the counts and any error from starting
+        playback; the caller reports that error.
+        """
+        guild = vc.guild
+        limit = self.queue_limit(guild.id)
+        seen = {track.identifier for track in vc.queue}
+        if vc.current is not None:
+            seen.add(vc.current.identifier)
+        total = len(playlist.tracks)
+        result = {"added": 0, "duplicates": 0, "over_cap": 0, "play_error": None}
+
+        playlist_url = getattr(playlist, "uri", None)
+        if not playlist_url:
+            # Fall back to the first track's uri if available
+            playlist_url = getattr(playlist.tracks[0], "uri", None) if playlist.tracks else None
+        name = f"[{playlist.name}]({playlist_url})" if playlist_url else playlist.name
+
+        started = False
+        message = None
+        # Playlists queued within one interval only get the summary message
+        last_edit = time.monotonic()
+        for start in range(0, total, PLAYLIST_CHUNK_SIZE):
+            chunk = []
+            room = limit - len(vc.queue)
+            # Once the queue is full the rest is still scanned, so duplicates are not reported as over the cap
+            for track in playlist.tracks[start:start + PLAYLIST_CHUNK_SIZE]:
+                if track.identifier in seen:
+                    result["duplicates"] += 1
+                    continue
+                seen.add(track.identifier)
+                if len(chunk) >= room:
+                    result["over_cap"] += 1
+                    continue
+                track.requester = requester
+                chunk.append(track)
+            if chunk:
+                result["added"] += vc.queue.put(chunk)
+
+            if not started and chunk and not vc.playing and not vc.paused:
+                started = True
+                try:
+                    await vc.play(await self.next_track(vc))
+                except Exception as e:
+                    result["play_error"] = e
+                    logger.warning(f"[MUSIC | {guild.name} | ({guild.id})] Failed to start playing playlist: {e}")
+                else:
+                    logger.info(f"[MUSIC | {guild.name} | ({guild.id})] Started playing playlist.")
+
+            done = min(start + PLAYLIST_CHUNK_SIZE, total)
+            if done < total and time.monotonic() - last_edit >= PLAYLIST_PROGRESS_INTERVAL:
+                embed = discord.Embed(
+                    title="Adding Playlist", color=discord.Color.green(),
+                    description=f"Adding tracks from {name}... {done}/{total}",
+                )
+                try:
+                    if message is None:
+                        message = await send(embed=embed)
+                    else:
+                        await message.edit(embed=embed)
+                except Exception as e:
+                    logger.warning(f"[MUSIC | {guild.name} | ({guild.id})] Failed to report playlist progress: {e}")
+                last_edit = time.monotonic()
+            await asyncio.sleep(0)
+
+        lines = [f"Added {result['added']} tracks from {name}"]
+        if result["duplicates"]:
+            lines.append(f"Skipped {result['duplicates']} tracks that were already queued.")
+        if result["over_cap"]:
+            lines.append(f"Left out {result['over_cap']} tracks: the queue is limited to {limit} tracks.")
+        embed = discord.Embed(
+            title="Playlist Added to Queue", description="\n".join(lines),
+            color=discord.Color.green() if result["added"] else discord.Color.from_rgb(255, 165, 0),
+        )
+        try:
+            if message is None:
+                await send(embed=embed)
+            else:
+                await message.edit(embed=embed)
+        except Exception as e:
+            logger.warning(f"[MUSIC | {guild.name} | ({guild.id})] Failed to report playlist: {e}")
+        logger.info(
+            f"[MUSIC | {guild.name} | ({guild.id})] Queued playlist: {playlist.name} with {result['added']} tracks "
+            f"({result['duplicates']} duplicates, {result['over_cap']} over the cap)"
+        )
+        return result
 
     async def get_player_and_validate(self, interaction_or_ctx):
         if isinstance(interaction_or_ctx, discord.Interaction):
@@ -375,12 +1390,8 @@ class Music(commands.Cog):
             return None, None
         return vc, reply
 
-    async def update_panel_message(self, vc: CustomPlayer, interaction: typing.Optional[discord.Interaction] = None):
-        if not vc.panel_message:
-            logger.debug(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] No panel message found for update.")
-            return
-        logger.debug(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Updating panel message.")
-        new_embed = await self.build_embed(vc)
+    def prepare_panel_view(self, vc: CustomPlayer) -> MusicPanel:
+        """Set the shared panel view's volume and repeat controls to `vc`'s state."""
         view_to_send = self.panel_view
         for item in view_to_send.children:
             if isinstance(item, VolumeSelect):
@@ -389,22 +1400,35 @@ class Music(commands.Cog):
                     option.default = (option.value == str(vc.volume))
             elif item.custom_id == 'music:repeat_toggle' and isinstance(item, discord.ui.Button):
                 item.style = discord.ButtonStyle.success if vc.repeat_track else discord.ButtonStyle.secondary
+        return view_to_send
+
+    async def update_panel_message(self, vc: CustomPlayer, interaction: typing.Optional[discord.Interaction] = None):
+        """Refresh `vc`'s panel after a state change.
+
+        An unanswered interaction is answered with the new panel right away; everything else
+        goes through the panel refresher, which coalesces changes and skips no-op edits.
+        """
+        # The player saves its own state changes; this picks up a new panel or text channel
+        self.player_snapshots.schedule(vc)
+        if not vc.panel_message:
+            logger.debug(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] No panel message found for update.")
+            return
         if interaction and not interaction.response.is_done():
+            new_embed = await self.build_embed(vc)
             try:
-                await interaction.response.edit_message(embed=new_embed, view=view_to_send)
+                await interaction.response.edit_message(embed=new_embed, view=self.prepare_panel_view(vc))
             except Exception as e:
                 logger.warning(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Failed to edit interaction message: {e}")
-        else:
-            try:
-                await vc.panel_message.edit(embed=new_embed, view=view_to_send)
-            except discord.HTTPException as e:
-                if getattr(e, "status", None) == 404:
-                    vc.panel_message = None
-                    logger.info(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Panel message not found; cleared reference.")
+                self.panel_refresher.schedule(vc, 0)
+            else:
+                # Only the panel itself carries the buttons; interactions on other messages still need a refresh
+                if interaction.message and interaction.message.id == vc.panel_message.id:
+                    self.panel_refresher.sent(vc, new_embed)
                 else:
-                    logger.warning(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Failed editing panel message: {e}")
-            except Exception as e:
-                logger.warning(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Unexpected error updating panel: {e}")
+                    self.panel_refresher.schedule(vc, 0)
+            return
+        # A user clicked something: no need to wait for more events to coalesce
+        self.panel_refresher.schedule(vc, 0 if interaction else PANEL_EVENT_DELAY)
 
     async def build_embed(self, vc: CustomPlayer) -> discord.Embed:
         def format_time(ms):
@@ -414,7 +1438,7 @@ class Music(commands.Cog):
             if hours > 0:
                 return f"{hours}:{minutes:02}:{seconds:02}"
             return f"{minutes:02}:{seconds:02}"
-        def create_progress_bar(position, length, bar_length=25):
+        def create_progress_bar(position, length, bar_length=PROGRESS_BAR_LENGTH):
             if length == 0:
                 return ""
             percent = position / length
@@ -448,6 +1472,102 @@ class Music(commands.Cog):
     @commands.Cog.listener()
     async def on_wavelink_node_ready(self, payload: wavelink.NodeReadyEventPayload):
         logger.info(f"[MUSIC] Lavalink Node '{payload.node.identifier}' ready at {payload.node.uri}")
+        self.node_balancer.failures[payload.node.identifier] = 0
+        if not payload.resumed:
+            await self.restore_players(payload.node)
+
+    @commands.Cog.listener()
+    async def on_wavelink_node_disconnected(self, payload: wavelink.NodeDisconnectedEventPayload):
+        logger.warning(f"[MUSIC] Lavalink Node '{payload.node.identifier}' disconnected; moving its players.")
+        # Save positions now; they are what a restore on this node resumes from
+        for vc in self.bot.voice_clients:
+            if isinstance(vc, CustomPlayer) and vc.node.identifier == payload.node.identifier:
+                self.player_snapshots.schedule(vc)
+        await self.player_snapshots.flush()
+        await self.rebalance()
+
+    async def _decode_tracks(self, node: wavelink.Node, encoded: list[str]) -> list[wavelink.Playable]:
+        if not encoded:
+            return []
+        data = await node.send("POST", path="v4/decodetracks", data=encoded)
+        return [wavelink.Playable(track) for track in data]
+
+    async def _restore_player(self, guild: discord.Guild, snapshot: dict, node: wavelink.Node) -> bool:
+        channel = guild.get_channel(snapshot["channel_id"])
+        if channel is None or not any(not member.bot for member in channel.members):
+            await self.player_snapshots.forget(guild.id)
+            return False
+        queued = snapshot["queue"]
+        encoded = ([snapshot["track"]] if snapshot["track"] else []) + [entry[0] for entry in queued if entry[0]]
+        tracks = iter(await self._decode_tracks(node, encoded))
+        current = next(tracks) if snapshot["track"] else None
+
+        if guild.voice_client is not None:
+            # Someone started playing (or another node's restore connected) while the tracks decoded
+            return False
+        vc: CustomPlayer = await channel.connect(cls=CustomPlayer, self_deaf=True)
+        try:
+            vc.text_channel = guild.get_channel(snapshot["text_channel_id"]) if snapshot["text_channel_id"] else None
+            if vc.text_channel and snapshot["panel_message_id"]:
+                vc.panel_message = vc.text_channel.get_partial_message(snapshot["panel_message_id"])
+            vc.repeat_track = snapshot["repeat"]
+            for entry in queued:
+                requester = guild.get_member(entry[1]) if entry[1] else None
+                if entry[0]:
+                    track = next(tracks)
+                    track.requester = requester
+                else:
+                    track = PendingTrack(entry[2], requester)
+                vc.queue.put(track)
+            self.prefetch(vc)
+            if current is not None:
+                current.requester = guild.get_member(snapshot["requester"]) if snapshot["requester"] else None
+                await vc.play(current, start=snapshot["position"], volume=snapshot["volume"], paused=snapshot["paused"])
+            else:
+                await vc.set_volume(snapshot["volume"])
+        except Exception:
+            await vc.disconnect()
+            raise
+        await self.update_panel_message(vc)
+        return True
+
+    async def _reattach_player(self, vc: CustomPlayer, snapshot: typing.Optional[dict]):
+        # The player object still holds its queue; the restarted Lavalink only needs the voice
+        # session again (as Player.switch_node sends it) and the track at the saved position
+        await vc._dispatch_voice_update()
+        if vc.current is not None:
+            position = snapshot["position"] if snapshot and snapshot["track"] == vc.current.encoded else vc.position
+            await vc.play(vc.current, replace=True, start=position, volume=vc.volume, paused=vc.paused)
+
+    async def restore_players(self, node: wavelink.Node):
+        """Resume playback from snapshots after a restart or after `node` lost its session."""
+        snapshots = await self.player_snapshots.load()
+        jobs = {}
+        # Nodes coming up together each run a restore; a guild belongs to whichever run claims it first
+        for vc in self.bot.voice_clients:
+            if isinstance(vc, CustomPlayer) and vc.guild and vc.node.identifier == node.identifier and vc.guild.id not in self._restoring:
+                jobs[vc.guild.id] = self._reattach_player(vc, snapshots.get(vc.guild.id))
+        for guild_id, snapshot in snapshots.items():
+            guild = self.bot.get_guild(guild_id)
+            if guild is not None and guild.voice_client is None and guild_id not in jobs and guild_id not in self._restoring:
+                jobs[guild_id] = self._restore_player(guild, snapshot, node)
+        if not jobs:
+            return
+        self._restoring.update(jobs)
+        started = time.perf_counter()
+        try:
+            results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+        finally:
+            self._restoring.difference_update(jobs)
+        for guild_id, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                logger.warning(f"[MUSIC] Could not restore player for guild {guild_id}: {result}")
+                guild = self.bot.get_guild(guild_id)
+                # A guild that has a player again keeps its snapshot; only a failure that left it without one drops it
+                if guild is None or guild.voice_client is None:
+                    await self.player_snapshots.forget(guild_id)
+        restored = sum(1 for result in results if result is not False and not isinstance(result, Exception))
+        logger.info(f"[MUSIC] Restored {restored} of {len(jobs)} player(s) on Lavalink node '{node.identifier}' in {time.perf_counter() - started:.2f}s")
 
     @commands.Cog.listener()
     async def on_wavelink_track_start(self, payload: wavelink.TrackStartEventPayload):
@@ -458,6 +1578,9 @@ class Music(commands.Cog):
             logger.info(f"[MUSIC | {player.guild.name if player.guild else "Unknown"} | ({player.guild.id if player.guild else "N/A"})] Now playing: {track.title} (requested by {requester})")
         else:
             logger.info(f"[MUSIC | {player.guild.name if player.guild else "Unknown"} | ({player.guild.id if player.guild else "N/A"})] Now playing: {track.title}")
+        self.prefetch(player)
+        if player.panel_message:
+            await self.update_panel_message(player)
 
     @commands.Cog.listener()
     async def on_wavelink_track_end(self, payload: wavelink.TrackEndEventPayload):
@@ -470,8 +1593,12 @@ class Music(commands.Cog):
             if player.panel_message:
                 await self.update_panel_message(player)
             return
-        if player.queue.is_empty:
+        next_track = await self.next_track(player)
+        if next_track is None:
             stopped_embed = discord.Embed(title="Music Stopped", description="Playback has ended and the queue is empty.", color=discord.Color.red())
+            if player.guild:
+                self.panel_refresher.forget(player.guild.id)
+                await self.player_snapshots.forget(player.guild.id)
             if player.panel_message:
                 try:
                     await player.panel_message.edit(embed=stopped_embed, view=None)
@@ -488,7 +1615,6 @@ class Music(commands.Cog):
             except Exception as e:
                 logger.warning(f"[MUSIC | {player.guild.name if player.guild else "Unknown"} | ({player.guild.id if player.guild else "N/A"})] Error disconnecting player: {e}")
             return
-        next_track = player.queue.get()
         try:
             await player.play(next_track)
         except Exception as e:
@@ -505,6 +1631,8 @@ class Music(commands.Cog):
             await vc.disconnect()
         except Exception as e:
             logger.warning(f"[MUSIC | {vc.guild.name} ({vc.guild.id})] Error during disconnect: {e}")
+        self.panel_refresher.forget(vc.guild.id)
+        await self.player_snapshots.forget(vc.guild.id)
         if vc.panel_message:
             # Update the existing panel to show stopped state instead of deleting it.
             try:
@@ -537,6 +1665,8 @@ class Music(commands.Cog):
         status = "Paused" if vc.paused else "Resumed"
         if not isinstance(interaction_or_ctx, discord.Interaction):
             await reply(f"Playback **{status}**.")
+            if vc.panel_message:
+                await self.update_panel_message(vc)
 
     @commands.group(invoke_without_command=True, aliases=['m'])
     async def music(self, ctx: commands.Context):
@@ -593,16 +1723,20 @@ class Music(commands.Cog):
                 logger.warning(f"[{vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Failed to create music panel message: {e}")
                 vc.panel_message = None
 
-        # Detect if the search string is a URL or a plain query
-        if re.match(r'https?://\S+', search):
-            # It's a link; use wavelink.Playable.search directly
-            tracks = await wavelink.Playable.search(search)
-        else:
-            # It's a plain query; prepend "ytsearch:" to search YouTube
-
-            search = get_url_from_query(search)
+        if (vc.playing or vc.paused) and not re.match(r'https?://\S+', search):
+            # A plain search behind the current song: queue a placeholder now and resolve it in
+            # the background before it comes up
+            if self.queue_full(vc):
+                return await ctx.send(embed=self.queue_full_embed(vc))
+            vc.queue.put(PendingTrack(search, requester=ctx.author))
+            self.prefetch(vc)
+            embed = discord.Embed(title="Added to Queue", description=f"🔎 {search}", color=discord.Color.green())
+            await ctx.send(embed=embed)
+            logger.info(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Queued search: {search}")
+            await self.update_panel_message(vc)
+            return
 
-            tracks = await wavelink.Playable.search(f"ytsearch:{search}")
+        tracks = await self.resolve_query(search)
 
         if not tracks:
 
@@ -617,39 +1751,16 @@ class Music(commands.Cog):
             return
 
         if isinstance(tracks, wavelink.Playlist):
-            added_count = 0
-            for track in tracks.tracks:
-                track.requester = ctx.author
-                vc.queue.put(track)
-                added_count += 1
-            # Safely build a link for the playlist: some Playlist objects may not have `uri`.
-            playlist_url = getattr(tracks, "uri", None)
-            if not playlist_url:
-                # Fall back to the first track's uri if available
-                first = tracks.tracks[0] if getattr(tracks, "tracks", None) else None
-                playlist_url = getattr(first, "uri", None) if first else None
-            if playlist_url:
-                desc = f"Added {added_count} tracks from [{tracks.name}]({playlist_url})"
-            else:
-                desc = f"Added {added_count} tracks from {tracks.name}"
-            embed = discord.Embed(title="Playlist Added to Queue", description=desc, color=discord.Color.green())
-            await ctx.send(embed=embed)
-            logger.info(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Queued playlist: {tracks.name} with {added_count} tracks")
-            if not vc.playing and not vc.paused:
-                try:
-                    await vc.play(vc.queue.get())
-                except Exception as e:
-                    logger.warning(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Failed to start playing playlist: {e}")
-                    
-                    embed = discord.Embed()
+            result = await self.ingest_playlist(vc, tracks, ctx.author, ctx.send)
+            if result["play_error"] is not None:
 
-                    embed.title = "Internal Error"
-                    embed.description = "Failed to play the playlist."
-                    embed.color = discord.Color.red()
-                    
-                    return await ctx.send(embed=embed)
-                else:
-                    logger.info(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Started playing playlist.")
+                embed = discord.Embed()
+
+                embed.title = "Internal Error"
+                embed.description = "Failed to play the playlist."
+                embed.color = discord.Color.red()
+
+                return await ctx.send(embed=embed)
             # Ensure panel message exists or is created, then update it.
             if not vc.panel_message:
                 try:
@@ -665,10 +1776,13 @@ class Music(commands.Cog):
             track.requester = ctx.author
 
             if vc.playing or vc.paused:
+                if self.queue_full(vc):
+                    return await ctx.send(embed=self.queue_full_embed(vc))
                 vc.queue.put(track)
                 embed = discord.Embed(title="Added to Queue", description=f"[{track.title}]({track.uri})", color=discord.Color.green())
                 await ctx.send(embed=embed)
                 logger.info(f"[MUSIC | {vc.guild.name if vc.guild else "Unknown"} | ({vc.guild.id if vc.guild else "N/A"})] Queued: {track.title}")
+                await self.update_panel_message(vc)
             else:
                 try:
                     await vc.play(track)
@@ -722,39 +1836,12 @@ class Music(commands.Cog):
             embed.color = discord.Color.from_rgb(255, 165, 0) # color #FFA500
 
             return await ctx.send(embed=embed)
-        # Snapshot the queue so pagination remains consistent while viewing
-        try:
-            tracks = list(vc.queue)
-        except Exception:
-            # Fallback to slicing if list() isn't supported
-            tracks = vc.queue[:]
-        total = len(tracks)
-        per_page = 10
-        # Build initial embed for page 1
-        def build_page(page: int):
-            start = page * per_page
-            end = start + per_page
-            chunk = tracks[start:end]
-            if chunk:
-                lines = []
-                for i, track in enumerate(chunk, start=start):
-                    title = getattr(track, 'title', 'Unknown')
-                    lines.append(f"`{i+1}.` **{title}**")
-                desc = "\n".join(lines)
-            else:
-                desc = "No items on this page."
-            embed = discord.Embed(title=f"Queue ({total} tracks)", description=desc, color=discord.Color.gold())
-            pages = max(1, (total + per_page - 1) // per_page)
-            embed.set_footer(text=f"Page {1}/{pages}")
-            return embed
-
-        if total <= per_page:
-            await ctx.send(embed=build_page(0))
-            return
-
-        view = QueueView(tracks=tracks, author_id=ctx.author.id, per_page=per_page)
+        view = QueueView(vc, author_id=ctx.author.id)
         embed = view._build_embed()
-        await ctx.send(embed=embed, view=view)
+        if view.pages == 1:
+            await ctx.send(embed=embed)
+            return
+        view.message = await ctx.send(embed=embed, view=view)
 
     @music.command(name="repeat", aliases=['loop', "l", "re"])
     async def repeat_cmd(self, ctx: commands.Context):
@@ -802,6 +1889,25 @@ class Music(commands.Cog):
         vc.panel_message = await ctx.send(embed=await self.build_embed(vc), view=self.panel_view)
         await self.update_panel_message(vc)
 
+    @music.command(name="nodes", hidden=True)
+    @commands.is_owner()
+    async def nodes_cmd(self, ctx: commands.Context):
+        embed = discord.Embed(title="Lavalink Nodes", color=discord.Color.blurple())
+        for identifier in self.node_balancer.specs:
+            node = wavelink.Pool.nodes.get(identifier)
+            if node is None:
+                embed.add_field(name=identifier, value="Not connected", inline=False)
+                continue
+            stats = self.node_balancer.stats.get(identifier)
+            cpu = f"{stats.cpu.system_load:.0%}" if stats else "?"
+            health = "✅" if self.node_balancer.healthy(node) else "⚠️"
+            embed.add_field(
+                name=f"{health} {identifier}",
+                value=f"{node.status.name.title()} | {len(node.players)} players | CPU {cpu} | frame loss {self.node_balancer.frame_loss(node):.1%} | penalty {self.node_balancer.penalty(node):.1f}",
+                inline=False,
+            )
+        await ctx.send(embed=embed)
+
     async def _notify_guilds(self, message: str, throttle: int = 300):
         now = time.time()
         for vc in list(self.bot.voice_clients):
@@ -819,34 +1925,69 @@ class Music(commands.Cog):
                     logger.debug(f"[MUSIC] Failed to notify guild {guild.id} about Lavalink state.")
             self._last_notify[guild.id] = now
 
-    @tasks.loop(seconds=20.0)
-    async def lavalink_monitor(self):
-        host = self._lavalink_host
-        port = self._lavalink_port
-        if not host or not port:
-            return
+    async def migrate_player(self, player: CustomPlayer, target: wavelink.Node) -> bool:
+        """Move `player` to `target`; queue, position, volume and pause state come along."""
+        guild = player.guild
+        source = player.node.identifier
         try:
-            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=3.0)
-            writer.close()
+            await player.switch_node(target)
+        except Exception as e:
+            logger.warning(f"[MUSIC | {guild.name if guild else "Unknown"} | ({guild.id if guild else "N/A"})] Moving player from '{source}' to '{target.identifier}' failed: {e}")
+            # The player may be left half-connected; a clean disconnect is better than silence
             try:
-                await writer.wait_closed()
+                await player.disconnect()
             except Exception:
                 pass
-            if not self._lavalink_online:
-                logger.info("[MUSIC] Lavalink server reachable again. Attempting to reconnect wavelink.Pool...")
-                self._lavalink_online = True
+            if player.text_channel:
                 try:
-                    node = wavelink.Node(uri=LAVALINK_URI, password=LAVALINK_PASSWORD)
-                    await wavelink.Pool.connect(client=self.bot, nodes=[node])
-                    logger.info("[MUSIC] Reconnected to Lavalink node.")
+                    await player.text_channel.send("The music server had problems and playback could not be moved. Please use play again.")
                 except Exception:
-                    logger.exception("[MUSIC] Failed to reconnect to Lavalink node after server came back.")
-                await self._notify_guilds("Lavalink is back online — attempting to resume music playback.")
-        except Exception:
-            if self._lavalink_online:
-                self._lavalink_online = False
-                logger.warning("[MUSIC] Detected Lavalink server is unreachable. Will attempt to reconnect periodically.")
-                await self._notify_guilds("Lavalink appears to be offline. The bot will try to reconnect; playback may stop temporarily.")
+                    pass
+            return False
+        logger.info(f"[MUSIC | {guild.name if guild else "Unknown"} | ({guild.id if guild else "N/A"})] Moved player from Lavalink node '{source}' to '{target.identifier}'.")
+        return True
+
+    async def rebalance(self):
+        """Move players off nodes that are down or dropping audio frames."""
+        if self._rebalance_lock.locked():
+            return
+        async with self._rebalance_lock:
+            # Grouped from the voice clients: wavelink empties a node's player map when it gives up on it
+            by_node: dict[str, tuple[wavelink.Node, list[CustomPlayer]]] = {}
+            for vc in self.bot.voice_clients:
+                if isinstance(vc, CustomPlayer) and vc.guild:
+                    by_node.setdefault(vc.node.identifier, (vc.node, []))[1].append(vc)
+            for identifier, (node, players) in by_node.items():
+                if self.node_balancer.healthy(node):
+                    continue
+                moved = 0
+                for player in players[:NODE_MIGRATIONS_PER_CHECK]:
+                    target = self.node_balancer.best_node(exclude=node)
+                    if target is None or not self.node_balancer.healthy(target):
+                        logger.warning(f"[MUSIC] Lavalink node '{identifier}' is degraded but no healthy node can take its players.")
+                        return
+                    if await self.migrate_player(player, target):
+                        moved += 1
+                logger.info(f"[MUSIC] Lavalink node '{identifier}' degraded (status {node.status.name}, frame loss {self.node_balancer.frame_loss(node):.1%}); moved {moved} of {len(players)} player(s).")
+
+    @tasks.loop(seconds=20.0)
+    async def lavalink_monitor(self):
+        # Nodes whose first connect failed never joined the pool; retry them
+        missing = [identifier for identifier in self.node_balancer.specs if identifier not in wavelink.Pool.nodes]
+        if missing:
+            self._connect_nodes(missing)
+        await self.node_balancer.refresh()
+        online = any(self.node_balancer.healthy(node) for node in wavelink.Pool.nodes.values())
+        if online and not self._lavalink_online:
+            self._lavalink_online = True
+            logger.info("[MUSIC] A Lavalink node is reachable again.")
+            await self._notify_guilds("Lavalink is back online — attempting to resume music playback.")
+        elif not online and self._lavalink_online:
+            self._lavalink_online = False
+            logger.warning("[MUSIC] No Lavalink node is reachable. Will keep retrying.")
+            await self._notify_guilds("Lavalink appears to be offline. The bot will try to reconnect; playback may stop temporarily.")
+        if online:
+            await self.rebalance()
 
     @lavalink_monitor.before_loop
     async def _before_lavalink_monitor(self):
@@ -883,6 +2024,8 @@ class Music(commands.Cog):
                 except Exception:
                     pass
                 await self._clear_queue(vc)
+                self.panel_refresher.forget(guild.id)
+                await self.player_snapshots.forget(guild.id)
                 if getattr(vc, "panel_message", None):
                     try:
                         await vc.panel_message.delete()
@@ -933,7 +2076,7 @@ class Music(commands.Cog):
             except Exception as e:
                 logger.warning(f"[MUSIC | {interaction.guild.name} | ({interaction.guild.id})] Failed to set initial volume via context menu: {e}")
         try:
-            tracks = await wavelink.Playable.search(query)
+            tracks = await self.search_tracks(query)
             if not tracks:
 
                 embed = discord.Embed()
@@ -945,38 +2088,16 @@ class Music(commands.Cog):
                 return await interaction.followup.send(embed=embed, ephemeral=True)
 
             if isinstance(tracks, wavelink.Playlist):
-                added_count = 0
-                for track in tracks.tracks:
-                    track.requester = interaction.user
-                    vc.queue.put(track)
-                    added_count += 1
-                # Safely build a link for the playlist: some Playlist objects may not have `uri`.
-                playlist_url = getattr(tracks, "uri", None)
-                if not playlist_url:
-                    first = tracks.tracks[0] if getattr(tracks, "tracks", None) else None
-                    playlist_url = getattr(first, "uri", None) if first else None
-                if playlist_url:
-                    desc = f"Added {added_count} tracks from [{tracks.name}]({playlist_url})"
-                else:
-                    desc = f"Added {added_count} tracks from {tracks.name}"
-                embed = discord.Embed(title="Playlist Added to Queue", description=desc, color=discord.Color.green())
-                await interaction.followup.send(embed=embed)
-                logger.info(f"[MUSIC | {interaction.guild.name} | ({interaction.guild.id})] Queued playlist: {tracks.name} with {added_count} tracks")
-                if not vc.playing and not vc.paused:
-                    try:
-                        await vc.play(vc.queue.get())
-                    except Exception as e:
-                        logger.warning(f"[MUSIC | {interaction.guild.name} | ({interaction.guild.id})] Failed to start playing playlist via context menu: {e}")
-                        
-                        embed = discord.Embed()
+                result = await self.ingest_playlist(vc, tracks, interaction.user, interaction.followup.send)
+                if result["play_error"] is not None:
 
-                        embed.title = "Internal Error"
-                        embed.description = "Failed to play the playlist."
-                        embed.color = discord.Color.red()
+                    embed = discord.Embed()
 
-                        return await interaction.followup.send(embed=embed, ephemeral=True)
-                    else:
-                        logger.info(f"[MUSIC | {interaction.guild.name} | ({interaction.guild.id})] Started playing playlist via context menu.")
+                    embed.title = "Internal Error"
+                    embed.description = "Failed to play the playlist."
+                    embed.color = discord.Color.red()
+
+                    return await interaction.followup.send(embed=embed, ephemeral=True)
                 # Ensure panel message exists or is created, then update it.
                 if not vc.panel_message:
                     try:
@@ -991,6 +2112,8 @@ class Music(commands.Cog):
                 track.requester = interaction.user
 
                 if vc.playing or not vc.queue.is_empty:
+                    if self.queue_full(vc):
+                        return await interaction.followup.send(embed=self.queue_full_embed(vc), ephemeral=True)
                     vc.queue.put(track)
                     embed = discord.Embed(title="Added to Queue", description=f"[{track.title}]({track.uri})", color=discord.Color.green())
                     await interaction.followup.send(embed=embed)
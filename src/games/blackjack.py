@@ -0,0 +1,221 @@
+"""Blackjack engine shared by the economy `blackjack` command and the offline simulator.
+
+Cards are ints 0..51: `card >> 2` is the rank index (2..10, J, Q, K, A) and `card & 3` the
+suit index. Hands keep running totals, so reading a total is O(1), and the shoe only
+reshuffles when its cut card is reached.
+
+The simulator plays the same rules as the Discord game (hit/stand only, dealer stands on
+all 17s, wins pay 1:1, ties push) and reports the player's expected return:
+
+    python -m src.games.blackjack --hands 5000000 --decks 4 --strategy basic
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import time
+
+RANKS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+SUITS = ('♠', '♥', '♦', '♣')
+ACE_RANK = 12
+# Hard value of every card id; aces count 1 here and are promoted to 11 in Hand.total
+CARD_VALUES = tuple(1 if card >> 2 == ACE_RANK else min(10, (card >> 2) + 2) for card in range(52))
+
+
+def format_card(card: int, suits=SUITS, ranks=RANKS) -> str:
+    return f"{suits[card & 3]}{ranks[card >> 2]}"
+
+
+class Shoe:
+    """`decks` shuffled decks dealt down to `penetration`, then reshuffled on the next draw."""
+
+    def __init__(self, decks: int = 1, penetration: float = 0.75, rng: random.Random | None = None):
+        self.cards = list(range(52)) * max(1, decks)
+        self.cut = max(1, int(len(self.cards) * min(max(penetration, 0.1), 1.0)))
+        self.rng = rng or random.Random()
+        self.position = len(self.cards)  # forces a shuffle before the first card
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+        self.position = 0
+
+    def draw(self) -> int:
+        if self.position >= self.cut:
+            self.shuffle()
+        card = self.cards[self.position]
+        self.position += 1
+        return card
+
+
+class Hand:
+    __slots__ = ("cards", "hard", "aces")
+
+    def __init__(self):
+        self.cards: list[int] = []
+        self.hard = 0
+        self.aces = 0
+
+    def add(self, card: int) -> int:
+        self.cards.append(card)
+        self.hard += CARD_VALUES[card]
+        if card >> 2 == ACE_RANK:
+            self.aces += 1
+        return self.total
+
+    @property
+    def total(self) -> int:
+        # At most one ace can count as 11 without busting
+        if self.aces and self.hard + 10 <= 21:
+            return self.hard + 10
+        return self.hard
+
+    @property
+    def soft(self) -> bool:
+        return bool(self.aces) and self.hard + 10 <= 21
+
+    @property
+    def busted(self) -> bool:
+        return self.hard > 21
+
+
+def deal(shoe: Shoe) -> tuple[Hand, Hand]:
+    player, dealer = Hand(), Hand()
+    for _ in range(2):
+        player.add(shoe.draw())
+        dealer.add(shoe.draw())
+    return player, dealer
+
+
+def play_dealer(dealer: Hand, shoe: Shoe) -> int:
+    while dealer.total < 17:
+        dealer.add(shoe.draw())
+    return dealer.total
+
+
+def settle(player_total: int, dealer_total: int) -> str:
+    """"win", "lose" or "draw" for the player, in the order the game checks them."""
+    if player_total > 21:
+        return "lose"
+    if dealer_total > 21 or player_total > dealer_total:
+        return "win"
+    if player_total < dealer_total:
+        return "lose"
+    return "draw"
+
+
+# ===================== SIMULATOR =====================
+def _stand_basic(total: int, soft: bool, upcard: int) -> bool:
+    """Basic strategy restricted to hit/stand. `upcard` is the dealer's card value (ace = 11)."""
+    if soft:
+        return total >= 19 or (total == 18 and upcard <= 8)
+    if total >= 17:
+        return True
+    if total >= 13:
+        return upcard <= 6
+    if total == 12:
+        return 4 <= upcard <= 6
+    return False
+
+
+def _stand_dealer(total: int, soft: bool, upcard: int) -> bool:
+    return total >= 17
+
+
+STRATEGIES = {"basic": _stand_basic, "dealer": _stand_dealer}
+
+
+def simulate(hands: int, decks: int = 1, penetration: float = 0.75, strategy: str = "basic", seed: int | None = None) -> dict:
+    """Play `hands` one-unit rounds and return outcome counts and the player's net units."""
+    stands = STRATEGIES[strategy]
+    shoe = Shoe(decks, penetration, random.Random(seed))
+    draw = shoe.draw
+    values = CARD_VALUES
+    wins = losses = draws = busts = 0
+    for _ in range(hands):
+        # Inlined Hand bookkeeping: (hard total, has ace) per side
+        c1, d1, c2, d2 = draw(), draw(), draw(), draw()
+        p_hard = values[c1] + values[c2]
+        p_ace = c1 >> 2 == ACE_RANK or c2 >> 2 == ACE_RANK
+        d_hard = values[d1] + values[d2]
+        d_ace = d1 >> 2 == ACE_RANK or d2 >> 2 == ACE_RANK
+        upcard = 11 if d1 >> 2 == ACE_RANK else values[d1]
+
+        while True:
+            soft = p_ace and p_hard <= 11
+            total = p_hard + 10 if soft else p_hard
+            if total > 21 or stands(total, soft, upcard):
+                break
+            card = draw()
+            p_hard += values[card]
+            p_ace = p_ace or card >> 2 == ACE_RANK
+        if total > 21:
+            busts += 1
+            losses += 1
+            continue
+
+        dealer_total = d_hard + 10 if d_ace and d_hard <= 11 else d_hard
+        while dealer_total < 17:
+            card = draw()
+            d_hard += values[card]
+            d_ace = d_ace or card >> 2 == ACE_RANK
+            dealer_total = d_hard + 10 if d_ace and d_hard <= 11 else d_hard
+
+        result = settle(total, dealer_total)
+        if result == "win":
+            wins += 1
+        elif result == "lose":
+            losses += 1
+        else:
+            draws += 1
+    return {"hands": hands, "wins": wins, "losses": losses, "draws": draws, "busts": busts}
+
+
+def _simulate_chunk(args: tuple) -> dict:
+    return simulate(*args)
+
+
+def run_simulation(hands: int, decks: int, penetration: float, strategy: str, workers: int, seed: int | None) -> dict:
+    workers = max(1, min(workers, hands))
+    base_seed = seed if seed is not None else random.randrange(2**32)
+    chunks = [(hands // workers + (1 if i < hands % workers else 0), decks, penetration, strategy, base_seed + i) for i in range(workers)]
+    if workers == 1:
+        parts = [_simulate_chunk(chunks[0])]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            parts = pool.map(_simulate_chunk, chunks)
+    totals = {key: sum(part[key] for part in parts) for key in parts[0]}
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte-Carlo simulation of the economy blackjack rules")
+    parser.add_argument("--hands", type=int, default=1_000_000)
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--penetration", type=float, default=0.75, help="Fraction of the shoe dealt before reshuffling")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="basic")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    totals = run_simulation(args.hands, args.decks, args.penetration, args.strategy, args.workers, args.seed)
+    elapsed = time.perf_counter() - started
+
+    hands = totals["hands"]
+    net = totals["wins"] - totals["losses"]
+    ev = net / hands
+    # Each hand returns +1, 0 or -1 unit
+    variance = (totals["wins"] + totals["losses"]) / hands - ev * ev
+    margin = 1.96 * math.sqrt(variance / hands)
+    print(f"hands      {hands:,} in {elapsed:.1f}s ({hands / elapsed * 60:,.0f} hands/min, {args.workers} workers)")
+    print(f"rules      {args.decks} deck(s), {args.penetration:.0%} penetration, strategy={args.strategy}")
+    print(f"wins       {totals['wins'] / hands:.4%}")
+    print(f"losses     {totals['losses'] / hands:.4%} (busts {totals['busts'] / hands:.4%})")
+    print(f"draws      {totals['draws'] / hands:.4%}")
+    print(f"player EV  {ev:+.4%} per unit bet (±{margin:.4%} at 95%)")
+    print(f"house edge {-ev:+.4%}; coins removed per 1000 coins wagered: {-ev * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Bulk export and import of the economy database.
+
+Archives are zip files holding one `<table>.ndjson` or `<table>.csv` per exported table and a
+`manifest.json`. Exports stream rows out of a snapshot taken with SQLite's online backup API,
+so the bot keeps writing while a large economy is dumped. Imports stream rows into staging
+tables with `executemany` in batches, then replace each table inside one transaction and
+journal every changed balance and item quantity to `economy_ledger` with reason "import".
+
+Everything here blocks; the Economy cog runs it through `asyncio.to_thread`. From a shell
+(stop the bot before importing, its in-memory caches are not refreshed otherwise):
+
+    python -m src.utils.economy_io export economy.zip --format csv
+    python -m src.utils.economy_io import economy.zip
+    python -m src.utils.economy_io snapshot economy-backup.db
+"""
+import argparse
+import asyncio
+import csv
+import io
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zipfile
+
+DEFAULT_DB_PATH = "src/databases/economy.db"
+BATCH_ROWS = 5000            # Rows per fetchmany / executemany round
+MIN_SCHEMA_VERSION = 5       # Imports journal to economy_ledger, added by migration 5
+FORMATS = ("ndjson", "csv")
+
+# table -> (columns, primary key, text columns, nullable columns)
+TABLES: dict[str, tuple[tuple[str, ...], tuple[str, ...], frozenset, frozenset]] = {
+    "economy": (("user_id", "balance", "last_daily"), ("user_id",), frozenset(), frozenset({"last_daily"})),
+    "inventory": (("user_id", "item", "quantity"), ("user_id", "item"), frozenset({"item"}), frozenset()),
+    "shop_items": (("item_id", "name", "price"), ("item_id",), frozenset({"item_id", "name"}), frozenset()),
+    "cooldowns": (("user_id", "command", "last_used"), ("user_id", "command"), frozenset({"command"}), frozenset()),
+}
+
+# Changes are journaled as the difference between the stored and the imported rows, so
+# replaying the ledger still matches the tables afterwards (see Economy.reconcile_user)
+JOURNAL_SQL = {
+    "economy": (
+        "INSERT INTO economy_ledger (ts, user_id, item, delta, balance_after, reason) "
+        "SELECT ?1, n.user_id, NULL, n.balance - COALESCE(o.balance, 0), n.balance, 'import' "
+        "FROM temp.import_economy n LEFT JOIN main.economy o ON o.user_id = n.user_id "
+        "WHERE n.balance != COALESCE(o.balance, 0) "
+        "UNION ALL "
+        "SELECT ?1, o.user_id, NULL, -o.balance, 0, 'import' FROM main.economy o "
+        "WHERE o.balance != 0 AND NOT EXISTS (SELECT 1 FROM temp.import_economy n WHERE n.user_id = o.user_id)"
+    ),
+    "inventory": (
+        "INSERT INTO economy_ledger (ts, user_id, item, delta, balance_after, reason) "
+        "SELECT ?1, n.user_id, n.item, n.quantity - COALESCE(o.quantity, 0), n.quantity, 'import' "
+        "FROM temp.import_inventory n LEFT JOIN main.inventory o ON o.user_id = n.user_id AND o.item = n.item "
+        "WHERE n.quantity != COALESCE(o.quantity, 0) "
+        "UNION ALL "
+        "SELECT ?1, o.user_id, o.item, -o.quantity, 0, 'import' FROM main.inventory o "
+        "WHERE NOT EXISTS (SELECT 1 FROM temp.import_inventory n WHERE n.user_id = o.user_id AND n.item = o.item)"
+    ),
+}
+
+
+class ArchiveError(Exception):
+    """The archive cannot be imported; nothing was changed."""
+
+
+def _connect(path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=check_same_thread)
+    db.execute("PRAGMA busy_timeout = 5000")
+    db.execute("PRAGMA temp_store = MEMORY")
+    return db
+
+
+# ===================== SNAPSHOT =====================
+def snapshot(db_path: str, dest_path: str) -> str:
+    """Copy a consistent image of `db_path` to `dest_path` with the online backup API."""
+    source = _connect(db_path)
+    try:
+        dest = sqlite3.connect(dest_path)
+        try:
+            # A single step copies everything inside one read transaction, which WAL writers never wait on
+            source.backup(dest)
+        finally:
+            dest.close()
+    finally:
+        source.close()
+    return dest_path
+
+
+# ===================== EXPORT =====================
+def _export_table(db: sqlite3.Connection, archive: zipfile.ZipFile, table: str, fmt: str) -> int:
+    columns, key, _, _ = TABLES[table]
+    cursor = db.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {', '.join(key)}")
+    count = 0
+    with archive.open(f"{table}.{fmt}", "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as out:
+        writer = csv.writer(out) if fmt == "csv" else None
+        if writer:
+            writer.writerow(columns)
+        else:
+            # json.dumps() builds a new encoder per call when given options; reuse one instead
+            encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        while rows := cursor.fetchmany(BATCH_ROWS):
+            if writer:
+                writer.writerows(rows)
+            else:
+                out.writelines(encode(dict(zip(columns, row))) + "\n" for row in rows)
+            count += len(rows)
+    return count
+
+
+def export_archive(db_path: str, archive_path: str, fmt: str = "ndjson", tables: list[str] | None = None) -> dict[str, int]:
+    """Write `tables` (all by default) to a zip archive and return the row count per table."""
+    tables = list(tables or TABLES)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    unknown = [table for table in tables if table not in TABLES]
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(unknown)}")
+
+    counts = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        db = sqlite3.connect(snapshot(db_path, os.path.join(workdir, "snapshot.db")))
+        try:
+            schema_version = db.execute("PRAGMA user_version").fetchone()[0]
+            partial = archive_path + ".part"
+            with zipfile.ZipFile(partial, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for table in tables:
+                    counts[table] = _export_table(db, archive, table, fmt)
+                manifest = {"format": fmt, "schema_version": schema_version, "created": int(time.time()), "tables": counts}
+                archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+            os.replace(partial, archive_path)
+        finally:
+            db.close()
+    return counts
+
+
+# ===================== IMPORT =====================
+def _convert(table: str, record: dict, line: int) -> tuple:
+    columns, _, text, nullable = TABLES[table]
+    row = []
+    for column in columns:
+        value = record.get(column)
+        if column in text:
+            if value is None:
+                raise ArchiveError(f"{table} line {line}: `{column}` is missing")
+            row.append(str(value))
+        elif value is None or value == "":
+            if column not in nullable:
+                raise ArchiveError(f"{table} line {line}: `{column}` is missing")
+            row.append(None)
+        else:
+            try:
+                row.append(int(value))
+            except (TypeError, ValueError):
+                raise ArchiveError(f"{table} line {line}: `{column}` must be an integer, got {value!r}") from None
+    if table == "economy" and row[1] < 0:
+        raise ArchiveError(f"economy line {line}: balance cannot be negative")
+    return tuple(row)
+
+
+def _read_csv(source, table: str):
+    reader = csv.DictReader(source)
+    missing = set(TABLES[table][0]) - set(reader.fieldnames or ())
+    if missing:
+        raise ArchiveError(f"{table}.csv is missing columns: {', '.join(sorted(missing))}")
+    for line, record in enumerate(reader, start=2):
+        yield _convert(table, record, line)
+
+
+def _read_ndjson(source, table: str):
+    for line, text in enumerate(source, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ArchiveError(f"{table}.ndjson line {line}: {e}") from None
+        if not isinstance(record, dict):
+            raise ArchiveError(f"{table}.ndjson line {line}: expected an object")
+        yield _convert(table, record, line)
+
+
+def _archive_tables(archive: zipfile.ZipFile) -> dict[str, tuple[str, str]]:
+    """Map each table in the archive to its (member name, format)."""
+    members = {}
+    for name in archive.namelist():
+        if name == "manifest.json":
+            continue
+        table, _, fmt = name.rpartition(".")
+        if table not in TABLES or fmt not in FORMATS:
+            raise ArchiveError(f"Unexpected file in archive: {name}")
+        if table in members:
+            raise ArchiveError(f"Table {table} appears more than once in the archive")
+        members[table] = (name, fmt)
+    if not members:
+        raise ArchiveError("The archive holds no tables")
+    return members
+
+
+def _stage_table(db: sqlite3.Connection, archive: zipfile.ZipFile, table: str, name: str, fmt: str) -> int:
+    columns, key, text, _ = TABLES[table]
+    # Declared types matter: without matching affinity the journal queries cannot probe the key
+    definitions = ", ".join(f"{column} {'TEXT' if column in text else 'INTEGER'}" for column in columns)
+    db.execute(f"DROP TABLE IF EXISTS temp.import_{table}")
+    db.execute(f"CREATE TEMP TABLE import_{table} ({definitions}, PRIMARY KEY ({', '.join(key)})) WITHOUT ROWID")
+    # Later rows win over earlier ones with the same key, like repeated upserts would
+    insert = f"INSERT OR REPLACE INTO temp.import_{table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    with archive.open(name) as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as source:
+        rows = _read_csv(source, table) if fmt == "csv" else _read_ndjson(source, table)
+        db.execute("BEGIN")
+        try:
+            while batch := list(itertools.islice(rows, BATCH_ROWS)):
+                db.executemany(insert, batch)
+            if table == "inventory":
+                db.execute("DELETE FROM temp.import_inventory WHERE quantity <= 0")
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+    return db.execute(f"SELECT COUNT(*) FROM temp.import_{table}").fetchone()[0]
+
+
+class StagedImport:
+    """Archive tables parsed into temp tables on a private connection, ready to replace the live ones.
+
+    Staging never writes to the main database, so the bot keeps running while a large archive
+    is parsed; only `apply` takes the write lock.
+    """
+
+    def __init__(self, db: sqlite3.Connection, counts: dict[str, int]):
+        self.db = db
+        self.counts = counts
+
+    def apply(self) -> dict[str, int]:
+        """Journal the changes and replace every staged table inside one transaction."""
+        db = self.db
+        now = int(time.time())
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for table in self.counts:
+                columns = ", ".join(TABLES[table][0])
+                if table in JOURNAL_SQL:
+                    db.execute(JOURNAL_SQL[table], (now,))
+                db.execute(f"DELETE FROM main.{table}")
+                db.execute(f"INSERT INTO main.{table} ({columns}) SELECT {columns} FROM temp.import_{table}")
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return self.counts
+
+    def close(self):
+        self.db.close()
+
+
+def stage_archive(db_path: str, archive_path: str) -> StagedImport:
+    """Parse and validate every table in the archive into temp tables next to `db_path`."""
+    try:
+        archive = zipfile.ZipFile(archive_path)
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"Not a zip archive: {e}") from None
+    with archive:
+        members = _archive_tables(archive)
+        # Staging and applying may run on different asyncio.to_thread workers, never at the same time
+        db = _connect(db_path, check_same_thread=False)
+        try:
+            schema_version = db.execute("PRAGMA user_version").fetchone()[0]
+            if schema_version < MIN_SCHEMA_VERSION:
+                raise ArchiveError(f"Database schema is at version {schema_version}; load the Economy cog once to migrate it")
+            counts = {table: _stage_table(db, archive, table, name, fmt) for table, (name, fmt) in members.items()}
+        except BaseException:
+            db.close()
+            raise
+    return StagedImport(db, counts)
+
+
+def import_archive(db_path: str, archive_path: str) -> dict[str, int]:
+    """Replace every table found in the archive and return the imported row count per table.
+
+    Tables missing from the archive are left alone. Rows are parsed and staged before the
+    write transaction starts, so the database is only locked for the final swap.
+    """
+    staged = stage_archive(db_path, archive_path)
+    try:
+        return staged.apply()
+    finally:
+        staged.close()
+
+
+# ===================== CLI =====================
+async def _migrate(db_path: str):
+    # Imported lazily: the cog pulls in discord.py and settings, which export/snapshot never need
+    from src.cogs.economy import ECONOMY_MIGRATIONS, EconomyDatabase
+
+    db = EconomyDatabase(db_path, readers=1)
+    await db.open()
+    try:
+        await db.migrate(ECONOMY_MIGRATIONS)
+    finally:
+        await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export, import or snapshot the economy database")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"Economy database (default {DEFAULT_DB_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write tables to a zip archive")
+    export_parser.add_argument("archive")
+    export_parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    export_parser.add_argument("--tables", nargs="+", choices=sorted(TABLES))
+    import_parser = commands.add_parser("import", help="Replace tables with the contents of a zip archive")
+    import_parser.add_argument("archive")
+    snapshot_parser = commands.add_parser("snapshot", help="Copy the database with the online backup API")
+    snapshot_parser.add_argument("dest")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "snapshot":
+        snapshot(args.db, args.dest)
+        print(f"snapshot of {args.db} written to {args.dest}")
+    else:
+        if args.command == "export":
+            counts = export_archive(args.db, args.archive, args.format, args.tables)
+        else:
+            asyncio.run(_migrate(args.db))
+            try:
+                counts = import_archive(args.db, args.archive)
+            except ArchiveError as e:
+                parser.exit(1, f"import failed: {e}\n")
+        for table, count in counts.items():
+            print(f"{table:<12} {count:>10,} rows")
+    print(f"done in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()